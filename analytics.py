@@ -0,0 +1,166 @@
+# analytics.py
+# Sales reports over the order_lines table.
+#   python analytics.py --by item --since 2026-10-01 --top 10
+# Order lines are held as columnar NumPy arrays and grouped with bincount.
+# Each report is cached together with the number of lines it covers; later
+# calls only fold in lines added since, so a refresh costs O(new orders).
+# Amounts are integer pesewas; bincount sums them as float64, which is exact
+# up to 2**53 pesewas.
+import argparse
+import datetime
+import threading
+
+import numpy as np
+
+from database import DB_PATH, connect, local_timestamp
+from money import Money
+
+DIMENSIONS = ("item", "category", "hour", "day")
+
+
+class SalesAnalytics:
+    SELECT_LINES = (
+        "SELECT id, item_id, quantity, amount, ordered_at FROM order_lines "
+        "WHERE id > ? ORDER BY id"
+    )
+    SELECT_ITEMS = "SELECT id, category, item FROM price_history_items WHERE id > ? ORDER BY id"
+
+    def __init__(self, db_path=DB_PATH):
+        self.conn = connect(db_path)
+        self.lock = threading.Lock()
+        self.last_line_id = 0
+        self.count = 0
+        # Columns, grown by doubling; only [:count] is valid.
+        self.item_ids = np.zeros(0, dtype=np.int64)
+        self.quantities = np.zeros(0, dtype=np.int64)
+        self.amounts = np.zeros(0, dtype=np.int64)
+        self.timestamps = np.zeros(0, dtype=np.int64)
+        # item id -> (category, item) and category code.
+        self.last_item_id = 0
+        self.item_names = {}
+        self.categories = []
+        self.category_codes = {}
+        self.item_category = np.zeros(1, dtype=np.int64)
+        # (dimension, start, end) -> [lines covered, quantity sums, amount sums]
+        self.cache = {}
+
+    def refresh(self):
+        # Appends order lines (and item names) added since the last call.
+        # Both reads share one read transaction, so every line's item id is
+        # among the names read.
+        self.conn.execute("BEGIN")
+        try:
+            items = self.conn.execute(self.SELECT_ITEMS, (self.last_item_id,)).fetchall()
+            rows = self.conn.execute(self.SELECT_LINES, (self.last_line_id,)).fetchall()
+        finally:
+            self.conn.execute("COMMIT")
+        for item_id, category, item in items:
+            self.item_names[item_id] = (category, item)
+            code = self.category_codes.setdefault(category, len(self.categories))
+            if code == len(self.categories):
+                self.categories.append(category)
+            if item_id >= len(self.item_category):
+                size = max(item_id + 1, 2 * len(self.item_category))
+                self.item_category = np.resize(self.item_category, size)
+            self.item_category[item_id] = code
+            self.last_item_id = item_id
+        if not rows:
+            return
+        new = np.array(rows, dtype=np.int64)
+        end = self.count + len(new)
+        if end > len(self.item_ids):
+            size = max(end, 2 * len(self.item_ids), 1024)
+            for name in ("item_ids", "quantities", "amounts", "timestamps"):
+                column = np.zeros(size, dtype=np.int64)
+                column[:self.count] = getattr(self, name)[:self.count]
+                setattr(self, name, column)
+        self.item_ids[self.count:end] = new[:, 1]
+        self.quantities[self.count:end] = new[:, 2]
+        self.amounts[self.count:end] = new[:, 3]
+        self.timestamps[self.count:end] = new[:, 4]
+        self.count = end
+        self.last_line_id = int(new[-1, 0])
+
+    def revenue_by(self, dimension, start=None, end=None):
+        # [(key, quantity, revenue as Money)] by descending revenue for order
+        # lines with start <= order time < end. Keys are (category, item)
+        # for "item", the category name, the hour of day (0-23) or a date.
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {dimension}")
+        window = (
+            local_timestamp(start) if start else None,
+            local_timestamp(end) if end else None,
+        )
+        with self.lock:
+            self.refresh()
+            entry = self.cache.setdefault((dimension, *window), [0, np.zeros(0), np.zeros(0)])
+            if entry[0] < self.count:
+                self._fold(entry, dimension, window, entry[0], self.count)
+            quantities, amounts = entry[1], entry[2]
+            keys = np.flatnonzero(quantities)
+            order = keys[np.argsort(-amounts[keys], kind="stable")]
+            return [
+                (self._label(dimension, int(key)), int(quantities[key]), Money(int(amounts[key])))
+                for key in order
+            ]
+
+    def top_items(self, n=10, start=None, end=None):
+        return self.revenue_by("item", start, end)[:n]
+
+    def _fold(self, entry, dimension, window, lo, hi):
+        # Adds lines [lo, hi) into a cached report.
+        timestamps = self.timestamps[lo:hi]
+        mask = np.ones(hi - lo, dtype=bool)
+        if window[0] is not None:
+            mask &= timestamps >= window[0]
+        if window[1] is not None:
+            mask &= timestamps < window[1]
+        item_ids = self.item_ids[lo:hi][mask]
+        if dimension == "item":
+            keys = item_ids
+        elif dimension == "category":
+            keys = self.item_category[item_ids]
+        elif dimension == "hour":
+            keys = timestamps[mask] // 3600 % 24
+        else:
+            keys = timestamps[mask] // 86400
+        if keys.size == 0:
+            # Nothing in the window; bincount would return an empty int64
+            # array that cannot take the float sums.
+            entry[0] = hi
+            return
+        size = max(len(entry[1]), int(keys.max()) + 1)
+        quantities = np.bincount(keys, weights=self.quantities[lo:hi][mask], minlength=size)
+        amounts = np.bincount(keys, weights=self.amounts[lo:hi][mask], minlength=size)
+        quantities[:len(entry[1])] += entry[1]
+        amounts[:len(entry[2])] += entry[2]
+        entry[:] = [hi, quantities, amounts]
+
+    def _label(self, dimension, key):
+        if dimension == "item":
+            return self.item_names.get(key, ("?", f"#{key}"))
+        if dimension == "category":
+            return self.categories[key]
+        if dimension == "hour":
+            return key
+        return datetime.date(1970, 1, 1) + datetime.timedelta(days=key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sales report")
+    parser.add_argument("--by", choices=DIMENSIONS, default="item")
+    parser.add_argument("--since", type=datetime.datetime.fromisoformat,
+                        help="first day/time to include, e.g. 2026-10-01")
+    parser.add_argument("--until", type=datetime.datetime.fromisoformat,
+                        help="first day/time to exclude")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+    report = SalesAnalytics(args.db).revenue_by(args.by, args.since, args.until)
+    for key, quantity, revenue in report[:args.top]:
+        label = " / ".join(key) if isinstance(key, tuple) else str(key)
+        print(f"{label:<50} {quantity:>8} GHS {revenue:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
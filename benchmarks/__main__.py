@@ -0,0 +1,120 @@
+# benchmarks/__main__.py
+# Benchmark suite runner. From the project root:
+#   python -m benchmarks                          all suites, JSON on stdout
+#   python -m benchmarks --xvfb --out run.json    views under a virtual X server
+#   python -m benchmarks --save baseline.json     record a baseline
+#   python -m benchmarks --compare baseline.json  exit 1 on a regression
+# Progress and the comparison table go to stderr, so stdout is only JSON.
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks import bench_invoice, bench_models, bench_views
+from benchmarks.harness import Bench, compare, load_report, print_comparison
+
+SUITES = {"models": bench_models, "invoice": bench_invoice, "views": bench_views}
+MENU_SIZES = (10, 100, 1000, 10000)
+ORDER_LINES = (1, 10, 100, 1000)
+QUICK_MENU_SIZES = (10, 1000)
+QUICK_ORDER_LINES = (1, 100)
+
+
+def start_xvfb():
+    # Starts Xvfb on a free display and points DISPLAY at it; returns None
+    # if Xvfb is not installed.
+    read_fd, write_fd = os.pipe()
+    try:
+        proc = subprocess.Popen(
+            ["Xvfb", "-displayfd", str(write_fd), "-screen", "0", "1280x1024x24",
+             "-nolisten", "tcp"],
+            pass_fds=(write_fd,), stderr=subprocess.DEVNULL
+        )
+    except FileNotFoundError:
+        os.close(read_fd)
+        return None
+    finally:
+        os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        display = f.readline().strip()
+    if not display:
+        proc.kill()
+        raise RuntimeError("Xvfb did not start")
+    os.environ["DISPLAY"] = f":{display}"
+    return proc
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run benchmarks")
+    parser.add_argument("suites", nargs="*", metavar="suite",
+                        help=f"suites to run (default: all of {', '.join(SUITES)})")
+    parser.add_argument("--quick", action="store_true", help="fewer sizes and repeats")
+    parser.add_argument("--repeat", type=int, help="timing repeats per benchmark (default: 5)")
+    parser.add_argument("--xvfb", action="store_true",
+                        help="run the view suite under a private Xvfb server")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--save", metavar="BASELINE", help="also store the report as a baseline")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="compare with a stored baseline; exit 1 if anything regressed")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="slowdown counted as a regression, as a fraction (default: 0.2)")
+    args = parser.parse_args()
+    unknown = [name for name in args.suites if name not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(unknown)}")
+
+    # Views load their images from paths relative to the project root.
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if args.quick:
+        bench = Bench(repeat=args.repeat or 3, min_time=0.01)
+        menu_sizes, order_lines = QUICK_MENU_SIZES, QUICK_ORDER_LINES
+    else:
+        bench = Bench(repeat=args.repeat or 5)
+        menu_sizes, order_lines = MENU_SIZES, ORDER_LINES
+    names = args.suites or list(SUITES)
+    xvfb = None
+    if args.xvfb and "views" in names:
+        xvfb = start_xvfb()
+        if xvfb is None:
+            bench.skip("views", "Xvfb is not installed")
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    try:
+        for name in names:
+            if name == "views" and args.xvfb and xvfb is None:
+                continue
+            print(f"{name}:", file=sys.stderr, flush=True)
+            SUITES[name].run(bench, workdir, menu_sizes, order_lines)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    report = bench.report()
+    report["meta"]["suites"] = names
+    report["meta"]["quick"] = args.quick
+    status = 0
+    if args.compare:
+        rows = compare(load_report(args.compare), report, args.threshold)
+        report["comparison"] = {"baseline": args.compare, "threshold": args.threshold,
+                                "rows": rows}
+        print_comparison(rows)
+        if any(row["status"] == "regressed" for row in rows):
+            status = 1
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,36 @@
+# benchmarks/bench_invoice.py
+# Invoice rendering, and the work Controller.generate_invoice hands to the
+# task pool: OrderService.place_order, timed until the order is durable.
+from invoice_template import InvoiceTemplate
+from model import MenuModel, OrderHistoryModel, SettingsModel
+from order_writer import OrderWriter
+from service import DEFAULT_INVOICE_TEMPLATE, OrderService, render_invoice
+
+from benchmarks.bench_models import build_order
+from benchmarks.data import make_menu_db, order_details
+
+
+def run(bench, workdir, menu_sizes, order_lines):
+    bench.time("InvoiceTemplate (compile)", lambda: InvoiceTemplate(DEFAULT_INVOICE_TEMPLATE))
+    template = InvoiceTemplate(DEFAULT_INVOICE_TEMPLATE)
+
+    path = make_menu_db(workdir, max(order_lines))
+    # No write-behind delay, so the timing is the cost of storing an order
+    # rather than the batching window.
+    service = OrderService(MenuModel(path), OrderWriter(path, max_delay_ms=0),
+                           OrderHistoryModel(path), SettingsModel(path))
+    menu = service.get_menu()
+    try:
+        for lines in order_lines:
+            details = order_details(menu, lines)
+            order = build_order(details)
+            bench.time("render_invoice", lambda: render_invoice(template, order), lines=lines)
+            bench.time("OrderService.place_order (durable)",
+                       lambda: service.place_order(details, "Bench", menu.version)[2].result(),
+                       lines=lines)
+            order_id = service.place_order(details, "Bench", menu.version)[2].result()
+            bench.time("OrderService.order_invoice (reprint)",
+                       lambda: service.order_invoice(order_id), lines=lines)
+    finally:
+        service.close()
+        service.menu_model.conn.close()
@@ -0,0 +1,70 @@
+# benchmarks/bench_invoice_template.py
+# Compares the compiled invoice template with the previous
+# concatenate-then-str.format path and with one format_map per line over a
+# precompiled line format. Lines are OrderLines with Money prices, as real
+# invoices are. Run from the project root:
+#   python -m benchmarks.bench_invoice_template
+import timeit
+
+from invoice_template import DEFAULT_LINE_TEMPLATE, InvoiceTemplate
+from model import OrderLine
+from money import Money
+
+TEMPLATE = (
+    "Invoice\nOrder Time: {order_time}\n" +
+    "-" * 40 + "\n{items}" + "\n" +
+    "-" * 40 + "\nTotal: GHS {total:.2f}\n"
+)
+
+
+def make_lines(count):
+    return [
+        OrderLine("Main Courses", f"Item {n}", n % 5 + 1, Money(1250 + n % 7))
+        for n in range(count)
+    ]
+
+
+def render_format(lines, total):
+    items_str = ""
+    for d in lines:
+        items_str += (
+            f"{d['item']} x {d['quantity']} @ GHS {d['unit_price']:.2f} "
+            f"= GHS {d['total_price']:.2f}\n"
+        )
+    return TEMPLATE.format(order_time="2000-01-01 00:00:00", items=items_str, total=total)
+
+
+def render_format_map(lines, total):
+    items_str = "".join(map(DEFAULT_LINE_TEMPLATE.format_map, lines))
+    return TEMPLATE.format(order_time="2000-01-01 00:00:00", items=items_str, total=total)
+
+
+def render_compiled(template, lines, total):
+    return template.render(
+        order_time="2000-01-01 00:00:00", items=lines, item_count=len(lines), total=total
+    )
+
+
+def main():
+    template = InvoiceTemplate(TEMPLATE)
+    paths = (
+        ("str.format", render_format),
+        ("format_map", render_format_map),
+        ("compiled", lambda lines, total: render_compiled(template, lines, total)),
+    )
+    print(f"{'lines':>6}" + "".join(f" {name + ' (us)':>16}" for name, _ in paths))
+    for count in (1, 10, 100, 1000, 5000):
+        lines = make_lines(count)
+        total = Money.total(line.total_price for line in lines)
+        expected = render_format(lines, total)
+        assert all(render(lines, total) == expected for _, render in paths)
+        number = max(1, 20000 // count)
+        times = [
+            min(timeit.repeat(lambda: render(lines, total), number=number, repeat=5)) / number
+            for _, render in paths
+        ]
+        print(f"{count:>6}" + "".join(f" {t * 1e6:>16.1f}" for t in times))
+
+
+if __name__ == "__main__":
+    main()
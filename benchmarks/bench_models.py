@@ -0,0 +1,54 @@
+# benchmarks/bench_models.py
+# OrderModel and MenuModel operations.
+import itertools
+
+from model import MenuModel, OrderHistoryModel, OrderModel, SettingsModel
+from money import Money
+from order_writer import OrderWriter
+from service import OrderService
+
+from benchmarks.data import make_menu, make_menu_db, order_details
+
+
+def build_order(details):
+    order = OrderModel()
+    for category, item, quantity, price in details:
+        order.add_item(category, item, quantity, price)
+    return order
+
+
+def run(bench, workdir, menu_sizes, order_lines):
+    menu = make_menu(max(order_lines))
+    for lines in order_lines:
+        details = order_details(menu, lines)
+        bench.time("OrderModel.add_item (whole order)", lambda: build_order(details), lines=lines)
+        order = build_order(details)
+        category, item, _, _ = details[-1]
+        quantities = itertools.cycle((1, 2))
+        bench.time("OrderModel.set_quantity",
+                   lambda: order.set_quantity(category, item, next(quantities)), lines=lines)
+        bench.time("OrderModel.get_order", order.get_order, lines=lines)
+
+    for items in menu_sizes:
+        path = make_menu_db(workdir, items)
+        model = MenuModel(path)
+        category, item = next((c, i) for c, entries in model.get_menu().items() for i in entries)
+
+        def cold_load():
+            model.menu = None
+            return model.get_menu()
+
+        bench.time("MenuModel.get_menu (cold)", cold_load, items=items)
+        prices = itertools.cycle((Money(1000), Money(1050)))
+        bench.time("MenuModel.update_price",
+                   lambda: model.update_price(category, item, next(prices)), items=items)
+        model.search("jollof")
+        bench.time("MenuModel.search", lambda: model.search("jolof chick"), items=items)
+        service = OrderService(model, OrderWriter(path), OrderHistoryModel(path),
+                               SettingsModel(path))
+        requested = [(c, i, 1) for c, i, _, _ in order_details(model.get_menu(), 10)]
+        bench.time("OrderService.price_lines", lambda: service.price_lines(requested),
+                   items=items, lines=len(requested))
+        service.close()
+        model.conn.close()
+
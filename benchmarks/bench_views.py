@@ -0,0 +1,136 @@
+# benchmarks/bench_views.py
+# OrderView and AdminPanelView construction and refresh. Needs customtkinter
+# and an X display; `python -m benchmarks --xvfb` starts a virtual one.
+import itertools
+import os
+import types
+
+from model import MenuChange, MenuModel
+from money import Money
+from search import MenuSearchIndex
+
+from benchmarks.data import make_menu, make_menu_db
+
+
+def run(bench, workdir, menu_sizes, order_lines):
+    if not os.environ.get("DISPLAY"):
+        bench.skip("views", "no X display (set DISPLAY or pass --xvfb)")
+        return
+    try:
+        import customtkinter as ctk
+        from tasks import TaskRunner
+        from view import AdminPanelView, OrderView
+    except ImportError as e:
+        bench.skip("views", str(e))
+        return
+
+    root = ctk.CTk()
+    root.withdraw()
+    tasks = TaskRunner(root)
+
+    def destroy(window):
+        window.destroy()
+        root.update()
+
+    try:
+        for items in menu_sizes:
+            menu = make_menu(items)
+            index = MenuSearchIndex()
+            index.rebuild(menu)
+
+            def search_index(query, on_done, owner):
+                # Controller.search_menu's local path.
+                on_done(index.search(query))
+
+            def order_view(prebuild=False):
+                view = OrderView(menu, lambda details, view: None, lambda: None,
+                                 prebuild_tabs=False, search=search_index)
+                if prebuild:
+                    for category in list(view.pending_tabs):
+                        view.ensure_tab_built(category)
+                view.update_idletasks()
+                return view
+
+            bench.time("OrderView.__init__", order_view, teardown=destroy, items=items)
+            bench.time("OrderView.__init__ (all tabs built)", lambda: order_view(True),
+                       teardown=destroy, items=items)
+            view = order_view()
+            view.search_entry.insert(0, "jollof chicken")
+
+            def search():
+                view.run_search()
+                view.update_idletasks()
+
+            bench.time("OrderView.run_search", search, items=items)
+            category, item = next((c, i) for c, entries in menu.items() for i in entries)
+
+            def reuse():
+                # What a pooled window costs per order instead of __init__.
+                view.add_item(category, item)
+                view.reset()
+                view.update_idletasks()
+
+            bench.time("OrderView.reset (pooled reuse)", reuse, items=items)
+            destroy(view)
+
+            path = make_menu_db(workdir, items)
+            model = MenuModel(path)
+            controller = types.SimpleNamespace(
+                tasks=tasks, open_order_history_view=lambda: None,
+                open_diagnostics_view=lambda: None
+            )
+
+            def admin_view():
+                view = AdminPanelView(model, controller, lambda: None)
+                view.update_idletasks()
+                return view
+
+            bench.time("AdminPanelView.__init__", admin_view, teardown=destroy, items=items)
+            view = admin_view()
+
+            def full_refresh():
+                view.create_widgets()
+                view.update_idletasks()
+
+            bench.time("AdminPanelView.create_widgets (full refresh)", full_refresh, items=items)
+            category, item = next(iter(view.tab_items[min(view.tab_items)]))
+            prices = itertools.cycle((Money(1000), Money(1050)))
+
+            def price_change():
+                # The patch path a MenuModel.update_price event takes.
+                view.on_menu_change(
+                    MenuChange(MenuModel.PRICE_CHANGED, category, item, None, next(prices))
+                )
+                view.update_idletasks()
+
+            bench.time("AdminPanelView price change", price_change, items=items)
+            destroy(view)
+            model.conn.close()
+
+        menu = make_menu(max(order_lines))
+        view = OrderView(menu, lambda details, view: None, lambda: None, prebuild_tabs=False)
+        keys = sorted((category, item) for category, entries in menu.items() for item in entries)
+        added = 0
+        for lines in order_lines:
+            for category, item in keys[added:lines]:
+                view.order_summary[(category, item)] = 1
+            added = lines
+            view.update_summary_display()
+            category, item = keys[lines // 2]
+
+            def plus_minus():
+                view.add_item(category, item)
+                view.remove_item(category, item)
+                view.update_idletasks()
+
+            bench.time("OrderView.add_item + remove_item", plus_minus, lines=lines)
+
+            def repaint():
+                view.update_summary_display()
+                view.update_idletasks()
+
+            bench.time("OrderView.update_summary_display", repaint, lines=lines)
+        destroy(view)
+    finally:
+        tasks.shutdown()
+        root.destroy()
@@ -0,0 +1,61 @@
+# benchmarks/data.py
+# Deterministic synthetic menus and orders for the benchmark suites.
+import os
+from types import MappingProxyType
+
+from model import MenuModel, MenuSnapshot
+from money import Money
+
+# The till's own categories, so views pick up their usual background images.
+CATEGORIES = ("Appetizers", "Main Courses", "Desserts", "Drinks", "Other")
+DISHES = ("Jollof", "Waakye", "Banku", "Fufu", "Kenkey", "Tilapia", "Kelewele",
+          "Red Red", "Omo Tuo", "Ampesi", "Kontomire", "Chinchinga")
+SIDES = ("Chicken", "Fish", "Beef", "Goat", "Shrimp", "Plantain", "Beans", "Egg")
+SIZES = ("Small", "Medium", "Large")
+
+
+def menu_rows(items):
+    # {"category", "item", "price"} records, spread evenly over CATEGORIES;
+    # names are unique and made of real words so search has something to match.
+    for n in range(items):
+        dish = DISHES[n % len(DISHES)]
+        side = SIDES[n // len(DISHES) % len(SIDES)]
+        size = SIZES[n % len(SIZES)]
+        yield {
+            "category": CATEGORIES[n % len(CATEGORIES)],
+            "item": f"{dish} with {side} ({size}) #{n}",
+            "price": Money(500 + n * 37 % 14500),
+        }
+
+
+def make_menu(items, version=1):
+    categories = {category: {} for category in CATEGORIES}
+    for row in menu_rows(items):
+        categories[row["category"]][row["item"]] = row["price"]
+    return MenuSnapshot(
+        {category: MappingProxyType(entries) for category, entries in categories.items()},
+        version
+    )
+
+
+def make_menu_db(directory, items):
+    # A fresh database under directory holding exactly the synthetic menu.
+    path = os.path.join(directory, f"menu-{items}.db")
+    model = MenuModel(path)
+    for category in list(model.get_menu()):
+        model.remove_category(category)
+    model.bulk_upsert(enumerate(menu_rows(items), start=1))
+    model.conn.close()
+    return path
+
+
+def order_details(menu, lines):
+    # (category, item, quantity, unit_price) for the first `lines` items of
+    # menu, in the shape OrderView hands to Controller.generate_invoice.
+    details = []
+    for category, entries in menu.items():
+        for item, price in entries.items():
+            if len(details) == lines:
+                return details
+            details.append((category, item, len(details) % 4 + 1, price))
+    return details
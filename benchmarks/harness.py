@@ -0,0 +1,146 @@
+# benchmarks/harness.py
+# Timing, JSON reports and baseline comparison for the benchmark suites.
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+
+
+# Collects timings for one run. Suites call
+#   bench.time(name, fn, size=100)            fn() timed in a calibrated loop
+#   bench.time(name, fn, teardown=destroy)    each fn() timed on its own, then
+#                                             teardown(result) outside the clock
+# Parameters (menu size, order lines, ...) are passed as keyword arguments
+# and become part of the result's key.
+class Bench:
+    def __init__(self, repeat=5, min_time=0.05):
+        self.repeat = repeat
+        # Target duration of one repeat of a calibrated loop, in seconds.
+        self.min_time = min_time
+        self.results = []
+        self.skipped = []
+
+    def time(self, name, fn, teardown=None, **params):
+        gc.collect()
+        if teardown is None:
+            number = self._calibrate(fn)
+            samples = [self._loop(fn, number) / number for _ in range(self.repeat)]
+        else:
+            number = 1
+            samples = []
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                result = fn()
+                samples.append(time.perf_counter() - start)
+                teardown(result)
+        result = {
+            "name": name,
+            "params": params,
+            "number": number,
+            "repeat": self.repeat,
+            "min": min(samples),
+            "median": statistics.median(samples),
+            "mean": statistics.fmean(samples),
+        }
+        self.results.append(result)
+        print(f"  {result_key(result):<50} {format_seconds(result['min']):>10}",
+              file=sys.stderr, flush=True)
+        return result
+
+    def skip(self, suite, reason):
+        self.skipped.append({"suite": suite, "reason": reason})
+        print(f"  skipped {suite}: {reason}", file=sys.stderr, flush=True)
+
+    def _calibrate(self, fn):
+        number = 1
+        while True:
+            elapsed = self._loop(fn, number)
+            if elapsed >= self.min_time or number >= 1 << 20:
+                return number
+            # Aim straight for the target once the first timing is usable.
+            number = max(number * 2, int(number * self.min_time / max(elapsed, 1e-9)))
+
+    def _loop(self, fn, number):
+        # Like timeit: garbage collection is off while the loop runs.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            return time.perf_counter() - start
+        finally:
+            if enabled:
+                gc.enable()
+
+    def report(self):
+        return {
+            "meta": {
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            },
+            "results": self.results,
+            "skipped": self.skipped,
+        }
+
+
+def result_key(result):
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]" if params else result["name"]
+
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def load_report(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(baseline, current, threshold=0.2, floor=1e-6):
+    # Compares the best (min) time of every benchmark present in both
+    # reports. A benchmark has regressed when it is more than threshold
+    # (a fraction) slower than the baseline and by more than floor seconds,
+    # which keeps sub-microsecond noise out. Returns a list of rows sorted
+    # worst first.
+    base = {result_key(r): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        key = result_key(result)
+        old = base.pop(key, None)
+        if old is None:
+            rows.append({"key": key, "status": "new", "current": result["min"]})
+            continue
+        ratio = result["min"] / old["min"] if old["min"] else float("inf")
+        if ratio > 1 + threshold and result["min"] - old["min"] > floor:
+            status = "regressed"
+        elif ratio < 1 / (1 + threshold) and old["min"] - result["min"] > floor:
+            status = "improved"
+        else:
+            status = "unchanged"
+        rows.append({
+            "key": key, "status": status,
+            "baseline": old["min"], "current": result["min"], "ratio": ratio,
+        })
+    rows.extend({"key": key, "status": "missing", "baseline": old["min"]}
+                for key, old in base.items())
+    rows.sort(key=lambda row: -row.get("ratio", 0))
+    return rows
+
+
+def print_comparison(rows, out=sys.stderr):
+    print(f"{'benchmark':<50} {'baseline':>10} {'current':>10} {'ratio':>7}  status", file=out)
+    for row in rows:
+        old = format_seconds(row["baseline"]) if "baseline" in row else "-"
+        new = format_seconds(row["current"]) if "current" in row else "-"
+        ratio = f"{row['ratio']:.2f}x" if "ratio" in row else "-"
+        print(f"{row['key']:<50} {old:>10} {new:>10} {ratio:>7}  {row['status']}", file=out)
@@ -0,0 +1,97 @@
+# client.py
+import json
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import Future
+from types import MappingProxyType
+
+from invoice_template import TemplateError
+from model import MenuSnapshot
+from money import Money
+
+
+class ServiceError(Exception):
+    pass
+
+
+# Blocking HTTP client for server.py with the same order-taking methods as
+# OrderService, so the Tk client can run against a shared order service.
+class ServiceClient:
+    def __init__(self, base_url, timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def request(self, method, path, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        req = urllib.request.Request(
+            self.base_url + path, data=data, method=method,
+            headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read())
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", e.reason)
+            except ValueError:
+                message = e.reason
+            raise ServiceError(message) from None
+        except urllib.error.URLError as e:
+            raise ServiceError(f"Order service unavailable: {e.reason}") from None
+
+    def get_menu(self):
+        # Amounts travel as decimal cedis. The snapshot carries the server's
+        # menu version, so orders record it and pooled windows can tell
+        # whether the menu changed.
+        data = self.request("GET", "/menu")
+        return MenuSnapshot({
+            category: MappingProxyType({item: Money.parse(price) for item, price in items.items()})
+            for category, items in data["menu"].items()
+        }, data.get("version"))
+
+    def search(self, query, limit=20):
+        path = "/search?" + urllib.parse.urlencode({"q": query, "limit": limit})
+        return [(r["category"], r["item"]) for r in self.request("GET", path)["results"]]
+
+    def get_invoice_template(self):
+        return self.request("GET", "/invoice-template")["template"]
+
+    def set_invoice_template(self, new_template):
+        try:
+            self.request("PUT", "/invoice-template", {"template": new_template})
+        except ServiceError as e:
+            raise TemplateError(str(e)) from None
+
+    def place_order(self, order_details, customer_name="Walk-in", menu_version=None):
+        # Prices (and the menu version recorded with the order) always come
+        # from the server's current menu.
+        result = self.request("POST", "/orders", {
+            "customer_name": customer_name,
+            "lines": [
+                {"category": cat, "item": item, "quantity": qty}
+                for cat, item, qty, _ in order_details
+            ],
+        })
+        stored = Future()
+        stored.set_result(result["id"])
+        return None, result["invoice"], stored
+
+    def list_orders(self, before=None, query=None, limit=50):
+        params = {"limit": limit}
+        if query:
+            params["q"] = query
+        if before:
+            params["before_time"], params["before_id"] = before
+        result = self.request("GET", "/orders?" + urllib.parse.urlencode(params))
+        cursor = result["next"]
+        orders = [dict(order, total=Money.parse(order["total"])) for order in result["orders"]]
+        return orders, (cursor["before_time"], cursor["before_id"]) if cursor else None
+
+    def order_invoice(self, order_id):
+        # Raises ServiceError (404) for an unknown order.
+        path = "/invoices?" + urllib.parse.urlencode({"order_id": order_id})
+        return self.request("GET", path)["invoice"]
+
+    def close(self):
+        pass
@@ -1,22 +1,79 @@
 # controller.py
 import tkinter as tk
 from tkinter import messagebox
-from model import MenuModel, OrderModel, UserModel
-from view import (
-    HomeView, OrderView, InvoiceView, LoginView, AdminPanelView,
-    InvoiceFormatEditView, AddCategoryView, AddItemView,
-    RemoveItemView, ProductEditView, MajorEditView, RemoveCategoryView
-)
+from home_view import HomeView
+from image_cache import images
+from metrics import metrics
+from model import OrderModel, UserModel
+from service import OrderService
+from startup import lazy_import, profile
+from tasks import TaskRunner
+from watchdog import StallWatchdog
+from window_pool import WindowPool
+
+# Executed on first use, after the home screen is up.
+menu_io = lazy_import("menu_io")
+view = lazy_import("view")
 
 class Controller:
-    def __init__(self):
-        # Instantiate the models.
-        self.menu_model = MenuModel()
+    # Entry points timed when the till runs with instrumentation on.
+    INSTRUMENTED_OPERATIONS = (
+        "open_order_view", "generate_invoice", "open_login_view", "process_login",
+        "open_admin_panel_view", "open_order_history_view", "list_orders",
+        "open_order_invoice", "update_menu_price", "add_menu_category", "add_menu_item",
+        "remove_menu_item", "remove_menu_category", "update_product_details",
+        "import_menu", "export_menu", "set_invoice_template",
+    )
+    METRICS_EXPORT_MS = 60_000
+    HOME_BACKGROUND = "Images/bg.png"
+    HOME_SIZE = (400, 300)
+    # Quiet time after a menu edit before the hidden order window is rebuilt.
+    ORDER_POOL_REBUILD_MS = 2000
+
+    def __init__(self, service=None, instrument=False, stall_ms=None):
+        # With instrument=True, operation latencies and window construction
+        # are recorded (see metrics.py) and exported every minute. With
+        # stall_ms, Tk callbacks blocking the mainloop for longer are
+        # reported by call site (see watchdog.py).
+        if instrument:
+            metrics.enable()
+            metrics.instrument(self, self.INSTRUMENTED_OPERATIONS)
+            metrics.instrument_views((HomeView, *view.WINDOW_CLASSES))
+        # Startup is staged so the home screen appears first: paint it, open
+        # the database, then load its background image on a worker and the
+        # other windows' code when Tk is next idle.
+        self.main_view = HomeView(self.open_order_view, self.open_login_view)
+        self.main_view.update()
+        profile.mark("home screen painted")
+
+        # Order taking goes through a local OrderService by default, or a
+        # ServiceClient for a shared order service (menu editing is then
+        # only available on the server's own terminal).
+        self.service = service or OrderService()
+        self.menu_model = getattr(self.service, "menu_model", None)
         self.user_model = UserModel()
         self.order_model = OrderModel()
+        profile.mark("services ready")
 
-        # Window references.
-        self.main_view = HomeView(self.open_order_view, self.open_login_view)
+        # Blocking work runs here; callbacks come back on the Tk thread.
+        self.tasks = TaskRunner(self.main_view)
+        self.tasks.submit(
+            images.get_image, self.HOME_BACKGROUND, self.HOME_SIZE,
+            on_done=self.show_home_background, on_error=self.home_background_failed
+        )
+        if self.menu_model is not None:
+            self.tasks.submit(self.menu_model.build_search_index)
+        # Hidden, pre-built windows reused from order to order. An order
+        # window is only rebuilt when the menu version changes.
+        self.order_pool = WindowPool(self.create_order_view)
+        self.invoice_pool = WindowPool(self.create_invoice_view, max_idle=2)
+        self.order_pool_job = None
+        if self.menu_model is not None:
+            self.menu_model.subscribe(self.tasks.threadsafe(self.menu_changed))
+        self.watchdog = StallWatchdog(self.main_view, stall_ms) if stall_ms else None
+        if self.watchdog and metrics.enabled:
+            metrics.add_report("stalls", self.watchdog.report)
+        self.order_view_loading = False
         self.order_view = None
         self.login_view = None
         self.admin_panel_view = None
@@ -26,61 +83,173 @@ class Controller:
         self.add_item_view = None
         self.remove_item_view = None
         self.remove_category_view = None
+        self.order_history_view = None
+        self.diagnostics_view = None
+        if metrics.enabled:
+            self.main_view.after(self.METRICS_EXPORT_MS, self.export_metrics)
 
-        # Default invoice template.
-        self.invoice_template = (
-            "Invoice\nOrder Time: {order_time}\n" +
-            "-" * 40 + "\n{items}" + "\n" +
-            "-" * 40 + "\nTotal: GHS {total:.2f}\n"
-        )
+    def show_home_background(self, _):
+        # The resized image is cached by now, so this only wraps it for Tk.
+        try:
+            img = images.get_ctk_image(self.HOME_BACKGROUND, self.HOME_SIZE)
+            self.main_view.set_background(img)
+            profile.mark("home background shown")
+        except Exception as e:
+            print("HomeView background image error:", e)
+        self.main_view.after_idle(self.preload_modules)
+
+    def home_background_failed(self, error):
+        print("HomeView background image error:", error)
+        self.main_view.after_idle(self.preload_modules)
+
+    def preload_modules(self):
+        # Executes the deferred modules while the cashier is still on the
+        # home screen, so the first window opened does not pay for them.
+        # This also keeps their first use on the Tk thread.
+        view.OrderView
+        menu_io.read_rows
+        profile.mark("views loaded")
+        profile.finish()
+        self.invoice_pool.prepare(None)
+        self.tasks.submit(self.service.get_menu, on_done=self.prepare_order_view)
+
+    def export_metrics(self):
+        metrics.export()
+        self.main_view.after(self.METRICS_EXPORT_MS, self.export_metrics)
 
     def open_order_view(self):
         self.main_view.withdraw()
         if self.order_view and self.order_view.winfo_exists():
             self.order_view.lift()
             return
-        self.order_view = OrderView(
-            self.menu_model.get_menu(),
+        if self.order_view_loading:
+            return
+        if self.menu_model is not None:
+            # The local snapshot is in memory (loaded when the pooled window
+            # was prepared), so a matching window is shown straight away.
+            self.show_order_view(self.menu_model.get_menu())
+            return
+        # A remote menu is a network round trip, so fetch it off the Tk thread.
+        self.order_view_loading = True
+        self.tasks.submit(
+            self.service.get_menu,
+            on_done=self.show_order_view, on_error=self.order_view_failed
+        )
+
+    def order_view_failed(self, error):
+        self.order_view_loading = False
+        messagebox.showerror("Error", str(error))
+        self.main_view.deiconify()
+
+    def show_order_view(self, menu):
+        self.order_view_loading = False
+        self.order_view = self.order_pool.acquire(menu.version, menu)
+        self.order_view.deiconify()
+        self.order_view.lift()
+        self.order_view.focus_force()
+
+    def create_order_view(self, menu):
+        order_view = view.OrderView(
+            menu,
             self.generate_invoice,
-            self.on_order_view_close
+            self.on_order_view_close,
+            search=self.search_menu
+        )
+        order_view.protocol("WM_DELETE_WINDOW", self.on_order_view_close)
+        order_view.resizable(False, False)
+        return order_view
+
+    def search_menu(self, query, on_done, owner=None):
+        # A built local index answers in memory. A remote search is an HTTP
+        # round trip and the local index may still be building, so those
+        # run on the task pool and on_done comes back through the Tk loop.
+        if self.menu_model is not None and self.menu_model.search_index is not None:
+            on_done(self.service.search(query))
+            return
+        self.tasks.submit(
+            self.service.search, query,
+            on_done=on_done, on_error=lambda e: print("Menu search error:", e), owner=owner
+        )
+
+    def prepare_order_view(self, menu):
+        # Builds a hidden order window for menu unless the one in use is
+        # already up to date.
+        if self.order_view is None or self.order_view.menu.version != menu.version:
+            self.order_pool.prepare(menu.version, menu)
+
+    def menu_changed(self, change):
+        # A window in use keeps its menu until the order is done; the hidden
+        # one is rebuilt once edits pause.
+        if self.order_pool_job is not None:
+            self.main_view.after_cancel(self.order_pool_job)
+        self.order_pool_job = self.main_view.after(
+            self.ORDER_POOL_REBUILD_MS, self.rebuild_order_pool
         )
-        self.order_view.protocol("WM_DELETE_WINDOW", self.on_order_view_close)
-        self.order_view.resizable(False, False)
+
+    def rebuild_order_pool(self):
+        self.order_pool_job = None
+        self.prepare_order_view(self.menu_model.get_menu())
 
     def on_order_view_close(self):
         if self.order_view:
-            self.order_view.destroy()
-            self.order_view = None
+            order_view, self.order_view = self.order_view, None
+            order_view.withdraw()
+            order_view.reset()
+            self.order_pool.release(order_view, order_view.menu.version)
         self.main_view.deiconify()
 
+    def create_invoice_view(self):
+        invoice_view = view.InvoiceView("", on_back=None)
+        invoice_view.resizable(False, False)
+        return invoice_view
+
+    def show_invoice_view(self, invoice_str, on_back):
+        invoice_view = self.invoice_pool.acquire()
+
+        def back():
+            self.invoice_pool.release(invoice_view)
+            on_back()
+
+        invoice_view.show_invoice(invoice_str, back)
+        invoice_view.deiconify()
+        invoice_view.lift()
+        invoice_view.focus_force()
+
     def generate_invoice(self, order_details, order_view):
-        current_order = OrderModel()
-        for cat, item, qty, price in order_details:
-            current_order.add_item(cat, item, qty, price)
-        total = current_order.calculate_total()
-        order_time = current_order.get_order_time().strftime("%Y-%m-%d %H:%M:%S")
-
-        items_str = ""
-        for d in current_order.get_order():
-            items_str += (
-                f"{d['item']} x {d['quantity']} @ GHS {d['unit_price']:.2f} "
-                f"= GHS {d['total_price']:.2f}\n"
+        # Nothing is shown if the order window closes before this finishes.
+        def show_invoice(result):
+            _, invoice_str, stored = result
+            self.show_invoice_view(invoice_str, order_view.deiconify)
+            # The invoice is shown before the order is durable; a failed
+            # write is reported on the Tk thread once the writer gives up.
+            stored.add_done_callback(
+                lambda future: self.tasks.call_soon(self.order_write_finished, future)
             )
 
-        invoice_str = self.invoice_template.format(
-            order_time=order_time,
-            items=items_str,
-            total=total
+        def show_error(error):
+            messagebox.showerror("Error", str(error))
+            order_view.deiconify()
+
+        self.tasks.submit(
+            self.service.place_order, order_details, "Walk-in",
+            getattr(order_view.menu, "version", None),
+            on_done=show_invoice, on_error=show_error, owner=order_view
         )
-        invoice_window = InvoiceView(invoice_str, on_back=lambda: order_view.deiconify())
-        invoice_window.resizable(False, False)
+
+    def order_write_finished(self, stored):
+        error = stored.exception()
+        if error is not None:
+            messagebox.showerror(
+                "Order not saved",
+                f"The invoice was shown but the order could not be saved:\n{error}"
+            )
 
     def open_login_view(self):
         self.main_view.withdraw()
         if self.login_view and self.login_view.winfo_exists():
             self.login_view.lift()
             return
-        self.login_view = LoginView(self.process_login, self.on_login_view_close)
+        self.login_view = view.LoginView(self.process_login, self.on_login_view_close)
         self.login_view.protocol("WM_DELETE_WINDOW", self.on_login_view_close)
         self.login_view.resizable(False, False)
 
@@ -91,8 +260,29 @@ class Controller:
         self.main_view.deiconify()
 
     def process_login(self, username, password):
-        role = self.user_model.validate_user(username, password)
-        if role == "admin":
+        role = self.user_model.session_role(username, password)
+        if role is not None:
+            self.finish_login(role)
+            return
+        # Password hashing is deliberately slow, so verify off the Tk thread.
+        self.login_view.set_busy(True)
+        self.tasks.submit(
+            self.user_model.validate_user, username, password,
+            on_done=self.login_checked, on_error=self.login_failed, owner=self.login_view
+        )
+
+    def login_checked(self, role):
+        self.login_view.set_busy(False)
+        self.finish_login(role)
+
+    def login_failed(self, error):
+        print("Login error:", error)
+        self.login_checked(None)
+
+    def finish_login(self, role):
+        if role == "admin" and self.menu_model is None:
+            messagebox.showerror("Admin", "Menu editing is only available on the order service terminal.")
+        elif role == "admin":
             self.open_admin_panel_view()
             if self.login_view:
                 self.login_view.destroy()
@@ -105,7 +295,7 @@ class Controller:
         if self.admin_panel_view and self.admin_panel_view.winfo_exists():
             self.admin_panel_view.lift()
             return
-        self.admin_panel_view = AdminPanelView(
+        self.admin_panel_view = view.AdminPanelView(
             self.menu_model, self, self.on_admin_panel_view_close
         )
         self.admin_panel_view.protocol("WM_DELETE_WINDOW", self.on_admin_panel_view_close)
@@ -116,7 +306,8 @@ class Controller:
             self.admin_panel_view, self.major_edit_view,
             self.invoice_format_view, self.add_category_view,
             self.add_item_view, self.remove_item_view,
-            self.remove_category_view
+            self.remove_category_view, self.order_history_view,
+            self.diagnostics_view
         ):
             if win and win.winfo_exists():
                 win.destroy()
@@ -127,51 +318,127 @@ class Controller:
         self.add_item_view = None
         self.remove_item_view = None
         self.remove_category_view = None
+        self.order_history_view = None
+        self.diagnostics_view = None
         self.main_view.deiconify()
 
+    def open_order_history_view(self):
+        if self.order_history_view and self.order_history_view.winfo_exists():
+            self.order_history_view.lift()
+            return
+        self.order_history_view = view.OrderHistoryView(self.admin_panel_view, self)
+
+    def open_diagnostics_view(self):
+        if self.diagnostics_view and self.diagnostics_view.winfo_exists():
+            self.diagnostics_view.lift()
+            return
+        self.diagnostics_view = view.DiagnosticsView(self.admin_panel_view, metrics, self.watchdog)
+
+    def list_orders(self, before, query, limit, on_done, on_error, owner=None):
+        # on_done receives (orders, cursor for the next page or None).
+        self.tasks.submit(
+            self.service.list_orders, before, query, limit,
+            on_done=on_done, on_error=on_error, owner=owner
+        )
+
+    def open_order_invoice(self, order_id, owner):
+        def show_invoice(invoice_str):
+            if invoice_str is None:
+                messagebox.showerror("Error", f"Order #{order_id} not found.")
+                return
+            self.show_invoice_view(invoice_str, lambda: None)
+
+        self.tasks.submit(
+            self.service.order_invoice, order_id,
+            on_done=show_invoice,
+            on_error=lambda e: messagebox.showerror("Error", str(e)),
+            owner=owner
+        )
+
     # --- Model operations ---
+    # Edits run one at a time, in the order they were made, on the task
+    # runner's serial worker (reads keep the pool); on_done(success) is
+    # called on the Tk thread unless owner (the window that asked) has been
+    # closed by then.
 
-    def update_menu_price(self, category, item, new_price):
-        success = self.menu_model.update_price(category, item, new_price)
-        if success and self.admin_panel_view and self.admin_panel_view.winfo_exists():
-            self.admin_panel_view.refresh_display()
-        return success
-
-    def add_menu_category(self, category):
-        success = self.menu_model.add_category(category)
-        if success and self.admin_panel_view and self.admin_panel_view.winfo_exists():
-            self.admin_panel_view.refresh_display()
-        return success
-
-    def add_menu_item(self, category, item, price):
-        success = self.menu_model.add_item(category, item, price)
-        if success and self.admin_panel_view and self.admin_panel_view.winfo_exists():
-            self.admin_panel_view.refresh_display()
-        return success
-
-    def remove_menu_item(self, category, item):
-        success = self.menu_model.remove_item(category, item)
-        if success and self.admin_panel_view and self.admin_panel_view.winfo_exists():
-            self.admin_panel_view.refresh_display()
-        return success
-
-    def remove_menu_category(self, category):
-        success = self.menu_model.remove_category(category)
-        if success and self.admin_panel_view and self.admin_panel_view.winfo_exists():
-            self.admin_panel_view.refresh_display()
-        return success
-
-    def update_product_details(self, category, old_item, new_item, new_price):
-        return self.menu_model.update_product(category, old_item, new_item, new_price)
+    def run_menu_operation(self, operation, args, on_done, owner):
+        def failed(error):
+            # ValueError is rejected input; its message says what to fix and
+            # the edit window stays open.
+            if isinstance(error, ValueError):
+                messagebox.showerror("Error", str(error))
+                return
+            print("Menu update error:", error)
+            on_done(False)
+
+        self.tasks.submit(
+            operation, *args, on_done=on_done, on_error=failed, owner=owner, serial=True
+        )
+
+    def update_menu_price(self, category, item, new_price, on_done, owner=None):
+        self.run_menu_operation(
+            self.menu_model.update_price, (category, item, new_price), on_done, owner
+        )
+
+    def add_menu_category(self, category, on_done, owner=None):
+        self.run_menu_operation(self.menu_model.add_category, (category,), on_done, owner)
+
+    def add_menu_item(self, category, item, price, on_done, owner=None):
+        self.run_menu_operation(self.menu_model.add_item, (category, item, price), on_done, owner)
+
+    def remove_menu_item(self, category, item, on_done, owner=None):
+        self.run_menu_operation(self.menu_model.remove_item, (category, item), on_done, owner)
+
+    def remove_menu_category(self, category, on_done, owner=None):
+        self.run_menu_operation(self.menu_model.remove_category, (category,), on_done, owner)
+
+    def update_product_details(self, category, old_item, new_item, new_price, on_done, owner=None):
+        self.run_menu_operation(
+            self.menu_model.update_product, (category, old_item, new_item, new_price),
+            on_done, owner
+        )
+
+    def import_menu(self, path, on_done, on_error, owner=None):
+        # on_done receives a BulkResult.
+        self.tasks.submit(
+            lambda: self.menu_model.bulk_upsert(menu_io.read_rows(path)),
+            on_done=on_done, on_error=on_error, owner=owner, serial=True
+        )
+
+    def export_menu(self, path, on_done, on_error, owner=None):
+        # on_done receives the number of items written.
+        self.tasks.submit(
+            menu_io.write_rows, self.menu_model.get_menu(), path,
+            on_done=on_done, on_error=on_error, owner=owner
+        )
 
     def get_invoice_template(self):
-        return self.invoice_template
+        return self.service.get_invoice_template()
 
-    def set_invoice_template(self, new_template):
-        self.invoice_template = new_template
+    def set_invoice_template(self, new_template, on_done, on_error, owner=None):
+        # on_error receives a TemplateError for an invalid template, leaving
+        # the current one in place.
+        self.tasks.submit(
+            self.service.set_invoice_template, new_template,
+            on_done=on_done, on_error=on_error, owner=owner, serial=True
+        )
 
     def run(self):
-        self.main_view.mainloop()
+        try:
+            self.main_view.mainloop()
+        finally:
+            if self.watchdog:
+                self.watchdog.stop()
+                for stall in self.watchdog.report()[:10]:
+                    print(
+                        f"UI stalls: {stall['count']} x, {stall['total_ms']:.0f} ms total "
+                        f"in {stall['handler']} at {stall['site']}"
+                    )
+            self.tasks.shutdown()
+            if metrics.enabled:
+                metrics.export()
+            # Commit any orders still waiting in the write-behind queue.
+            self.service.close()
 
 if __name__ == "__main__":
     Controller().run()
@@ -0,0 +1,449 @@
+# database.py
+import calendar
+import datetime
+import json
+import os
+import sqlite3
+
+from money import Money
+from passwords import hash_password
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "restaurant.db")
+
+DEFAULT_MENU = {
+    "Appetizers": {
+        "Spring Rolls (Small)": 25,
+        "Spring Rolls (Medium)": 38,
+        "Spring Rolls (Large)": 53,
+        "Samosas (3 pieces)": 20,
+        "Kelete (Plantain Chips)": 15,
+        "Chicken Wings (6 pieces)": 38,
+        "Pepper Soup (small)": 33,
+        "Asanka Local Salad": 28,
+    },
+    "Main Courses": {
+        "Banku & Tilapia": 50,
+        "Tilapia": 30,
+        "Banku": 20,
+        "Fufu & Groundnut Soup": 65,
+        "Fufu & Light Soup": 60,
+        "Jollof Rice with Fish": 58,
+        "Jollof Rice with Chicken": 55,
+        "Fried Rice with Chicken": 53,
+        "Waakye": 40,
+        "Kenkey & Fried Fish and Pepper Sauce": 45,
+        "Pounded Fufu & Goat Light Soup": 75,
+        "Pizza (Small)": 65,
+        "Pizza (Medium)": 100,
+        "Pizza (Large)": 150,
+        "Burger (Single)": 50,
+        "Burger (Double)": 70,
+        "Spaghetti": 40,
+    },
+    "Desserts": {
+        "Fruit Salad": 28,
+        "Ice Cream (scoop)": 20,
+        "Cake Slice": 28,
+        "Waffles": 40,
+        "Assorted jollof": 50,
+    },
+    "Drinks": {
+        "Soft Drinks (Coca-Cola, Fanta, Sprite)": 20,
+        "Juices (Mango, Pineapple, Orange)": 28,
+        "Water (Bottled)": 13,
+        "Beer (Local)": 25,
+        "Beer (Imported)": 40,
+        "Local Gin (small)": 20,
+        "Local Gin (large)": 40,
+        "Palm wine (small)": 15,
+        "Palm wine (large)": 25,
+    },
+    "Other": {
+        "Tissues (per pack)": 8,
+        "Takeaway Containers": 8,
+    },
+}
+
+
+def _seed_menu(conn):
+    conn.executemany(
+        "INSERT OR IGNORE INTO menu_categories (name) VALUES (?)",
+        ((category,) for category in DEFAULT_MENU)
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO menu_items (category, item, price) VALUES (?, ?, ?)",
+        (
+            (category, item, price)
+            for category, items in DEFAULT_MENU.items()
+            for item, price in items.items()
+        )
+    )
+
+
+# Logins that used to be hard-coded in UserModel.
+DEFAULT_USERS = {
+    "admin": ("admin123", "admin"),
+    "cashier": ("cashier123", "cashier"),
+}
+
+
+def _seed_users(conn):
+    conn.execute("ALTER TABLE users ADD COLUMN role TEXT NOT NULL DEFAULT 'cashier'")
+    # The only account the users table shipped with is the administrator's.
+    conn.execute("UPDATE users SET role = 'admin' WHERE username = 'admin@example.com'")
+    conn.executemany(
+        "INSERT OR IGNORE INTO users "
+        "(username, hashed_password, security_question, security_answer, role) "
+        "VALUES (?, ?, '', '', ?)",
+        (
+            (username, hash_password(password), role)
+            for username, (password, role) in DEFAULT_USERS.items()
+        )
+    )
+
+
+def local_timestamp(dt):
+    # Seconds since 1970-01-01 00:00 *local* time. Hours and days can then
+    # be taken with plain integer division, which analytics relies on.
+    return calendar.timegm(dt.timetuple())
+
+
+# One row per order line: item ids, integer pesewa amounts and the order's
+# local timestamp, so reports never parse orders.order_details.
+ORDER_LINES_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS order_lines (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+        item_id INTEGER NOT NULL REFERENCES price_history_items(id),
+        quantity INTEGER NOT NULL,
+        unit_amount INTEGER NOT NULL,
+        amount INTEGER NOT NULL,
+        ordered_at INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_order_lines_order ON order_lines(order_id)",
+)
+INSERT_ITEM_NAME = "INSERT OR IGNORE INTO price_history_items (category, item) VALUES (?, ?)"
+INSERT_ORDER_LINE = (
+    "INSERT INTO order_lines (order_id, item_id, quantity, unit_amount, amount, ordered_at) "
+    "SELECT ?, id, ?, ?, ?, ? FROM price_history_items WHERE category = ? AND item = ?"
+)
+
+
+def insert_order_lines(conn, order_id, ordered_at, lines):
+    # lines: dicts with category, item, quantity, and unit_amount and amount
+    # in pesewas.
+    for line in lines:
+        conn.execute(INSERT_ITEM_NAME, (line["category"], line["item"]))
+        conn.execute(INSERT_ORDER_LINE, (
+            order_id, line["quantity"], line["unit_amount"], line["amount"],
+            ordered_at, line["category"], line["item"],
+        ))
+
+
+def _create_order_lines(conn):
+    for statement in ORDER_LINES_SCHEMA:
+        conn.execute(statement)
+    # Backfill from the JSON kept in orders.order_details; rows in any other
+    # format are skipped.
+    orders = conn.execute("SELECT id, time_of_order, order_details FROM orders").fetchall()
+    for order_id, time_of_order, details in orders:
+        try:
+            ordered_at = local_timestamp(
+                datetime.datetime.strptime(time_of_order, "%Y-%m-%d %H:%M:%S")
+            )
+            # Orders from before migration 9 hold prices as float cedis.
+            lines = [
+                {
+                    "category": line["category"], "item": line["item"],
+                    "quantity": line["quantity"],
+                    "unit_amount": Money.parse(line["unit_price"]),
+                    "amount": Money.parse(line["total_price"]),
+                }
+                for line in json.loads(details)
+            ]
+            insert_order_lines(conn, order_id, ordered_at, lines)
+        except (ValueError, TypeError, KeyError) as e:
+            print(f"Skipping order {order_id} in order_lines backfill:", e)
+
+
+# Keep price_history in step with menu_items (migrations 4 and 9).
+PRICE_HISTORY_TRIGGERS = """
+    CREATE TRIGGER IF NOT EXISTS trg_menu_items_price_insert
+    AFTER INSERT ON menu_items
+    BEGIN
+        INSERT OR IGNORE INTO price_history_items (category, item)
+            VALUES (NEW.category, NEW.item);
+        INSERT INTO price_history (item_id, price, effective_from)
+            SELECT id, NEW.price, strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+            FROM price_history_items WHERE category = NEW.category AND item = NEW.item;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_menu_items_price_delete
+    AFTER DELETE ON menu_items
+    BEGIN
+        INSERT INTO price_history (item_id, price, effective_from)
+            SELECT id, NULL, strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+            FROM price_history_items WHERE category = OLD.category AND item = OLD.item;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_menu_items_price_rename
+    AFTER UPDATE OF category, item ON menu_items
+    WHEN NEW.category IS NOT OLD.category OR NEW.item IS NOT OLD.item
+    BEGIN
+        INSERT INTO price_history (item_id, price, effective_from)
+            SELECT id, NULL, strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+            FROM price_history_items WHERE category = OLD.category AND item = OLD.item;
+        INSERT OR IGNORE INTO price_history_items (category, item)
+            VALUES (NEW.category, NEW.item);
+        INSERT INTO price_history (item_id, price, effective_from)
+            SELECT id, NEW.price, strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+            FROM price_history_items WHERE category = NEW.category AND item = NEW.item;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_menu_items_price_update
+    AFTER UPDATE OF price ON menu_items
+    WHEN NEW.category IS OLD.category AND NEW.item IS OLD.item
+        AND NEW.price IS NOT OLD.price
+    BEGIN
+        INSERT INTO price_history (item_id, price, effective_from)
+            SELECT id, NEW.price, strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+            FROM price_history_items WHERE category = NEW.category AND item = NEW.item;
+    END;
+"""
+
+
+def _fts_items(details):
+    # SQL for the item names in an order_details column, for orders_fts;
+    # details that are not a JSON array of objects index no items.
+    return (
+        f"CASE WHEN json_valid({details}) AND json_type({details}) = 'array' THEN ("
+        f"SELECT group_concat(json_extract(value, '$.item'), ' ') FROM json_each({details}) "
+        "WHERE type = 'object'"
+        ") ELSE '' END"
+    )
+
+
+# Keep orders_fts in step with orders (migrations 7 and 10).
+ORDERS_FTS_TRIGGERS = """
+    CREATE TRIGGER IF NOT EXISTS trg_orders_fts_insert
+    AFTER INSERT ON orders
+    BEGIN
+        INSERT INTO orders_fts (rowid, customer_name, items)
+            VALUES (NEW.id, NEW.customer_name, """ + _fts_items("NEW.order_details") + """);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_orders_fts_delete
+    AFTER DELETE ON orders
+    BEGIN
+        DELETE FROM orders_fts WHERE rowid = OLD.id;
+    END;
+"""
+
+
+# Schema migrations. Each step is an SQL script or a callable taking the
+# connection; steps are applied in order and tracked with PRAGMA user_version.
+MIGRATIONS = [
+    # 1: persistent menu store
+    """
+    CREATE TABLE IF NOT EXISTS menu_categories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS menu_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        category TEXT NOT NULL REFERENCES menu_categories(name)
+            ON UPDATE CASCADE ON DELETE CASCADE,
+        item TEXT NOT NULL,
+        price REAL NOT NULL
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_menu_items_category_item
+        ON menu_items(category, item);
+    CREATE TABLE IF NOT EXISTS orders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        customer_name TEXT NOT NULL,
+        total_cost REAL NOT NULL,
+        time_of_order TEXT NOT NULL,
+        order_details TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        hashed_password TEXT NOT NULL,
+        security_question TEXT NOT NULL,
+        security_answer TEXT NOT NULL
+    );
+    """,
+    # 2: initial menu for a fresh database
+    _seed_menu,
+    # 3: menu version, bumped on every edit and recorded with each order
+    """
+    CREATE TABLE IF NOT EXISTS menu_meta (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO menu_meta (id, version) VALUES (1, 1);
+    ALTER TABLE orders ADD COLUMN menu_version INTEGER;
+    """,
+    # 4: append-only price history. Every (category, item) name ever used
+    # gets a row in price_history_items; price_history holds its prices with
+    # the local time they took effect, NULL meaning the item was removed or
+    # renamed away. Triggers on menu_items record every change, including
+    # cascaded category deletes and renames. Prices from before this
+    # migration are unknown, so they are back-dated to the epoch.
+    """
+    CREATE TABLE IF NOT EXISTS price_history_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        category TEXT NOT NULL,
+        item TEXT NOT NULL,
+        UNIQUE (category, item)
+    );
+    CREATE TABLE IF NOT EXISTS price_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_id INTEGER NOT NULL REFERENCES price_history_items(id),
+        price REAL,
+        effective_from TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_price_history_item_time
+        ON price_history(item_id, effective_from);
+
+    INSERT OR IGNORE INTO price_history_items (category, item)
+        SELECT category, item FROM menu_items ORDER BY id;
+    INSERT INTO price_history (item_id, price, effective_from)
+        SELECT h.id, m.price, '1970-01-01 00:00:00.000'
+        FROM menu_items m JOIN price_history_items h USING (category, item)
+        ORDER BY m.id;
+
+    """ + PRICE_HISTORY_TRIGGERS,
+    # 5: roles and salted password hashes for the users table
+    _seed_users,
+    # 6: normalized order lines for reporting
+    _create_order_lines,
+    # 7: order history browsing. Pages are keyset queries on
+    # (time_of_order, id); orders_fts indexes the customer name and item
+    # names of each order under its id and is kept in step by triggers.
+    """
+    CREATE INDEX IF NOT EXISTS idx_orders_time_id ON orders(time_of_order, id);
+    CREATE VIRTUAL TABLE IF NOT EXISTS orders_fts USING fts5(
+        customer_name, items, tokenize = 'unicode61 remove_diacritics 2'
+    );
+    INSERT INTO orders_fts (rowid, customer_name, items)
+        SELECT id, customer_name, """ + _fts_items("order_details") + """
+        FROM orders;
+    """ + ORDERS_FTS_TRIGGERS,
+    # 8: persisted settings such as the invoice template
+    """
+    CREATE TABLE IF NOT EXISTS settings (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    """,
+    # 9: money as integer pesewas (see money.Money). menu_items and
+    # price_history are rebuilt because REAL affinity would turn stored
+    # integers back into floats. orders gains total_amount (total_cost is
+    # kept, in cedis, for older readers) and order_details lines switch from
+    # unit_price/total_price cedis to unit_amount/amount pesewas.
+    """
+    DROP TRIGGER IF EXISTS trg_menu_items_price_insert;
+    DROP TRIGGER IF EXISTS trg_menu_items_price_delete;
+    DROP TRIGGER IF EXISTS trg_menu_items_price_rename;
+    DROP TRIGGER IF EXISTS trg_menu_items_price_update;
+
+    CREATE TABLE menu_items_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        category TEXT NOT NULL REFERENCES menu_categories(name)
+            ON UPDATE CASCADE ON DELETE CASCADE,
+        item TEXT NOT NULL,
+        price INTEGER NOT NULL
+    );
+    INSERT INTO menu_items_new (id, category, item, price)
+        SELECT id, category, item, CAST(ROUND(price * 100) AS INTEGER) FROM menu_items;
+    DROP TABLE menu_items;
+    ALTER TABLE menu_items_new RENAME TO menu_items;
+    CREATE UNIQUE INDEX idx_menu_items_category_item ON menu_items(category, item);
+
+    CREATE TABLE price_history_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_id INTEGER NOT NULL REFERENCES price_history_items(id),
+        price INTEGER,
+        effective_from TEXT NOT NULL
+    );
+    INSERT INTO price_history_new (id, item_id, price, effective_from)
+        SELECT id, item_id, CAST(ROUND(price * 100) AS INTEGER), effective_from
+        FROM price_history;
+    DROP TABLE price_history;
+    ALTER TABLE price_history_new RENAME TO price_history;
+    CREATE INDEX idx_price_history_item_time ON price_history(item_id, effective_from);
+
+    ALTER TABLE orders ADD COLUMN total_amount INTEGER;
+    UPDATE orders SET total_amount = CAST(ROUND(total_cost * 100) AS INTEGER);
+    UPDATE orders SET order_details = (
+        SELECT json_group_array(json_object(
+            'category', json_extract(value, '$.category'),
+            'item', json_extract(value, '$.item'),
+            'quantity', json_extract(value, '$.quantity'),
+            'unit_amount', CAST(ROUND(json_extract(value, '$.unit_price') * 100) AS INTEGER),
+            'amount', CAST(ROUND(json_extract(value, '$.total_price') * 100) AS INTEGER)
+        ))
+        FROM json_each(order_details)
+    )
+    WHERE json_valid(order_details) AND json_type(order_details) = 'array'
+        AND NOT EXISTS (SELECT 1 FROM json_each(order_details) WHERE type != 'object');
+    """ + PRICE_HISTORY_TRIGGERS,
+    # 10: the orders_fts insert trigger failed on order details that were
+    # JSON but not an array of objects; recreate it to index no items then.
+    """
+    DROP TRIGGER IF EXISTS trg_orders_fts_insert;
+    DROP TRIGGER IF EXISTS trg_orders_fts_delete;
+    """ + ORDERS_FTS_TRIGGERS,
+]
+
+
+def connect(path=DB_PATH):
+    # Autocommit mode; writers open explicit transactions with BEGIN IMMEDIATE.
+    conn = sqlite3.connect(
+        path, isolation_level=None, check_same_thread=False,
+        cached_statements=256, timeout=10
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    migrate(conn)
+    return conn
+
+
+def migrate(conn):
+    # Another process may be migrating the same file, so each step takes the
+    # write lock first and re-reads user_version under it; steps it already
+    # applied are skipped.
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= number:
+                conn.execute("COMMIT")
+                continue
+            if callable(step):
+                step(conn)
+            else:
+                # Not executescript(), which would commit the open transaction.
+                for statement in _statements(step):
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+
+def _statements(script):
+    # Splits an SQL script into statements, keeping trigger bodies whole.
+    statement = ""
+    for part in script.split(";"):
+        statement += part + ";"
+        if sqlite3.complete_statement(statement):
+            if statement.strip().strip(";").strip():
+                yield statement
+            statement = ""
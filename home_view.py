@@ -0,0 +1,37 @@
+# home_view.py
+# The first window shown, kept apart from view.py so the till can paint it
+# before the other windows are imported.
+import customtkinter as ctk
+
+
+# --- HomeView ---
+# Painted straight away on a plain background; the controller loads the
+# background image on a worker thread and hands it to set_background.
+class HomeView(ctk.CTk):
+    def __init__(self, on_order, on_admin_login):
+        super().__init__()
+        self.title("Welcome to Coded Restaurant")
+        self.geometry("400x300")
+        self.resizable(False, False)
+        ctk.set_appearance_mode("dark")
+        ctk.set_default_color_theme("dark-blue")
+        self.configure(fg_color="gray20")
+        ctk.CTkLabel(
+            self, text="Welcome to Coded Restaurant",
+            font=("Helvetica Bold-Oblique", 22)
+        ).pack(pady=20)
+        ctk.CTkButton(
+            self, text="Place Order", font=("Helvetica", 16),
+            command=on_order, fg_color="#2980b9"
+        ).pack(pady=10)
+        ctk.CTkButton(
+            self, text="Admin Login", font=("Helvetica", 16),
+            command=on_admin_login, fg_color="#2980b9"
+        ).pack(pady=10)
+
+    def set_background(self, img):
+        # img is a CTkImage sized for the window.
+        lbl = ctk.CTkLabel(self, image=img, text="")
+        lbl.image = img
+        lbl.place(relx=0, rely=0, relwidth=1, relheight=1)
+        lbl.lower()
@@ -0,0 +1,95 @@
+# image_cache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import customtkinter as ctk
+from PIL import Image, ImageTk
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".image_cache")
+
+
+# Process-wide cache of resized images keyed by (kind, path, size, mtime).
+# Resized copies are kept in memory with LRU eviction under a byte budget and
+# written to CACHE_DIR, so a cold start loads a small PNG instead of decoding
+# and LANCZOS-resizing the original.
+class ImageCache:
+    def __init__(self, budget_bytes=64 * 1024 * 1024, cache_dir=CACHE_DIR):
+        self.budget = budget_bytes
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict()
+        self.used = 0
+        self.lock = threading.Lock()
+
+    def get_image(self, path, size):
+        # Resized PIL image; safe to call from worker threads.
+        return self._get("pil", path, size, self._load_resized)
+
+    def get_ctk_image(self, path, size):
+        return self._get("ctk", path, size, self._make_ctk_image)
+
+    def get_photo_image(self, path, size):
+        return self._get("photo", path, size, self._make_photo_image)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.used = 0
+
+    def _get(self, kind, path, size, factory):
+        path = os.path.abspath(path)
+        size = tuple(size)
+        key = (kind, path, size, os.stat(path).st_mtime_ns)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                return entry[0]
+        value = factory(path, size, key[3])
+        # PIL keeps one RGBA-sized buffer; CTk/Tk images add a rendered copy.
+        cost = size[0] * size[1] * (4 if kind == "pil" else 8)
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = (value, cost)
+                self.used += cost
+                while self.used > self.budget and len(self.entries) > 1:
+                    _, (_, old_cost) = self.entries.popitem(last=False)
+                    self.used -= old_cost
+        return value
+
+    def _make_ctk_image(self, path, size, mtime):
+        img = self.get_image(path, size)
+        return ctk.CTkImage(light_image=img, dark_image=img, size=size)
+
+    def _make_photo_image(self, path, size, mtime):
+        return ImageTk.PhotoImage(self.get_image(path, size))
+
+    def _load_resized(self, path, size, mtime):
+        name = os.path.splitext(os.path.basename(path))[0]
+        digest = hashlib.sha1(path.encode()).hexdigest()[:8]
+        stem = f"{name}-{digest}-{size[0]}x{size[1]}"
+        cached = os.path.join(self.cache_dir, f"{stem}-{mtime}.png")
+        try:
+            with Image.open(cached) as img:
+                img.load()
+                return img
+        except OSError:
+            pass
+        with Image.open(path) as src:
+            img = src.resize(size, Image.Resampling.LANCZOS)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Drop thumbnails of older versions of the same file and size.
+            for name in os.listdir(self.cache_dir):
+                if name.startswith(stem + "-") and name != os.path.basename(cached):
+                    os.remove(os.path.join(self.cache_dir, name))
+            tmp = f"{cached}.{os.getpid()}.tmp"
+            img.save(tmp, format="PNG")
+            os.replace(tmp, cached)
+        except OSError as e:
+            print("Image cache write error:", e)
+        return img
+
+
+images = ImageCache()
@@ -0,0 +1,181 @@
+# invoice_export.py
+# End-of-day export: every order in a date range rendered with the current
+# invoice template, as one .txt and one .pdf file per order.
+#   python invoice_export.py --from 2026-10-01 --to 2026-10-02 --out exports
+# Orders are streamed from the database in keyset batches and rendered in
+# chunks on a process pool. Only a few chunks are in flight at a time and
+# each worker writes its own files, so memory use does not depend on the
+# number of orders in the range.
+import argparse
+import datetime
+import os
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from database import DB_PATH
+from invoice_template import InvoiceTemplate
+from model import OrderHistoryModel, SettingsModel
+from service import DEFAULT_INVOICE_TEMPLATE, render_invoice, stored_order_model
+
+# Outcome of export_invoices; errors is a list of (order id, message) for
+# orders that were skipped.
+ExportResult = namedtuple("ExportResult", "exported errors")
+
+# A4 in points, Courier 10 on a 12 pt leading.
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+MARGIN = 50
+FONT_SIZE = 10
+LEADING = 12
+LINES_PER_PAGE = (PAGE_HEIGHT - 2 * MARGIN) // LEADING
+
+
+def text_pdf(text):
+    # Minimal single-font PDF of plain text; long pages are split. Text is
+    # limited to Latin-1, other characters are replaced.
+    lines = text.expandtabs(4).splitlines() or [""]
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+    # 1 catalog, 2 page tree, 3 font, then a page and a content stream per page.
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages))), len(pages)
+        ).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>",
+    ]
+    for i, page in enumerate(pages):
+        stream = [f"BT /F1 {FONT_SIZE} Tf {LEADING} TL {MARGIN} {PAGE_HEIGHT - MARGIN} Td".encode()]
+        for line in page:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            stream.append(b"(" + escaped.encode("latin-1", "replace") + b") '")
+        stream.append(b"ET")
+        content = b"\n".join(stream)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(
+            f"<< /Length {len(content)} >>\nstream\n".encode() + content + b"\nendstream"
+        )
+    out = [b"%PDF-1.4\n"]
+    offsets = []
+    size = len(out[0])
+    for number, body in enumerate(objects, start=1):
+        chunk = f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+        offsets.append(size)
+        out.append(chunk)
+        size += len(chunk)
+    out.append(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    out.extend(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out.append(
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{size}\n%%EOF\n".encode()
+    )
+    return b"".join(out)
+
+
+# --- Worker side ---
+# Each worker compiles the template once, then renders and writes a chunk
+# of orders per task.
+
+_template = None
+
+
+def _init_worker(template_source):
+    global _template
+    _template = InvoiceTemplate(template_source)
+
+
+def _export_chunk(orders, out_dir, pdf):
+    # Returns (orders written, [(order id, error message)]); an order that
+    # cannot be exported is skipped, not the rest of the chunk.
+    written = 0
+    errors = []
+    for stored in orders:
+        try:
+            text = render_invoice(_template, stored_order_model(stored))
+            day_dir = os.path.join(out_dir, stored["time_of_order"][:10])
+            os.makedirs(day_dir, exist_ok=True)
+            stem = os.path.join(day_dir, f"invoice-{stored['id']:08d}")
+            with open(stem + ".txt", "w", encoding="utf-8") as f:
+                f.write(text)
+            if pdf:
+                with open(stem + ".pdf", "wb") as f:
+                    f.write(text_pdf(text))
+        except Exception as e:
+            errors.append((stored["id"], str(e)))
+        else:
+            written += 1
+    return written, errors
+
+
+def _chunks(orders, size):
+    chunk = []
+    for order in orders:
+        chunk.append(order)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_invoices(start, end, out_dir, db_path=DB_PATH, workers=None, pdf=True,
+                    chunk_size=50, on_progress=None):
+    # Exports orders with start <= time_of_order < end (datetimes) and
+    # returns an ExportResult. on_progress(count) is called as chunks
+    # complete.
+    template = SettingsModel(db_path).get("invoice_template", DEFAULT_INVOICE_TEMPLATE)
+    InvoiceTemplate(template)  # Fail here, not in every worker.
+    orders = OrderHistoryModel(db_path).iter_orders(
+        start.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S")
+    )
+    workers = workers or os.cpu_count() or 1
+    done = 0
+    errors = []
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(template,)) as pool:
+        in_flight = set()
+        for chunk in _chunks(orders, chunk_size):
+            # Backpressure: keep at most two chunks per worker queued.
+            if len(in_flight) >= 2 * workers:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    written, failed = future.result()
+                    done += written
+                    errors += failed
+                if on_progress:
+                    on_progress(done)
+            in_flight.add(pool.submit(_export_chunk, chunk, out_dir, pdf))
+        for future in in_flight:
+            written, failed = future.result()
+            done += written
+            errors += failed
+    if on_progress:
+        on_progress(done)
+    errors.sort()
+    return ExportResult(done, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export invoices for a date range")
+    parser.add_argument("--from", dest="start", required=True,
+                        type=datetime.datetime.fromisoformat, help="first day, e.g. 2026-10-01")
+    parser.add_argument("--to", dest="end", type=datetime.datetime.fromisoformat,
+                        help="day after the last one (default: the day after --from)")
+    parser.add_argument("--out", default="invoices", help="output directory")
+    parser.add_argument("--workers", type=int, help="PDF worker processes (default: CPU count)")
+    parser.add_argument("--no-pdf", action="store_true", help="write text files only")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+    end = args.end or args.start + datetime.timedelta(days=1)
+    result = export_invoices(
+        args.start, end, args.out, args.db, args.workers, not args.no_pdf,
+        on_progress=lambda n: print(f"\r{n} invoices exported", end="", flush=True)
+    )
+    print(f"\r{result.exported} invoices exported to {os.path.abspath(args.out)}")
+    if result.errors:
+        print(f"{len(result.errors)} orders could not be exported:")
+        for order_id, message in result.errors:
+            print(f"  #{order_id}: {message}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# invoice_template.py
+import re
+import string
+from collections.abc import Mapping
+from itertools import repeat
+from operator import attrgetter, truediv
+
+from money import Money
+
+# Placeholders available at the top level of an invoice template, with a
+# sample value used to check format specs when a template is compiled.
+INVOICE_FIELDS = {
+    "order_time": "2000-01-01 00:00:00",
+    "items": [],
+    "item_count": 0,
+    "total": Money(0),
+}
+
+# Placeholders available inside an {#items}...{/items} section.
+LINE_FIELDS = {
+    "category": "",
+    "item": "",
+    "quantity": 0,
+    "unit_price": Money(0),
+    "total_price": Money(0),
+}
+
+# Line layout used when a template contains a bare {items} placeholder.
+DEFAULT_LINE_TEMPLATE = (
+    "{item} x {quantity} @ GHS {unit_price:.2f} = GHS {total_price:.2f}\n"
+)
+
+# Integers up to this size are exact as floats.
+FLOAT_EXACT = 2 ** 53
+
+# {{ and }} are literal braces; {#name}...{/name} repeats its body for each
+# order line; {?name}...{/name} is only rendered when name is truthy.
+TOKEN_RE = re.compile(r"\{\{|\}\}|\{([#?/]?)([^{}]*)\}|[{}]")
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class InvoiceTemplate:
+    def __init__(self, source):
+        self.source = source
+        # Sections are rendered on their own and passed into a single
+        # top-level format string as positional fields {0}, {1}, ...
+        self.sections = []
+        fmt = []
+        for part in _compile(source, INVOICE_FIELDS):
+            if isinstance(part, str):
+                fmt.append(part)
+            else:
+                fmt.append(f"{{{len(self.sections)}}}")
+                self.sections.append(part)
+        self.format = "".join(fmt)
+
+    def render(self, **context):
+        sections = []
+        for part in self.sections:
+            out = []
+            _render_section(part, context, out)
+            sections.append("".join(out))
+        return self.format.format(*sections, **context)
+
+
+def _compile(source, fields):
+    parts, _, closing = _parse(source, 0, fields, None)
+    if closing is not None:
+        raise TemplateError(f"Unexpected {{/{closing}}}")
+    return parts
+
+
+def _parse(source, pos, fields, section):
+    # Returns (parts, position after the section, name of the closing tag).
+    # Runs of literal text and fields are merged into one str.format string
+    # rendered with format_map; sections become (kind, name, parts) tuples.
+    parts = []
+    literal = []
+    while True:
+        match = TOKEN_RE.search(source, pos)
+        if match is None:
+            break
+        literal.append(_escape(source[pos:match.start()]))
+        pos = match.end()
+        token = match.group(0)
+        if token in ("{{", "}}"):
+            literal.append(token)
+            continue
+        if token in ("{", "}"):
+            raise TemplateError(f"Unmatched '{token}' at position {match.start()}")
+        kind, body = match.group(1), match.group(2).strip()
+        name, _, spec = body.partition(":")
+        if "!" in name or not name:
+            raise TemplateError(f"Invalid placeholder {token}")
+        if kind == "/":
+            if name != section:
+                raise TemplateError(f"Unexpected {token}")
+            _flush(literal, parts)
+            return parts, pos, name
+        if name not in fields:
+            raise TemplateError(f"Unknown placeholder '{name}'")
+        if kind in ("#", "?") or name == "items" and fields is INVOICE_FIELDS:
+            _flush(literal, parts)
+        if kind == "#":
+            if name != "items" or fields is not INVOICE_FIELDS:
+                raise TemplateError(f"'{name}' cannot be repeated")
+            body_parts, pos, closing = _parse(source, pos, LINE_FIELDS, name)
+            if closing != name:
+                raise TemplateError(f"Missing {{/{name}}}")
+            parts.append(("#", name, _line_layout(body_parts)))
+        elif kind == "?":
+            body_parts, pos, closing = _parse(source, pos, fields, name)
+            if closing != name:
+                raise TemplateError(f"Missing {{/{name}}}")
+            parts.append(("?", name, body_parts))
+        elif name == "items" and fields is INVOICE_FIELDS:
+            if spec:
+                raise TemplateError("'items' does not take a format spec")
+            parts.append(("#", name, _line_layout(_compile(DEFAULT_LINE_TEMPLATE, LINE_FIELDS))))
+        else:
+            try:
+                format(fields[name], spec)
+            except (ValueError, TypeError) as e:
+                raise TemplateError(f"Invalid format for '{name}': {e}") from None
+            literal.append(f"{{{name}:{spec}}}" if spec else f"{{{name}}}")
+    literal.append(_escape(source[pos:]))
+    _flush(literal, parts)
+    return parts, len(source), None
+
+
+def _escape(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def _flush(literal, parts):
+    text = "".join(literal)
+    literal.clear()
+    if text:
+        parts.append(text)
+
+
+def _line_layout(body):
+    # A section body that is a single format string gets a LineLayout.
+    if len(body) == 1 and isinstance(body[0], str):
+        return LineLayout(body[0])
+    return body
+
+
+# A plain {#items} body. Lines whose Money fields are shown as plain cedis
+# ("" or ".2f") are rendered a column at a time: one C-level attrgetter per
+# field collects its values from every line, Money columns are passed as
+# pesewas / 100 and printed as floats, and each line is one positional
+# str.format call, so no Python code runs per line or per cell. Below 2**53
+# pesewas the float is exact to the pesewa, so the text matches
+# Money.__format__. Anything else (mapping lines, other specs, amounts out of
+# that range) gets one format_map per line over the compiled body.
+class LineLayout:
+    def __init__(self, body):
+        self.body = body
+        self.getters = []
+        # Indexes of the Money fields formatted from floats.
+        self.money_fields = []
+        fmt = []
+        for literal, name, spec, _ in string.Formatter().parse(body):
+            fmt.append(_escape(literal))
+            if name is None:
+                continue
+            if isinstance(LINE_FIELDS[name], Money) and spec in ("", ".2f"):
+                self.money_fields.append(len(self.getters))
+                spec = ".2f"
+            fmt.append(f"{{:{spec}}}" if spec else "{}")
+            self.getters.append(attrgetter(name))
+        self.format = "".join(fmt)
+
+    def render(self, lines, out):
+        if self.money_fields and lines and not isinstance(lines[0], Mapping):
+            columns = [list(map(get, lines)) for get in self.getters]
+            if all(_exact_cedis(columns[i]) for i in self.money_fields):
+                for i in self.money_fields:
+                    columns[i] = map(truediv, columns[i], repeat(100))
+                out.extend(map(self.format.format, *columns))
+                return
+        out.extend(map(self.body.format_map, lines))
+
+
+def _exact_cedis(values):
+    # True if every value is a Money whose cedis float is exact.
+    return (
+        set(map(type, values)) == {Money}
+        and -FLOAT_EXACT < min(values) and max(values) < FLOAT_EXACT
+    )
+
+
+def _render(parts, context, out):
+    for part in parts:
+        if isinstance(part, str):
+            out.append(part.format_map(context))
+        else:
+            _render_section(part, context, out)
+
+
+def _render_section(part, context, out):
+    kind, name, body = part
+    if isinstance(body, LineLayout):
+        body.render(context[name], out)
+    elif kind == "#":
+        for line in context[name]:
+            _render(body, line, out)
+    elif context[name]:
+        _render(body, context, out)
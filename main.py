@@ -1,5 +1,33 @@
-from controller import Controller
+import argparse
+
+from startup import profile
 
 if __name__ == "__main__":
-    app = Controller()
-    app.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Coded Restaurant till")
+    parser.add_argument(
+        "--server", metavar="URL",
+        help="take orders through a shared order service (see server.py)"
+    )
+    parser.add_argument(
+        "--metrics", action="store_true",
+        help="record operation latencies (Admin > Diagnostics, metrics/metrics.jsonl)"
+    )
+    parser.add_argument(
+        "--watchdog", metavar="MS", type=int, nargs="?", const=250,
+        help="report Tk callbacks that block the UI for longer than MS (default 250)"
+    )
+    parser.add_argument(
+        "--profile-startup", action="store_true",
+        help="print an import and startup timeline once the home screen is ready"
+    )
+    args = parser.parse_args()
+    if args.profile_startup:
+        profile.start()
+    # Imported here so the startup profile covers it.
+    from controller import Controller
+    service = None
+    if args.server:
+        from client import ServiceClient
+        service = ServiceClient(args.server)
+    app = Controller(service, instrument=args.metrics, stall_ms=args.watchdog)
+    app.run()
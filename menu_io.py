@@ -0,0 +1,147 @@
+# menu_io.py
+# Bulk menu import/export in CSV, JSON Lines or JSON.
+#   python menu_io.py import branch_menu.csv [--strict]
+#   python menu_io.py export menu.jsonl
+# CSV files need a "category,item,price" header; JSON Lines and JSON files
+# hold {"category": ..., "item": ..., "price": ...} objects (a JSON file may
+# also be a {category: {item: price}} mapping). CSV and JSON Lines are read
+# and written one row at a time.
+import argparse
+import csv
+import json
+import os
+
+FIELDS = ("category", "item", "price")
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "json"}
+
+
+def detect_format(path):
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported menu file type: {path} (use .csv, .jsonl or .json)")
+    return fmt
+
+
+def read_rows(path, fmt=None):
+    # Yields (line, record): record is a dict with FIELDS, or an error
+    # message for a row that could not be parsed.
+    fmt = fmt or detect_format(path)
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if fmt == "csv":
+            yield from _read_csv(f)
+        elif fmt == "jsonl":
+            yield from _read_jsonl(f)
+        else:
+            yield from _read_json(f)
+
+
+def _read_csv(f):
+    reader = csv.DictReader(f)
+    missing = [name for name in FIELDS if name not in (reader.fieldnames or ())]
+    if missing:
+        yield 1, f"Missing column(s): {', '.join(missing)}"
+        return
+    for record in reader:
+        yield reader.line_num, record
+
+
+def _read_jsonl(f):
+    for line, text in enumerate(f, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError as e:
+            yield line, f"Invalid JSON: {e.msg}"
+            continue
+        yield line, record if isinstance(record, dict) else "Expected a JSON object"
+
+
+def _read_json(f):
+    # Plain JSON has no streaming parser in the standard library, so the
+    # document is loaded whole; records are numbered from 1.
+    try:
+        data = json.load(f)
+    except json.JSONDecodeError as e:
+        yield e.lineno, f"Invalid JSON: {e.msg}"
+        return
+    if isinstance(data, dict):
+        data = data.get("menu", data)
+        records = (
+            {"category": category, "item": item, "price": price}
+            for category, items in data.items()
+            for item, price in (items.items() if isinstance(items, dict) else ())
+        )
+    elif isinstance(data, list):
+        records = data
+    else:
+        yield 1, "Expected a list of items or a {category: {item: price}} mapping"
+        return
+    for number, record in enumerate(records, start=1):
+        yield number, record if isinstance(record, dict) else "Expected a JSON object"
+
+
+def write_rows(menu, path, fmt=None):
+    # Writes every item of a menu snapshot; returns the number of rows.
+    fmt = fmt or detect_format(path)
+    count = 0
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+        elif fmt == "json":
+            f.write("[\n")
+        for category, items in menu.items():
+            for item, price in items.items():
+                if fmt == "csv":
+                    writer.writerow((category, item, price))
+                else:
+                    record = json.dumps(
+                        {"category": category, "item": item, "price": price.cedis}
+                    )
+                    if fmt == "json":
+                        f.write(",\n  " if count else "  ")
+                        f.write(record)
+                    else:
+                        f.write(record + "\n")
+                count += 1
+        if fmt == "json":
+            f.write("\n]\n")
+    os.replace(tmp, path)
+    return count
+
+
+def main():
+    from model import MenuModel
+
+    parser = argparse.ArgumentParser(description="Bulk menu import/export")
+    parser.add_argument("action", choices=("import", "export"))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())),
+                        help="file format (default: from the file extension)")
+    parser.add_argument("--strict", action="store_true",
+                        help="import nothing if any row is invalid")
+    parser.add_argument("--db", help="database file (default: restaurant.db)")
+    args = parser.parse_args()
+    model = MenuModel(args.db) if args.db else MenuModel()
+    try:
+        if args.action == "export":
+            count = write_rows(model.get_menu(), args.path, args.format)
+            print(f"Exported {count} items to {args.path}")
+            return 0
+        result = model.bulk_upsert(read_rows(args.path, args.format), strict=args.strict)
+    except (OSError, ValueError) as e:
+        print("Menu file error:", e)
+        return 1
+    for line, message in result.errors:
+        print(f"{args.path}:{line}: {message}")
+    print(
+        f"{result.inserted} added, {result.updated} updated, "
+        f"{result.unchanged} unchanged, {len(result.errors)} rejected"
+    )
+    return 1 if result.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,205 @@
+# metrics.py
+import datetime
+import json
+import math
+import os
+import threading
+import time
+
+METRICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "metrics")
+
+
+# Latency histogram with logarithmic buckets about 4% wide, so percentiles
+# are within a few percent of the true value at any scale while memory stays
+# a handful of counters per operation. Exact count, sum, min and max are kept
+# alongside.
+class Histogram:
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    FLOOR = 1e-7
+    SCALE = 1 / math.log(1.04)
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, seconds):
+        bucket = int(math.log(max(seconds, self.FLOOR) / self.FLOOR) * self.SCALE)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p):
+        # Geometric midpoint of the bucket holding the p-th percentile,
+        # clamped to the observed range.
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                value = self.FLOOR * math.exp((bucket + 0.5) / self.SCALE)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        # Milliseconds, as shown in the diagnostics window and the metrics file.
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+# Process-wide, opt-in latency instrumentation. Nothing is measured until
+# enable(); instrument() and instrument_views() then wrap methods in place,
+# so a till started without metrics runs its original, unwrapped code.
+#   metrics.instrument(controller, ["open_order_view", ...])
+#   metrics.instrument_views([OrderView, AdminPanelView, ...])
+# Operation names are "controller.<method>" for the Tk-thread time of an
+# entry point and "controller.<method> (done)" from the call until the
+# callbacks of the tasks it submitted have run (see TaskRunner). Views record
+# "view.<Class>" construction time and widget counts.
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.histograms = {}
+        # view name -> {"open", "widgets", "max_widgets"}
+        self.windows = {}
+        # (operation name, start time) of the entry point running on the Tk
+        # thread, picked up by TaskRunner.submit.
+        self.current = None
+        self.started = time.time()
+        self.logger = None
+        # name -> callable returning extra JSON data for snapshots, e.g.
+        # the stall watchdog's report.
+        self.reports = {}
+
+    def enable(self, directory=METRICS_DIR, max_bytes=1_000_000, backups=5):
+        # Snapshots written by export() go to directory/metrics.jsonl,
+        # rotated at max_bytes with `backups` older files kept.
+        import logging
+        from logging.handlers import RotatingFileHandler
+
+        if self.enabled:
+            return
+        self.enabled = True
+        try:
+            os.makedirs(directory, exist_ok=True)
+            handler = RotatingFileHandler(
+                os.path.join(directory, "metrics.jsonl"), maxBytes=max_bytes,
+                backupCount=backups, encoding="utf-8"
+            )
+        except OSError as e:
+            print("Metrics file error:", e)
+            return
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.logger = logging.getLogger("restaurant.metrics")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(handler)
+
+    def record(self, name, seconds):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def instrument(self, obj, names, prefix="controller"):
+        # Replaces obj.<name> with a timed wrapper for each of names.
+        for name in names:
+            setattr(obj, name, self._timed(f"{prefix}.{name}", getattr(obj, name)))
+
+    def _timed(self, name, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            outer, self.current = self.current, (name, start)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.current = outer
+                self.record(name, time.perf_counter() - start)
+        return timed
+
+    def instrument_views(self, classes):
+        # Wraps each window class's __init__ and destroy.
+        for cls in classes:
+            name = f"view.{cls.__name__}"
+            cls.__init__ = self._timed_init(name, cls.__init__)
+            cls.destroy = self._counted_destroy(name, cls.destroy)
+
+    def _timed_init(self, name, init):
+        def timed_init(window, *args, **kwargs):
+            start = time.perf_counter()
+            init(window, *args, **kwargs)
+            self.record(name, time.perf_counter() - start)
+            widgets = count_widgets(window)
+            with self.lock:
+                stats = self.windows.setdefault(name, {"open": 0, "widgets": 0, "max_widgets": 0})
+                stats["open"] += 1
+                stats["widgets"] = widgets
+                stats["max_widgets"] = max(stats["max_widgets"], widgets)
+        return timed_init
+
+    def _counted_destroy(self, name, destroy):
+        def counted_destroy(window):
+            # Windows can be destroyed more than once; only count the first.
+            if not getattr(window, "_metrics_destroyed", False):
+                window._metrics_destroyed = True
+                with self.lock:
+                    stats = self.windows.get(name)
+                    if stats:
+                        stats["open"] = max(stats["open"] - 1, 0)
+            destroy(window)
+        return counted_destroy
+
+    def add_report(self, name, report):
+        self.reports[name] = report
+
+    def snapshot(self):
+        extra = {name: report() for name, report in self.reports.items()}
+        with self.lock:
+            return {
+                "time": datetime.datetime.now().isoformat(timespec="seconds"),
+                "uptime_s": round(time.time() - self.started, 1),
+                "operations": {
+                    name: histogram.summary()
+                    for name, histogram in sorted(self.histograms.items())
+                },
+                "windows": {name: dict(stats) for name, stats in sorted(self.windows.items())},
+                **extra,
+            }
+
+    def export(self):
+        # Appends a snapshot to the metrics file as one JSON line.
+        if self.logger is not None:
+            self.logger.info(json.dumps(self.snapshot()))
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.started = time.time()
+
+
+def count_widgets(widget):
+    count = 0
+    stack = [widget]
+    while stack:
+        children = stack.pop().winfo_children()
+        count += len(children)
+        stack.extend(children)
+    return count
+
+
+metrics = Metrics()
@@ -1,158 +1,707 @@
 # model.py
 import datetime
+import hmac
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from database import DB_PATH, connect
+from money import Money
+from passwords import DEFAULT_ITERATIONS, hash_password, needs_rehash, verify_password
+from search import MenuSearchIndex, tokenize
+
+# Published to MenuModel listeners after each successful edit. kind is one of
+# the MenuModel.* event names; fields not relevant to an event are None.
+MenuChange = namedtuple("MenuChange", "kind category item new_item price")
+
+# Outcome of MenuModel.bulk_upsert; errors is a list of (line, message).
+BulkResult = namedtuple("BulkResult", "inserted updated unchanged errors")
+
+
+# Raised for a stored order whose details cannot be turned back into lines
+# (a legacy or corrupt orders row).
+class UnreadableOrder(ValueError):
+    pass
+
+
+# Immutable, versioned view of the whole menu: category -> read-only
+# item -> price mapping. version matches menu_meta.version in the database.
+class MenuSnapshot(Mapping):
+    __slots__ = ("categories", "version")
+
+    def __init__(self, categories, version):
+        self.categories = categories
+        self.version = version
+
+    def __getitem__(self, category):
+        return self.categories[category]
+
+    def __iter__(self):
+        return iter(self.categories)
+
+    def __len__(self):
+        return len(self.categories)
+
+    def __contains__(self, category):
+        return category in self.categories
+
+    def get(self, category, default=None):
+        return self.categories.get(category, default)
+
+    def keys(self):
+        return self.categories.keys()
+
+    def items(self):
+        return self.categories.items()
+
+    def values(self):
+        return self.categories.values()
+
 
 class MenuModel:
-    def __init__(self):
-        self.menu = {
-            "Appetizers": {
-                "Spring Rolls (Small)": 25,
-                "Spring Rolls (Medium)": 38,
-                "Spring Rolls (Large)": 53,
-                "Samosas (3 pieces)": 20,
-                "Kelete (Plantain Chips)": 15,
-                "Chicken Wings (6 pieces)": 38,
-                "Pepper Soup (small)": 33,
-                "Asanka Local Salad": 28,
-            },
-            "Main Courses": {
-                "Banku & Tilapia": 50,
-                "Tilapia": 30,
-                "Banku": 20,
-                "Fufu & Groundnut Soup": 65,
-                "Fufu & Light Soup": 60,
-                "Jollof Rice with Fish": 58,
-                "Jollof Rice with Chicken": 55,
-                "Fried Rice with Chicken": 53,
-                "Waakye": 40,
-                "Kenkey & Fried Fish and Pepper Sauce": 45,
-                "Pounded Fufu & Goat Light Soup": 75,
-                "Pizza (Small)": 65,
-                "Pizza (Medium)": 100,
-                "Pizza (Large)": 150,
-                "Burger (Single)": 50,
-                "Burger (Double)": 70,
-                "Spaghetti": 40,
-            },
-            "Desserts": {
-                "Fruit Salad": 28,
-                "Ice Cream (scoop)": 20,
-                "Cake Slice": 28,
-                "Waffles": 40,
-                "Assorted jollof": 50,
-            },
-            "Drinks": {
-                "Soft Drinks (Coca-Cola, Fanta, Sprite)": 20,
-                "Juices (Mango, Pineapple, Orange)": 28,
-                "Water (Bottled)": 13,
-                "Beer (Local)": 25,
-                "Beer (Imported)": 40,
-                "Local Gin (small)": 20,
-                "Local Gin (large)": 40,
-                "Palm wine (small)": 15,
-                "Palm wine (large)": 25,
-            },
-            "Other": {
-                "Tissues (per pack)": 8,
-                "Takeaway Containers": 8,
-            },
-        }
+    PRICE_CHANGED = "price_changed"
+    ITEM_ADDED = "item_added"
+    ITEM_REMOVED = "item_removed"
+    ITEM_RENAMED = "item_renamed"
+    CATEGORY_ADDED = "category_added"
+    CATEGORY_REMOVED = "category_removed"
+    # Many items changed at once (bulk import); listeners should reload.
+    MENU_RELOADED = "menu_reloaded"
+
+    # SQL is kept in constants so sqlite3's statement cache reuses the
+    # prepared statements across calls.
+    SELECT_VERSION = "SELECT version FROM menu_meta WHERE id = 1"
+    BUMP_VERSION = "UPDATE menu_meta SET version = version + 1 WHERE id = 1"
+    SELECT_CATEGORIES = "SELECT name FROM menu_categories ORDER BY id"
+    SELECT_ITEMS = "SELECT category, item, price FROM menu_items ORDER BY id"
+    UPDATE_PRICE = "UPDATE menu_items SET price = ? WHERE category = ? AND item = ?"
+    INSERT_CATEGORY = "INSERT INTO menu_categories (name) VALUES (?)"
+    INSERT_ITEM = "INSERT INTO menu_items (category, item, price) VALUES (?, ?, ?)"
+    DELETE_ITEM = "DELETE FROM menu_items WHERE category = ? AND item = ?"
+    DELETE_CATEGORY = "DELETE FROM menu_categories WHERE name = ?"
+    UPDATE_PRODUCT = (
+        "UPDATE menu_items SET item = ?, price = ? WHERE category = ? AND item = ?"
+    )
+    INSERT_CATEGORY_IF_MISSING = "INSERT OR IGNORE INTO menu_categories (name) VALUES (?)"
+    UPSERT_ITEM = (
+        "INSERT INTO menu_items (category, item, price) VALUES (?, ?, ?) "
+        "ON CONFLICT (category, item) DO UPDATE SET price = excluded.price "
+        "WHERE price IS NOT excluded.price"
+    )
+    # Point-in-time lookups seek idx_price_history_item_time per item, so
+    # they stay logarithmic in the length of the history.
+    SELECT_PRICE_AT = (
+        "SELECT h.price FROM price_history h "
+        "JOIN price_history_items i ON i.id = h.item_id "
+        "WHERE i.category = ? AND i.item = ? AND h.effective_from <= ? "
+        "ORDER BY h.effective_from DESC, h.id DESC LIMIT 1"
+    )
+    SELECT_MENU_AT = (
+        "SELECT category, item, ("
+        "SELECT h.price FROM price_history h "
+        "WHERE h.item_id = i.id AND h.effective_from <= ? "
+        "ORDER BY h.effective_from DESC, h.id DESC LIMIT 1"
+        ") FROM price_history_items i ORDER BY i.id"
+    )
+    SELECT_PRICE_HISTORY = (
+        "SELECT h.effective_from, h.price FROM price_history h "
+        "JOIN price_history_items i ON i.id = h.item_id "
+        "WHERE i.category = ? AND i.item = ? ORDER BY h.effective_from, h.id"
+    )
+
+    def __init__(self, db_path=DB_PATH):
+        self.conn = connect(db_path)
+        self.lock = threading.RLock()
+        # Current MenuSnapshot, loaded on first use.
+        self.menu = None
+        self.listeners = []
+        # Built on the first search, then kept up to date on every edit.
+        # search_lock guards only the index and is never held during database
+        # I/O, so a search does not wait for a write or an import.
+        self.search_index = None
+        self.search_lock = threading.Lock()
+
+    def subscribe(self, listener):
+        # listener(change) is called with a MenuChange after every edit.
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def search(self, query, limit=20):
+        # Ranked (category, item) keys whose names match query.
+        while True:
+            with self.search_lock:
+                if self.search_index is not None:
+                    return self.search_index.search(query, limit)
+            self.build_search_index()
+
+    def build_search_index(self):
+        # Builds the index if no search has yet; the till calls this on a
+        # worker at startup so the first search does not pay for it. The
+        # index is built from a snapshot without any lock held, and only
+        # published if no edit has replaced that snapshot meanwhile.
+        while self.search_index is None:
+            menu = self.get_menu()
+            index = MenuSearchIndex()
+            index.rebuild(menu)
+            with self.search_lock:
+                if self.search_index is None and self.menu is menu:
+                    self.search_index = index
+
+    def _update_search_index(self, change):
+        with self.search_lock:
+            index = self.search_index
+            if index is None:
+                return
+            if change.kind == self.ITEM_ADDED:
+                index.add(change.category, change.item)
+            elif change.kind == self.ITEM_REMOVED:
+                index.remove(change.category, change.item)
+            elif change.kind == self.ITEM_RENAMED:
+                index.remove(change.category, change.item)
+                index.add(change.category, change.new_item)
+            elif change.kind == self.CATEGORY_REMOVED:
+                index.remove_category(change.category)
+
+    def _notify(self, change):
+        for listener in list(self.listeners):
+            listener(change)
 
     def get_menu(self):
-        return self.menu
+        # Returns the current immutable MenuSnapshot. Edits publish a new
+        # snapshot, so readers never lock and a snapshot never changes.
+        menu = self.menu
+        if menu is None:
+            with self.lock:
+                if self.menu is None:
+                    self.menu = self._load_menu()
+                menu = self.menu
+        return menu
 
-    def update_price(self, category, item, new_price):
-        if category in self.menu and item in self.menu[category]:
-            try:
-                self.menu[category][item] = float(new_price)
-                return True
-            except ValueError:
+    def _load_menu(self):
+        self.conn.execute("BEGIN")
+        try:
+            (version,) = self.conn.execute(self.SELECT_VERSION).fetchone()
+            menu = {name: {} for (name,) in self.conn.execute(self.SELECT_CATEGORIES)}
+            for category, item, price in self.conn.execute(self.SELECT_ITEMS):
+                menu.setdefault(category, {})[item] = Money(price)
+        finally:
+            self.conn.execute("COMMIT")
+        return MenuSnapshot(
+            {category: MappingProxyType(items) for category, items in menu.items()}, version
+        )
+
+    def _write(self, sql, params):
+        # Runs one statement in its own transaction, bumping the menu version
+        # if a row changed. Returns the new version, or None if nothing
+        # changed; constraint violations (duplicates) count as no change.
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self.conn.execute(sql, params).rowcount > 0:
+                self.conn.execute(self.BUMP_VERSION)
+                (version,) = self.conn.execute(self.SELECT_VERSION).fetchone()
+            else:
+                version = None
+            self.conn.execute("COMMIT")
+        except sqlite3.IntegrityError:
+            self.conn.execute("ROLLBACK")
+            return None
+        except Exception:
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK")
+            raise
+        return version
+
+    def _commit(self, sql, params, change):
+        with self.lock:
+            version = self._write(sql, params)
+            if version is None:
                 return False
-        return False
+            if self.menu is not None:
+                self.menu = self._apply_change(self.menu, change, version)
+            self._update_search_index(change)
+        self._notify(change)
+        return True
+
+    def _apply_change(self, menu, change, version):
+        # Copy-on-write: only the edited category is copied, every other
+        # category mapping is shared with the previous snapshot.
+        categories = dict(menu.categories)
+        cat = change.category
+        if change.kind == self.CATEGORY_ADDED:
+            categories[cat] = MappingProxyType({})
+        elif change.kind == self.CATEGORY_REMOVED:
+            categories.pop(cat, None)
+        else:
+            items = dict(categories.get(cat, {}))
+            if change.kind in (self.PRICE_CHANGED, self.ITEM_ADDED):
+                items[change.item] = change.price
+            elif change.kind == self.ITEM_REMOVED:
+                items.pop(change.item, None)
+            elif change.kind == self.ITEM_RENAMED:
+                items.pop(change.item, None)
+                items[change.new_item] = change.price
+            categories[cat] = MappingProxyType(items)
+        return MenuSnapshot(categories, version)
+
+    # --- Bulk import ---
+
+    def bulk_upsert(self, rows, strict=False, chunk_size=500):
+        # Adds or re-prices items from (line, record) pairs as produced by
+        # menu_io.read_rows; record is a {"category", "item", "price"} dict
+        # or an error message. Invalid rows are collected in the result
+        # instead of raised. Valid rows are applied in one transaction
+        # (none of them if strict and any row failed), followed by a single
+        # MENU_RELOADED notification.
+        errors = []
+        inserted = updated = unchanged = 0
+        with self.lock:
+            menu = self.get_menu()
+            # Latest price per key seen so far in this batch.
+            seen = {}
+            new_categories = set()
+            batch = []
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for line, record in rows:
+                    if isinstance(record, str):
+                        errors.append((line, record))
+                        continue
+                    category = str(record.get("category") or "").strip()
+                    item = str(record.get("item") or "").strip()
+                    if not category or not item:
+                        errors.append((line, "Category and item are required"))
+                        continue
+                    try:
+                        price = self.parse_price(record.get("price"))
+                    except ValueError as e:
+                        errors.append((line, str(e)))
+                        continue
+                    key = (category, item)
+                    old = seen.get(key, menu.get(category, {}).get(item))
+                    if old is None:
+                        inserted += 1
+                        if category not in menu and category not in new_categories:
+                            new_categories.add(category)
+                            self.conn.execute(self.INSERT_CATEGORY_IF_MISSING, (category,))
+                    elif old == price:
+                        unchanged += 1
+                        continue
+                    else:
+                        updated += 1
+                    seen[key] = price
+                    batch.append((category, item, price))
+                    if len(batch) >= chunk_size:
+                        self.conn.executemany(self.UPSERT_ITEM, batch)
+                        batch.clear()
+                if batch:
+                    self.conn.executemany(self.UPSERT_ITEM, batch)
+                if (strict and errors) or not (inserted or updated):
+                    self.conn.execute("ROLLBACK")
+                    if strict and errors:
+                        return BulkResult(0, 0, 0, errors)
+                    return BulkResult(0, 0, unchanged, errors)
+                self.conn.execute(self.BUMP_VERSION)
+                self.conn.execute("COMMIT")
+            except Exception:
+                if self.conn.in_transaction:
+                    self.conn.execute("ROLLBACK")
+                raise
+            self.menu = self._load_menu()
+            # Rebuilt from the new snapshot on the next search.
+            with self.search_lock:
+                self.search_index = None
+        self._notify(MenuChange(self.MENU_RELOADED, None, None, None, None))
+        return BulkResult(inserted, updated, unchanged, errors)
+
+    # --- Price history ---
+    # Times are datetimes or "YYYY-MM-DD HH:MM:SS[.fff]" local-time strings,
+    # the same format orders are stored with.
+
+    def price_at(self, category, item, when):
+        # Price of an item at a point in time, or None if it was not on the
+        # menu then.
+        with self.lock:
+            row = self.conn.execute(
+                self.SELECT_PRICE_AT, (category, item, self._timestamp(when))
+            ).fetchone()
+        return Money(row[0]) if row and row[0] is not None else None
+
+    def menu_at(self, when):
+        # The menu as it was at a point in time: category -> item -> price.
+        menu = {}
+        with self.lock:
+            rows = self.conn.execute(self.SELECT_MENU_AT, (self._timestamp(when),)).fetchall()
+        for category, item, price in rows:
+            if price is not None:
+                menu.setdefault(category, {})[item] = Money(price)
+        return menu
+
+    def price_history(self, category, item):
+        # [(effective_from, price)] oldest first; price None marks removal.
+        with self.lock:
+            rows = self.conn.execute(self.SELECT_PRICE_HISTORY, (category, item)).fetchall()
+        return [(when, None if price is None else Money(price)) for when, price in rows]
+
+    def _timestamp(self, when):
+        if isinstance(when, datetime.datetime):
+            return when.isoformat(sep=" ", timespec="milliseconds")
+        return when
+
+    def parse_price(self, value):
+        # A menu price as Money; raises ValueError for anything that is not
+        # a non-negative amount.
+        try:
+            price = Money.parse(value)
+        except ValueError:
+            price = None
+        if price is None or price < 0:
+            raise ValueError(f"Invalid price: {value!r}")
+        return price
+
+    # Edits return False when nothing changed (unknown item, duplicate name)
+    # and raise ValueError for an invalid price or a blank name.
+
+    def update_price(self, category, item, new_price):
+        price = self.parse_price(new_price)
+        return self._commit(
+            self.UPDATE_PRICE, (price, category, item),
+            MenuChange(self.PRICE_CHANGED, category, item, None, price)
+        )
 
     def add_category(self, category):
-        if not category or category in self.menu:
+        if not category:
             return False
-        self.menu[category] = {}
-        return True
+        return self._commit(
+            self.INSERT_CATEGORY, (category,),
+            MenuChange(self.CATEGORY_ADDED, category, None, None, None)
+        )
 
     def add_item(self, category, item, price):
-        if not category or category not in self.menu:
-            return False
-        if not item or item in self.menu[category]:
+        if not category or category not in self.get_menu():
             return False
-        try:
-            self.menu[category][item] = float(price)
-            return True
-        except ValueError:
+        if not item:
             return False
+        price = self.parse_price(price)
+        return self._commit(
+            self.INSERT_ITEM, (category, item, price),
+            MenuChange(self.ITEM_ADDED, category, item, None, price)
+        )
 
     def remove_item(self, category, item):
-        if category in self.menu and item in self.menu[category]:
-            del self.menu[category][item]
-            return True
-        return False
+        return self._commit(
+            self.DELETE_ITEM, (category, item),
+            MenuChange(self.ITEM_REMOVED, category, item, None, None)
+        )
 
     def remove_category(self, category):
-        if not category or category not in self.menu:
+        if not category:
             return False
-        del self.menu[category]
-        return True
+        return self._commit(
+            self.DELETE_CATEGORY, (category,),
+            MenuChange(self.CATEGORY_REMOVED, category, None, None, None)
+        )
 
     def update_product(self, category, old_name, new_name, new_price):
-        if category in self.menu and old_name in self.menu[category]:
-            try:
-                price = float(new_price)
-                if old_name != new_name:
-                    if new_name in self.menu[category]:
-                        return False
-                    self.menu[category][new_name] = price
-                    del self.menu[category][old_name]
-                else:
-                    self.menu[category][old_name] = price
-                return True
-            except ValueError:
-                return False
-        return False
+        if not isinstance(new_name, str) or not new_name.strip():
+            raise ValueError("Item name is required")
+        price = self.parse_price(new_price)
+        if new_name != old_name:
+            change = MenuChange(self.ITEM_RENAMED, category, old_name, new_name, price)
+        else:
+            change = MenuChange(self.PRICE_CHANGED, category, old_name, None, price)
+        return self._commit(self.UPDATE_PRODUCT, (new_name, price, category, old_name), change)
+
+
+class OrderLine:
+    __slots__ = ("category", "item", "quantity", "unit_price", "total_price")
+
+    def __init__(self, category, item, quantity, unit_price):
+        self.category = category
+        self.item = item
+        self.quantity = quantity
+        self.unit_price = Money.parse(unit_price)
+        self.total_price = self.unit_price * quantity
+
+    # Read-only mapping access so lines can be used wherever the old
+    # per-line dicts were (line["item"], format_map, dict(line)).
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def keys(self):
+        return self.__slots__
+
 
 class OrderModel:
-    def __init__(self):
-        self.order_items = []
+    def __init__(self, menu_version=None):
+        # (category, item) -> OrderLine, in the order lines were first added.
+        self.order_items = {}
+        self.total = Money(0)
         self.order_time = datetime.datetime.now()
+        # Version of the MenuSnapshot the unit prices were taken from.
+        self.menu_version = menu_version
 
     def add_item(self, category, item, quantity, unit_price):
         if quantity <= 0:
             return
-        for oi in self.order_items:
-            if oi["category"] == category and oi["item"] == item:
-                oi["quantity"] += quantity
-                oi["total_price"] = oi["quantity"] * oi["unit_price"]
-                return
-        self.order_items.append({
-            "category": category,
-            "item": item,
-            "quantity": quantity,
-            "unit_price": unit_price,
-            "total_price": quantity * unit_price
-        })
+        line = self.order_items.get((category, item))
+        if line is None:
+            line = OrderLine(category, item, quantity, unit_price)
+            self.order_items[(category, item)] = line
+            self.total += line.total_price
+        else:
+            self._set_line_quantity(line, line.quantity + quantity)
+
+    def remove_item(self, category, item):
+        line = self.order_items.pop((category, item), None)
+        if line is None:
+            return False
+        self.total -= line.total_price
+        return True
+
+    def set_quantity(self, category, item, quantity):
+        line = self.order_items.get((category, item))
+        if line is None:
+            return False
+        if quantity <= 0:
+            return self.remove_item(category, item)
+        self._set_line_quantity(line, quantity)
+        return True
+
+    def _set_line_quantity(self, line, quantity):
+        old_total = line.total_price
+        line.quantity = quantity
+        line.total_price = line.unit_price * quantity
+        self.total += line.total_price - old_total
 
     def get_order(self):
-        return self.order_items
+        return list(self.order_items.values())
 
     def get_order_time(self):
         return self.order_time
 
     def calculate_total(self):
-        return sum(i["total_price"] for i in self.order_items)
+        return self.total
 
-class UserModel:
-    def __init__(self):
-        self.users = {
-            "admin": {"password": "admin123", "role": "admin"},
-            "cashier": {"password": "cashier123", "role": "cashier"}
+class SettingsModel:
+    SELECT_SETTING = "SELECT value FROM settings WHERE key = ?"
+    UPSERT_SETTING = (
+        "INSERT INTO settings (key, value) VALUES (?, ?) "
+        "ON CONFLICT (key) DO UPDATE SET value = excluded.value"
+    )
+
+    def __init__(self, db_path=DB_PATH):
+        self.conn = connect(db_path)
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            row = self.conn.execute(self.SELECT_SETTING, (key,)).fetchone()
+        return row[0] if row else default
+
+    def set(self, key, value):
+        with self.lock:
+            self.conn.execute(self.UPSERT_SETTING, (key, value))
+
+
+# Read side of the orders table: newest-first pages for the history view.
+# Pages are fetched by keyset (the last row's (time_of_order, id)), never by
+# OFFSET, so every page costs one index seek however far back it is.
+class OrderHistoryModel:
+    COLUMNS = "o.id, o.customer_name, o.total_amount, o.time_of_order"
+    SELECT_FIRST_PAGE = (
+        f"SELECT {COLUMNS} FROM orders o "
+        "ORDER BY o.time_of_order DESC, o.id DESC LIMIT ?"
+    )
+    SELECT_PAGE = (
+        f"SELECT {COLUMNS} FROM orders o WHERE (o.time_of_order, o.id) < (?, ?) "
+        "ORDER BY o.time_of_order DESC, o.id DESC LIMIT ?"
+    )
+    # Search results come back in FTS rowid (order id) order, which FTS5
+    # can walk backwards without sorting the matches; ids follow order time.
+    SEARCH_FIRST_PAGE = (
+        f"SELECT {COLUMNS} FROM orders_fts f JOIN orders o ON o.id = f.rowid "
+        "WHERE orders_fts MATCH ? ORDER BY f.rowid DESC LIMIT ?"
+    )
+    SEARCH_PAGE = (
+        f"SELECT {COLUMNS} FROM orders_fts f JOIN orders o ON o.id = f.rowid "
+        "WHERE orders_fts MATCH ? AND f.rowid < ? ORDER BY f.rowid DESC LIMIT ?"
+    )
+    SELECT_ORDER = (
+        "SELECT id, customer_name, total_amount, time_of_order, order_details, menu_version "
+        "FROM orders WHERE id = ?"
+    )
+
+    SELECT_RANGE = (
+        "SELECT id, customer_name, total_amount, time_of_order, order_details, menu_version "
+        "FROM orders WHERE (time_of_order, id) > (?, ?) AND time_of_order < ? "
+        "ORDER BY time_of_order, id LIMIT ?"
+    )
+
+    def __init__(self, db_path=DB_PATH):
+        self.conn = connect(db_path)
+        self.lock = threading.Lock()
+
+    def page(self, before=None, limit=50, query=None):
+        # Returns (orders, cursor): up to limit order summaries older than
+        # the before cursor, and the cursor for the next page (None when
+        # this was the last). Cursors are (time_of_order, id) pairs. A query
+        # with no words to search for matches nothing.
+        match = None
+        if query:
+            match = self.match_expression(query)
+            if match is None:
+                return [], None
+        if match is not None:
+            sql, params = (
+                (self.SEARCH_PAGE, (match, before[1], limit + 1)) if before
+                else (self.SEARCH_FIRST_PAGE, (match, limit + 1))
+            )
+        elif before:
+            sql, params = self.SELECT_PAGE, (before[0], before[1], limit + 1)
+        else:
+            sql, params = self.SELECT_FIRST_PAGE, (limit + 1,)
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        orders = [
+            {"id": id, "customer_name": name, "total": Money(total), "time_of_order": time_of_order}
+            for id, name, total, time_of_order in rows[:limit]
+        ]
+        cursor = None
+        if len(rows) > limit:
+            cursor = (orders[-1]["time_of_order"], orders[-1]["id"])
+        return orders, cursor
+
+    def match_expression(self, query):
+        # Every word must match the start of a word in the customer name or
+        # an item name; words are quoted so FTS5 syntax in input is inert.
+        words = tokenize(query)
+        if not words:
+            return None
+        return " ".join(f'"{word}"*' for word in words)
+
+    def get_order(self, order_id):
+        with self.lock:
+            row = self.conn.execute(self.SELECT_ORDER, (order_id,)).fetchone()
+        return self.stored_order(row) if row else None
+
+    def iter_orders(self, start, end, batch_size=500):
+        # Yields full orders with start <= time_of_order < end, oldest first,
+        # fetching batch_size rows at a time by keyset so that memory stays
+        # bounded however long the range. start and end are
+        # "YYYY-MM-DD HH:MM:SS" strings.
+        cursor = (start, 0)
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    self.SELECT_RANGE, (*cursor, end, batch_size)
+                ).fetchall()
+            for row in rows:
+                yield self.stored_order(row)
+            if len(rows) < batch_size:
+                return
+            cursor = (rows[-1][3], rows[-1][0])
+
+    def stored_order(self, row):
+        # An order whose details cannot be read gets no lines and an "error"
+        # message instead, so one bad row does not stop a listing or export;
+        # service.stored_order_model raises it as UnreadableOrder.
+        id, name, total, time_of_order, details, menu_version = row
+        try:
+            lines, error = order_lines(details), None
+        except UnreadableOrder as e:
+            lines, error = [], f"Order #{id} is unreadable: {e}"
+        return {
+            "id": id, "customer_name": name, "total": Money(total),
+            "time_of_order": time_of_order, "lines": lines, "menu_version": menu_version,
+            "error": error,
         }
 
+
+def order_lines(details):
+    # orders.order_details JSON -> list of line dicts, each with a str
+    # category and item, a positive int quantity and an int unit_amount in
+    # pesewas. Raises UnreadableOrder for anything else.
+    try:
+        lines = json.loads(details)
+    except (TypeError, ValueError):
+        raise UnreadableOrder("order details are not JSON") from None
+    if not isinstance(lines, list):
+        raise UnreadableOrder("order details are not a list of lines")
+    for number, line in enumerate(lines, start=1):
+        if not isinstance(line, dict):
+            raise UnreadableOrder(f"line {number} is not an object")
+        if not isinstance(line.get("category"), str) or not isinstance(line.get("item"), str):
+            raise UnreadableOrder(f"line {number} has no category or item name")
+        quantity, amount = line.get("quantity"), line.get("unit_amount")
+        if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity <= 0:
+            raise UnreadableOrder(f"line {number} has an invalid quantity: {quantity!r}")
+        if isinstance(amount, bool) or not isinstance(amount, int):
+            raise UnreadableOrder(f"line {number} has an invalid unit amount: {amount!r}")
+    return lines
+
+
+class UserModel:
+    SELECT_USER = "SELECT hashed_password, role FROM users WHERE username = ?"
+    UPDATE_HASH = "UPDATE users SET hashed_password = ? WHERE username = ?"
+
+    def __init__(self, db_path=DB_PATH, iterations=DEFAULT_ITERATIONS, session_ttl=300):
+        self.conn = connect(db_path)
+        self.lock = threading.Lock()
+        self.iterations = iterations
+        self.session_ttl = session_ttl
+        # username -> (role, keyed digest of the password, expiry). The digest
+        # is cheap to compute, so a repeat login within session_ttl seconds
+        # skips the KDF; the key never leaves this process.
+        self.sessions = {}
+        self.session_key = os.urandom(32)
+
     def validate_user(self, username, password):
-        u = self.users.get(username)
-        if u and u["password"] == password:
-            return u["role"]
+        # Returns the user's role, or None. Runs the KDF, so call it from a
+        # worker thread rather than the Tk thread.
+        with self.lock:
+            row = self.conn.execute(self.SELECT_USER, (username,)).fetchone()
+        if row is None or not verify_password(password, row[0]):
+            return None
+        if needs_rehash(row[0], self.iterations):
+            with self.lock:
+                self.conn.execute(
+                    self.UPDATE_HASH, (hash_password(password, self.iterations), username)
+                )
+        role = row[1]
+        with self.lock:
+            self.sessions[username] = (
+                role, self._session_digest(password), time.monotonic() + self.session_ttl
+            )
+        return role
+
+    def session_role(self, username, password):
+        # Role from a live session for these credentials, or None; fast
+        # enough for the Tk thread.
+        with self.lock:
+            session = self.sessions.get(username)
+            if session is None:
+                return None
+            role, digest, expires = session
+            if time.monotonic() > expires:
+                del self.sessions[username]
+                return None
+        if hmac.compare_digest(digest, self._session_digest(password)):
+            return role
         return None
+
+    def end_session(self, username):
+        with self.lock:
+            self.sessions.pop(username, None)
+
+    def _session_digest(self, password):
+        return hmac.new(self.session_key, password.encode(), "sha256").digest()
@@ -0,0 +1,95 @@
+# money.py
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+CENT = Decimal("0.01")
+# Pesewas must fit SQLite's signed 64-bit INTEGER.
+MAX_PESEWAS = 2 ** 63 - 1
+
+
+# An amount of Ghana cedis held as an exact integer number of pesewas.
+# Money is an int, so sums, comparisons, hashing and SQLite storage work
+# unchanged; +, -, and * by an integer quantity stay Money. Formatting shows
+# cedis: f"{Money(1250):.2f}" == "12.50".
+#   Money(1250)            1250 pesewas
+#   Money.parse("12.5")    12.50 cedis from text or a number
+class Money(int):
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, value):
+        # Cedis as a str, int, float or Decimal, rounded half-up to the
+        # pesewa. Raises ValueError for anything that is not a finite amount
+        # or does not fit in a 64-bit pesewa count.
+        if isinstance(value, Money):
+            return value
+        if isinstance(value, float):
+            # repr gives the shortest text for the float, so 12.3 parses as
+            # 12.30 rather than its binary approximation.
+            value = repr(value)
+        try:
+            amount = Decimal(value.strip() if isinstance(value, str) else value)
+        except (InvalidOperation, TypeError, ValueError):
+            raise ValueError(f"Invalid amount: {value!r}") from None
+        if not amount.is_finite():
+            raise ValueError(f"Invalid amount: {value!r}")
+        try:
+            # quantize raises InvalidOperation once the digits exceed the
+            # context precision, e.g. "1e100".
+            pesewas = int(amount.quantize(CENT, rounding=ROUND_HALF_UP).scaleb(2))
+        except InvalidOperation:
+            raise ValueError(f"Amount out of range: {value!r}") from None
+        if not -MAX_PESEWAS - 1 <= pesewas <= MAX_PESEWAS:
+            raise ValueError(f"Amount out of range: {value!r}")
+        return cls(pesewas)
+
+    @classmethod
+    def total(cls, amounts):
+        return cls(sum(amounts))
+
+    @property
+    def cedis(self):
+        # Nearest float, for JSON and other float-only interfaces; its repr
+        # round-trips through Money.parse.
+        return int(self) / 100
+
+    def __add__(self, other):
+        if isinstance(other, int):
+            return Money(int(self) + other)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, int):
+            return Money(int(self) - other)
+        return NotImplemented
+
+    def __rsub__(self, other):
+        if isinstance(other, int):
+            return Money(other - int(self))
+        return NotImplemented
+
+    def __mul__(self, other):
+        # Only by whole quantities; use parse() for anything fractional.
+        if isinstance(other, int) and not isinstance(other, Money):
+            return Money(int(self) * other)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Money(-int(self))
+
+    def __str__(self):
+        cedis, pesewas = divmod(abs(int(self)), 100)
+        return f"{'-' if self < 0 else ''}{cedis}.{pesewas:02d}"
+
+    def __repr__(self):
+        return f"Money({int(self)})"
+
+    def __format__(self, spec):
+        if spec in ("", ".2f"):
+            return str(self)
+        # Any other float-style spec (",.2f", ">10.2f", ...) via Decimal,
+        # which formats exactly.
+        return format(Decimal(int(self)).scaleb(-2), spec)
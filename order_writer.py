@@ -0,0 +1,139 @@
+# order_writer.py
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from database import DB_PATH, connect, insert_order_lines, local_timestamp
+
+
+# Write-behind queue for the orders table. Orders are grouped into one
+# transaction per batch_size rows or every max_delay_ms, whichever comes
+# first. The future returned by submit() resolves to the new row id only
+# after its batch is committed with synchronous=FULL, so an acknowledged
+# order is on disk. An order that fails to insert fails only its own
+# future; a failed commit fails the whole batch.
+class OrderWriter:
+    INSERT_ORDER = (
+        "INSERT INTO orders "
+        "(customer_name, total_cost, total_amount, time_of_order, order_details, menu_version) "
+        "VALUES (?, ?, ?, ?, ?, ?)"
+    )
+
+    def __init__(self, db_path=DB_PATH, batch_size=50, max_delay_ms=200):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.queue = queue.Queue()
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="order-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, order, customer_name="Walk-in"):
+        if self.closed:
+            raise RuntimeError("OrderWriter is closed")
+        lines = [
+            {
+                "category": line["category"],
+                "item": line["item"],
+                "quantity": line["quantity"],
+                "unit_amount": int(line["unit_price"]),
+                "amount": int(line["total_price"]),
+            }
+            for line in order.get_order()
+        ]
+        order_time = order.get_order_time()
+        total = order.calculate_total()
+        row = (
+            customer_name,
+            total.cedis,
+            int(total),
+            order_time.strftime("%Y-%m-%d %H:%M:%S"),
+            json.dumps(lines),
+            order.menu_version,
+        )
+        future = Future()
+        self.queue.put((row, (future, local_timestamp(order_time), lines)))
+        return future
+
+    def flush(self, timeout=None):
+        # Waits until everything submitted so far has been committed.
+        done = threading.Event()
+        self.queue.put((None, done))
+        return done.wait(timeout)
+
+    def close(self, timeout=None):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+    def _run(self):
+        conn = connect(self.db_path)
+        conn.execute("PRAGMA synchronous=FULL")
+        try:
+            running = True
+            while running:
+                batch = [self.queue.get()]
+                deadline = time.monotonic() + self.max_delay
+                while batch[-1] is not None and len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self.queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                if batch[-1] is None:
+                    running = False
+                    batch.pop()
+                    # Drain anything queued behind the stop marker.
+                    while True:
+                        try:
+                            entry = self.queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if entry is not None:
+                            batch.append(entry)
+                self._commit(conn, batch)
+        finally:
+            conn.close()
+
+    def _commit(self, conn, batch):
+        # Each order gets its own savepoint, so a bad order fails only its
+        # own future and the rest of the batch still commits.
+        rows = [(row, entry) for row, entry in batch if row is not None]
+        if rows:
+            results = []
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for row, (future, ordered_at, lines) in rows:
+                    conn.execute("SAVEPOINT order_row")
+                    try:
+                        order_id = conn.execute(self.INSERT_ORDER, row).lastrowid
+                        insert_order_lines(conn, order_id, ordered_at, lines)
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO order_row")
+                        print("Order write error:", e)
+                        results.append((future, None, e))
+                    else:
+                        results.append((future, order_id, None))
+                    conn.execute("RELEASE order_row")
+                conn.execute("COMMIT")
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                print("Order write error:", e)
+                for _, (future, _, _) in rows:
+                    future.set_exception(e)
+            else:
+                for future, order_id, error in results:
+                    if error is None:
+                        future.set_result(order_id)
+                    else:
+                        future.set_exception(error)
+        for row, marker in batch:
+            if row is None:
+                marker.set()
@@ -0,0 +1,44 @@
+# passwords.py
+import base64
+import hashlib
+import hmac
+import os
+
+# PBKDF2-SHA256 work factor for new hashes. Stored hashes carry their own
+# iteration count, so this can be raised later; older hashes are upgraded
+# the next time their owner logs in.
+DEFAULT_ITERATIONS = 600_000
+ALGORITHM = "pbkdf2_sha256"
+
+
+def hash_password(password, iterations=DEFAULT_ITERATIONS):
+    # "pbkdf2_sha256$<iterations>$<salt>$<hash>", base64 salt and hash.
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return "$".join((
+        ALGORITHM, str(iterations),
+        base64.b64encode(salt).decode(), base64.b64encode(digest).decode(),
+    ))
+
+
+def verify_password(password, encoded):
+    # Also accepts the unsalted SHA-256 hex digests the users table held
+    # before hashes carried an algorithm prefix.
+    if "$" not in encoded:
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, encoded)
+    try:
+        algorithm, iterations, salt, expected = encoded.split("$")
+        if algorithm != ALGORITHM:
+            return False
+        digest = hashlib.pbkdf2_hmac(
+            "sha256", password.encode(), base64.b64decode(salt), int(iterations)
+        )
+    except ValueError:
+        return False
+    return hmac.compare_digest(base64.b64encode(digest).decode(), expected)
+
+
+def needs_rehash(encoded, iterations=DEFAULT_ITERATIONS):
+    parts = encoded.split("$")
+    return len(parts) != 4 or parts[0] != ALGORITHM or parts[1] != str(iterations)
@@ -0,0 +1,177 @@
+# search.py
+import bisect
+import heapq
+import math
+import re
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return WORD_RE.findall(text.lower())
+
+
+def trigrams(tokens):
+    # Tokens are padded so grams at the start of a word are distinct.
+    grams = set()
+    for token in tokens:
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+# Incremental search index over menu item names. Word prefixes are looked up
+# by bisecting a sorted (token, key) list and whole-query prefixes by
+# bisecting a sorted (name, key) list; typos are tolerated through a trigram
+# index. Keys are (category, item) tuples.
+class MenuSearchIndex:
+    # Prefix matches scored per query. A short or common word can prefix
+    # most of the menu, so the walk stops here rather than scoring them all.
+    MAX_CANDIDATES = 200
+
+    def __init__(self):
+        # key -> (normalized name, tokens)
+        self.names = {}
+        self.tokens = []
+        self.phrases = []
+        self.grams = {}
+
+    def rebuild(self, menu):
+        self.names.clear()
+        self.grams.clear()
+        tokens = []
+        phrases = []
+        for category, items in menu.items():
+            for item in items:
+                key = (category, item)
+                phrase, item_tokens = self.index_name(key, item)
+                tokens.extend((token, key) for token in set(item_tokens))
+                phrases.append((phrase, key))
+        tokens.sort()
+        phrases.sort()
+        self.tokens = tokens
+        self.phrases = phrases
+
+    def add(self, category, item):
+        key = (category, item)
+        if key in self.names:
+            return
+        phrase, tokens = self.index_name(key, item)
+        for token in set(tokens):
+            bisect.insort(self.tokens, (token, key))
+        bisect.insort(self.phrases, (phrase, key))
+
+    def index_name(self, key, item):
+        tokens = tokenize(item)
+        entry = self.names[key] = (" ".join(tokens), tokens)
+        for gram in trigrams(tokens):
+            self.grams.setdefault(gram, set()).add(key)
+        return entry
+
+    def remove(self, category, item):
+        key = (category, item)
+        entry = self.names.pop(key, None)
+        if entry is None:
+            return
+        phrase, tokens = entry
+        for token in set(tokens):
+            _discard(self.tokens, (token, key))
+        _discard(self.phrases, (phrase, key))
+        for gram in trigrams(tokens):
+            keys = self.grams.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.grams[gram]
+
+    def remove_category(self, category):
+        for key in [key for key in self.names if key[0] == category]:
+            self.remove(*key)
+
+    def phrase_matches(self, phrase, found, cap):
+        # Adds keys whose whole name starts with phrase to found, in name
+        # order, until found holds cap keys.
+        pos = bisect.bisect_left(self.phrases, (phrase,))
+        while len(found) < cap and pos < len(self.phrases):
+            name, key = self.phrases[pos]
+            if not name.startswith(phrase):
+                break
+            found[key] = None
+            pos += 1
+
+    def prefix_matches(self, query_tokens, found, cap):
+        # Adds keys where every query token prefixes some word of the name
+        # to found, until found holds cap keys. Only the query token with
+        # the fewest matches is walked; the others are checked per key.
+        ranges = []
+        for token in query_tokens:
+            lo = bisect.bisect_left(self.tokens, (token,))
+            ranges.append((lo, bisect.bisect_left(self.tokens, (token + "\uffff",), lo)))
+        lo, hi = min(ranges, key=lambda r: r[1] - r[0])
+        for pos in range(lo, hi):
+            if len(found) >= cap:
+                break
+            key = self.tokens[pos][1]
+            if key in found:
+                continue
+            words = self.names[key][1]
+            if all(any(word.startswith(token) for word in words) for token in query_tokens):
+                found[key] = None
+
+    def fuzzy_matches(self, query_grams, needed):
+        # key -> number of query trigrams shared, for keys sharing at least
+        # needed of them. Such a key must share one of the rarest
+        # len(query_grams) - needed + 1 grams, so only those postings are
+        # walked; the common grams are just looked up per candidate.
+        postings = sorted((self.grams.get(gram, ()) for gram in query_grams), key=len)
+        seeds = set().union(*postings[:len(postings) - needed + 1])
+        shared = {}
+        for key in seeds:
+            count = sum(key in keys for keys in postings)
+            if count >= needed:
+                shared[key] = count
+        return shared
+
+    def search(self, query, limit=20):
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+        phrase = " ".join(query_tokens)
+
+        # Items whose name starts with the query, then items where every
+        # query word prefixes some word of the name; both in index order,
+        # up to MAX_CANDIDATES, so the best-scoring prefix matches are among
+        # them without scoring every match of a common word.
+        cap = max(limit, self.MAX_CANDIDATES)
+        exact = {}
+        self.phrase_matches(phrase, exact, cap)
+        self.prefix_matches(query_tokens, exact, cap)
+
+        # Fuzzy candidates sharing at least half of the query trigrams. Fuzzy
+        # scores stay below prefix matches, so skip them when there are
+        # already enough prefix matches to fill the results.
+        query_grams = trigrams(query_tokens)
+        shared = {}
+        if len(exact) < limit:
+            shared = self.fuzzy_matches(query_grams, math.ceil(max(1, len(query_grams) / 2)))
+
+        scored = []
+        for key in exact.keys() | shared.keys():
+            name, tokens = self.names[key]
+            score = shared.get(key, 0) / len(query_grams)
+            if key in exact:
+                score += 2
+                if name.startswith(phrase):
+                    score += 2
+                elif tokens and tokens[0].startswith(query_tokens[0]):
+                    score += 1
+            # Shorter names win ties, then alphabetical order.
+            scored.append((-score, len(name), key))
+        return [key for _, _, key in heapq.nsmallest(limit, scored)]
+
+
+def _discard(entries, entry):
+    # Removes entry from a sorted list if present.
+    pos = bisect.bisect_left(entries, entry)
+    if pos < len(entries) and entries[pos] == entry:
+        del entries[pos]
@@ -0,0 +1,250 @@
+# server.py
+# Headless order service: serves the menu, order submission and invoice
+# rendering as JSON over HTTP so several tills and tablets can share one
+# menu and order store.
+#   python server.py --host 0.0.0.0 --port 8765
+import argparse
+import asyncio
+import json
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from invoice_template import TemplateError
+from model import UnreadableOrder
+from service import OrderService
+
+MAX_BODY = 1024 * 1024
+
+REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 422: "Unprocessable Entity",
+    500: "Internal Server Error",
+}
+
+
+def reason(status):
+    # Reason phrase for a status line; an unlisted status must not break
+    # the response.
+    try:
+        return REASONS.get(status) or HTTPStatus(status).phrase
+    except ValueError:
+        return "Unknown"
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiServer:
+    def __init__(self, service):
+        self.service = service
+        self.routes = {
+            "/menu": {"GET": self.get_menu},
+            "/search": {"GET": self.search},
+            "/invoice-template": {
+                "GET": self.get_invoice_template,
+                "PUT": self.put_invoice_template,
+            },
+            "/invoices": {"GET": self.get_invoice, "POST": self.render_invoice},
+            "/orders": {"GET": self.list_orders, "POST": self.create_order},
+        }
+        # Serialized menu, reused until MenuModel publishes a new snapshot.
+        self.menu_json = (None, b"")
+
+    async def start(self, host, port):
+        # Listening asyncio.Server; port 0 picks a free port.
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def serve(self, host, port):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    await self.respond(writer, 413, b'{"error": "Request body too large"}', False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = (
+                    version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                )
+                status, data = await self.dispatch(method, target, body)
+                await self.respond(writer, status, data, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, data, keep_alive):
+        writer.write(
+            f"HTTP/1.1 {status} {reason(status)}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+            + data
+        )
+        await writer.drain()
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        handlers = self.routes.get(url.path)
+        try:
+            if handlers is None:
+                raise ApiError(404, f"No such resource: {url.path}")
+            handler = handlers.get(method)
+            if handler is None:
+                raise ApiError(405, f"{method} not allowed on {url.path}")
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                payload = json.loads(body) if body else {}
+            except json.JSONDecodeError:
+                raise ApiError(400, "Request body is not valid JSON") from None
+            status, result = await handler(query, payload)
+        except ApiError as e:
+            status, result = e.status, {"error": str(e)}
+        except Exception as e:
+            print("API error:", e)
+            status, result = 500, {"error": "Internal server error"}
+        if isinstance(result, bytes):
+            return status, result
+        return status, json.dumps(result).encode()
+
+    def parse_lines(self, payload):
+        try:
+            lines = [
+                (line["category"], line["item"], line.get("quantity", 1))
+                for line in payload["lines"]
+            ]
+            if not lines:
+                raise ApiError(400, "Order has no lines")
+            return self.service.price_lines(lines)
+        except (KeyError, TypeError):
+            raise ApiError(400, "Expected {'lines': [{'category', 'item', 'quantity'}]}") from None
+        except ValueError as e:
+            raise ApiError(400, str(e)) from None
+
+    # --- Handlers ---
+
+    async def get_menu(self, query, payload):
+        menu = self.service.get_menu()
+        if self.menu_json[0] is not menu:
+            self.menu_json = (menu, json.dumps({
+                "menu": {
+                    category: {item: price.cedis for item, price in items.items()}
+                    for category, items in menu.items()
+                },
+                "version": menu.version,
+            }).encode())
+        return 200, self.menu_json[1]
+
+    async def search(self, query, payload):
+        menu = self.service.get_menu()
+        try:
+            limit = int(query.get("limit", 20))
+        except ValueError:
+            raise ApiError(400, "limit must be an integer") from None
+        # The first search builds the index, so it runs off the event loop.
+        results = await asyncio.to_thread(self.service.search, query.get("q", ""), limit)
+        return 200, {"results": [
+            {"category": cat, "item": item, "price": menu[cat][item].cedis}
+            for cat, item in results if item in menu.get(cat, {})
+        ]}
+
+    async def get_invoice_template(self, query, payload):
+        return 200, {"template": self.service.get_invoice_template()}
+
+    async def put_invoice_template(self, query, payload):
+        template = payload.get("template") if isinstance(payload, dict) else None
+        if not isinstance(template, str) or not template.strip():
+            raise ApiError(400, "Expected {'template': '...'}")
+        try:
+            await asyncio.to_thread(self.service.set_invoice_template, template)
+        except TemplateError as e:
+            raise ApiError(400, f"Invalid template: {e}") from None
+        return 200, {"template": template}
+
+    async def render_invoice(self, query, payload):
+        order = self.service.build_order(*self.parse_lines(payload))
+        return 200, {
+            "invoice": self.service.render_invoice(order),
+            "total": order.calculate_total().cedis,
+        }
+
+    async def list_orders(self, query, payload):
+        # ?q=text&limit=n, then ?before_time=...&before_id=... from "next".
+        try:
+            limit = min(int(query.get("limit", 50)), 500)
+            before = None
+            if "before_id" in query:
+                before = (query.get("before_time", ""), int(query["before_id"]))
+        except ValueError:
+            raise ApiError(400, "limit and before_id must be integers") from None
+        orders, cursor = await asyncio.to_thread(
+            self.service.list_orders, before, query.get("q"), limit
+        )
+        return 200, {
+            "orders": [dict(order, total=order["total"].cedis) for order in orders],
+            "next": {"before_time": cursor[0], "before_id": cursor[1]} if cursor else None,
+        }
+
+    async def get_invoice(self, query, payload):
+        try:
+            order_id = int(query["order_id"])
+        except (KeyError, ValueError):
+            raise ApiError(400, "Expected ?order_id=<integer>") from None
+        try:
+            invoice = await asyncio.to_thread(self.service.order_invoice, order_id)
+        except UnreadableOrder as e:
+            raise ApiError(422, str(e)) from None
+        if invoice is None:
+            raise ApiError(404, f"No such order: {order_id}")
+        return 200, {"order_id": order_id, "invoice": invoice}
+
+    async def create_order(self, query, payload):
+        details, menu_version = self.parse_lines(payload)
+        customer_name = str(payload.get("customer_name") or "Walk-in")
+        order, invoice, stored = self.service.place_order(details, customer_name, menu_version)
+        # The write-behind queue batches concurrent submissions into one
+        # commit; only answer once this order is durable.
+        order_id = await asyncio.wrap_future(stored)
+        return 201, {
+            "id": order_id, "invoice": invoice, "total": order.calculate_total().cedis,
+            "menu_version": menu_version,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Restaurant order service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    service = OrderService()
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(ApiServer(service).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
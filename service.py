@@ -0,0 +1,133 @@
+# service.py
+import datetime
+
+from invoice_template import InvoiceTemplate, TemplateError
+from model import MenuModel, OrderHistoryModel, OrderModel, SettingsModel, UnreadableOrder
+from money import Money
+from order_writer import OrderWriter
+
+DEFAULT_INVOICE_TEMPLATE = (
+    "Invoice\nOrder Time: {order_time}\n" +
+    "-" * 40 + "\n{items}" + "\n" +
+    "-" * 40 + "\nTotal: GHS {total:.2f}\n"
+)
+
+
+def render_invoice(template, order):
+    # template is a compiled InvoiceTemplate.
+    lines = order.get_order()
+    return template.render(
+        order_time=order.get_order_time().strftime("%Y-%m-%d %H:%M:%S"),
+        items=lines,
+        item_count=len(lines),
+        total=order.calculate_total()
+    )
+
+
+def stored_order_model(stored):
+    # Rebuilds an OrderModel from OrderHistoryModel.get_order() output;
+    # raises UnreadableOrder if the stored order cannot be read.
+    if stored.get("error"):
+        raise UnreadableOrder(stored["error"])
+    order = OrderModel(stored["menu_version"])
+    try:
+        order.order_time = datetime.datetime.strptime(
+            stored["time_of_order"], "%Y-%m-%d %H:%M:%S"
+        )
+    except (TypeError, ValueError):
+        raise UnreadableOrder(
+            f"Order #{stored['id']} is unreadable: bad order time {stored['time_of_order']!r}"
+        ) from None
+    for line in stored["lines"]:
+        order.add_item(
+            line["category"], line["item"], line["quantity"], Money(line["unit_amount"])
+        )
+    return order
+
+
+# Order-taking operations shared by the Tk controller and the HTTP server:
+# menu reads, invoice rendering and order persistence.
+class OrderService:
+    # Largest quantity accepted for one order line.
+    MAX_QUANTITY = 999
+
+    def __init__(self, menu_model=None, order_writer=None, history=None, settings=None):
+        self.menu_model = menu_model or MenuModel()
+        self.order_writer = order_writer or OrderWriter()
+        self.history = history or OrderHistoryModel()
+        self.settings = settings or SettingsModel()
+        template = self.settings.get("invoice_template", DEFAULT_INVOICE_TEMPLATE)
+        try:
+            self.compiled_template = InvoiceTemplate(template)
+        except TemplateError as e:
+            print("Saved invoice template error:", e)
+            template = DEFAULT_INVOICE_TEMPLATE
+            self.compiled_template = InvoiceTemplate(template)
+        self.invoice_template = template
+
+    def get_menu(self):
+        return self.menu_model.get_menu()
+
+    def search(self, query, limit=20):
+        return self.menu_model.search(query, limit)
+
+    def get_invoice_template(self):
+        return self.invoice_template
+
+    def set_invoice_template(self, new_template):
+        # Raises TemplateError for an invalid template, leaving the current one in place.
+        self.compiled_template = InvoiceTemplate(new_template)
+        self.invoice_template = new_template
+        self.settings.set("invoice_template", new_template)
+
+    def price_lines(self, lines):
+        # (category, item, quantity) -> ((category, item, quantity, unit_price),
+        # menu version) using one menu snapshot; raises ValueError for
+        # unknown items and quantities outside 1..MAX_QUANTITY.
+        menu = self.get_menu()
+        details = []
+        for cat, item, qty in lines:
+            price = menu.get(cat, {}).get(item)
+            if price is None:
+                raise ValueError(f"Unknown menu item: {cat} / {item}")
+            # bool is an int subclass, but True is not a quantity.
+            if isinstance(qty, bool) or not isinstance(qty, int) \
+                    or not 0 < qty <= self.MAX_QUANTITY:
+                raise ValueError(
+                    f"Invalid quantity for {item}: {qty!r} (1 to {self.MAX_QUANTITY})"
+                )
+            details.append((cat, item, qty, price))
+        return details, menu.version
+
+    def build_order(self, order_details, menu_version=None):
+        order = OrderModel(menu_version)
+        for cat, item, qty, price in order_details:
+            order.add_item(cat, item, qty, price)
+        return order
+
+    def render_invoice(self, order):
+        return render_invoice(self.compiled_template, order)
+
+    def place_order(self, order_details, customer_name="Walk-in", menu_version=None):
+        # Returns (order, invoice text, future resolving to the stored order
+        # id once the order is durable).
+        order = self.build_order(order_details, menu_version)
+        invoice = self.render_invoice(order)
+        return order, invoice, self.order_writer.submit(order, customer_name)
+
+    def list_orders(self, before=None, query=None, limit=50):
+        # (order summaries, cursor for the next page or None); see
+        # OrderHistoryModel.page.
+        return self.history.page(before, limit, query)
+
+    def order_invoice(self, order_id):
+        # Re-renders a stored order's invoice with the current template, or
+        # returns None if there is no such order. Raises UnreadableOrder for
+        # an order whose stored details cannot be read.
+        stored = self.history.get_order(order_id)
+        if stored is None:
+            return None
+        return self.render_invoice(stored_order_model(stored))
+
+    def close(self):
+        self.order_writer.close()
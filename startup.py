@@ -0,0 +1,120 @@
+# startup.py
+# Cold-start helpers: lazily executed modules and the --profile-startup
+# timeline of imports and startup stages.
+import importlib.util
+import sys
+import time
+
+
+def lazy_import(name):
+    # Returns module `name`, executed on first attribute access instead of
+    # now (importlib.util.LazyLoader). Already imported modules are returned
+    # as they are.
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# Records when each module is executed and how long it takes, like
+# `python -X importtime`, plus named startup stages:
+#   profile.start()            as early as possible in main.py
+#   profile.mark("HomeView")   at each stage; a no-op unless started
+#   profile.finish()           prints the report and stops recording
+class StartupProfile:
+    def __init__(self):
+        self.enabled = False
+        # main.py imports this module first, so offsets are roughly from
+        # the start of main.py.
+        self.started = time.perf_counter()
+        self.marks = []
+        # (offset, depth, name, cumulative seconds, self seconds) per module,
+        # in the order imports finished.
+        self.imports = []
+        # [name, start, seconds spent in nested imports] per import in progress.
+        self.stack = []
+
+    def start(self):
+        self.enabled = True
+        sys.meta_path.insert(0, self)
+
+    def mark(self, stage):
+        if self.enabled:
+            self.marks.append((time.perf_counter() - self.started, stage))
+
+    def finish(self):
+        if not self.enabled:
+            return
+        self.mark("startup complete")
+        self.enabled = False
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        print(self.report())
+
+    # --- Import hook ---
+    # A meta path finder that lets the other finders locate the module and
+    # then times its loader's exec_module. Built-in and frozen modules are
+    # loaded by shared importer classes and are not hooked; their time
+    # counts towards the module importing them.
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            find_spec = getattr(finder, "find_spec", None)
+            if finder is self or find_spec is None:
+                continue
+            spec = find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        loader = spec.loader
+        if self.enabled and loader is not None and not isinstance(loader, type) \
+                and hasattr(loader, "exec_module"):
+            loader.exec_module = self.timed(name, loader.exec_module)
+        return spec
+
+    def timed(self, name, exec_module):
+        def timed_exec_module(module):
+            start = time.perf_counter()
+            self.stack.append([name, start, 0.0])
+            try:
+                exec_module(module)
+            finally:
+                _, _, nested = self.stack.pop()
+                elapsed = time.perf_counter() - start
+                if self.stack:
+                    self.stack[-1][2] += elapsed
+                self.imports.append(
+                    (start - self.started, len(self.stack), name, elapsed, elapsed - nested)
+                )
+        return timed_exec_module
+
+    def report(self, top=20):
+        lines = ["Startup timeline (ms since main.py started):"]
+        lines += [f"  {offset * 1000:9.1f}  {stage}" for offset, stage in self.marks]
+        # Only top-level imports, so nested ones are not counted twice.
+        total = sum(cumulative for _, depth, _, cumulative, _ in self.imports if depth == 0)
+        lines += [
+            "",
+            f"Imports: {len(self.imports)} modules, {total * 1000:.1f} ms; "
+            f"slowest {min(top, len(self.imports))} by cumulative time:",
+            f"  {'at ms':>9}  {'cum ms':>8}  {'self ms':>8}  module",
+        ]
+        slowest = sorted(self.imports, key=lambda entry: -entry[3])[:top]
+        for offset, depth, name, cumulative, own in slowest:
+            lines.append(
+                f"  {offset * 1000:9.1f}  {cumulative * 1000:8.1f}  {own * 1000:8.1f}  "
+                f"{'  ' * depth}{name}"
+            )
+        return "\n".join(lines)
+
+
+profile = StartupProfile()
@@ -0,0 +1,113 @@
+# tasks.py
+import queue
+import time
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import metrics
+
+
+# Runs blocking work (database writes, network calls, hashing) on a bounded
+# thread pool and delivers results back on the Tk thread. Workers never touch
+# Tk: completions and call_soon() requests go through a queue that the Tk
+# loop drains with after(), quickly while tasks are outstanding and slowly
+# when idle.
+#   tasks.submit(fn, *args, on_done=cb, on_error=eb, owner=window)
+# Writes that must land in the order they were asked for (menu edits) are
+# submitted with serial=True and run one at a time on their own worker;
+# they are never dropped, only their callbacks are when the owner goes.
+# Tasks submitted with an owner widget are cancelled when it is destroyed:
+# queued work is dropped and running work finishes without its callbacks.
+class TaskRunner:
+    def __init__(self, root, max_workers=4, busy_ms=15, idle_ms=100):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task")
+        self.serial_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-serial")
+        self.busy_ms = busy_ms
+        self.idle_ms = idle_ms
+        self.queue = queue.SimpleQueue()
+        # Future -> (owner, on_done, on_error, serial) for tasks not yet delivered.
+        self.pending = {}
+        # Future -> (operation name, start time) while metrics are enabled.
+        self.operations = {}
+        self.owners = set()
+        self.closed = False
+        self.poll_id = self.root.after(self.idle_ms, self.poll)
+
+    def submit(self, fn, *args, on_done=None, on_error=None, owner=None, serial=False):
+        # on_done(result) and on_error(exception) run on the Tk thread;
+        # errors without an on_error handler are printed.
+        executor = self.serial_executor if serial else self.executor
+        future = executor.submit(fn, *args)
+        self.pending[future] = (owner, on_done, on_error, serial)
+        if metrics.enabled and metrics.current is not None:
+            self.operations[future] = metrics.current
+        future.add_done_callback(lambda f: self.queue.put((self.deliver, (f,))))
+        if owner is not None and owner not in self.owners:
+            self.owners.add(owner)
+            tk.Misc.bind(owner, "<Destroy>",
+                         lambda e: self.cancel(owner) if e.widget is owner else None, "+")
+        if self.poll_id is not None:
+            # Switch to the fast poll straight away.
+            self.root.after_cancel(self.poll_id)
+            self.poll_id = self.root.after(self.busy_ms, self.poll)
+        return future
+
+    def call_soon(self, fn, *args):
+        # Thread-safe: runs fn(*args) on the Tk thread at the next poll.
+        self.queue.put((fn, args))
+
+    def threadsafe(self, fn):
+        # Wraps a callback (e.g. a model listener) so that calls from any
+        # thread are delivered on the Tk thread.
+        return lambda *args: self.call_soon(fn, *args)
+
+    def cancel(self, owner):
+        self.owners.discard(owner)
+        for future, (task_owner, _, _, serial) in list(self.pending.items()):
+            if task_owner is owner:
+                if not serial:
+                    future.cancel()
+                del self.pending[future]
+
+    def poll(self):
+        self.poll_id = None
+        while True:
+            try:
+                fn, args = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn(*args)
+            except Exception as e:
+                print("Task callback error:", e)
+        if not self.closed:
+            delay = self.busy_ms if self.pending else self.idle_ms
+            self.poll_id = self.root.after(delay, self.poll)
+
+    def deliver(self, future):
+        entry = self.pending.pop(future, None)
+        operation = self.operations.pop(future, None)
+        if entry is None or future.cancelled():
+            return
+        _, on_done, on_error, _ = entry
+        try:
+            error = future.exception()
+            if error is None:
+                if on_done is not None:
+                    on_done(future.result())
+            elif on_error is not None:
+                on_error(error)
+            else:
+                print("Task error:", error)
+        finally:
+            if operation is not None:
+                name, start = operation
+                metrics.record(f"{name} (done)", time.perf_counter() - start)
+
+    def shutdown(self):
+        # Lets running and queued work finish (e.g. pending menu writes)
+        # without delivering callbacks to windows that are gone.
+        self.closed = True
+        self.serial_executor.shutdown(wait=True)
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,94 @@
+# tests/conftest.py
+# The modules live at the repository root; tests run against throwaway
+# copies of a freshly migrated database, never restaurant.db.
+import json
+import os
+import shutil
+import sqlite3
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from database import connect  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def migrated_db(tmp_path_factory):
+    # Migrating hashes the default passwords, so it is done once per session.
+    path = str(tmp_path_factory.mktemp("template") / "restaurant.db")
+    conn = connect(path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def db_path(migrated_db, tmp_path):
+    path = str(tmp_path / "restaurant.db")
+    shutil.copyfile(migrated_db, path)
+    return path
+
+
+# The schema and data the till shipped with before migrations existed.
+LEGACY_SCHEMA = """
+    CREATE TABLE users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        hashed_password TEXT NOT NULL,
+        security_question TEXT NOT NULL,
+        security_answer TEXT NOT NULL
+    );
+    CREATE TABLE orders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        customer_name TEXT NOT NULL,
+        total_cost REAL NOT NULL,
+        time_of_order TEXT NOT NULL,
+        order_details TEXT NOT NULL
+    );
+    INSERT INTO users (username, hashed_password, security_question, security_answer)
+        VALUES ('admin@example.com',
+                'ef92b778bafe771e89245b89ecbc08a44a4e166c06659911881f383d4473e94f',
+                'Your favorite color?', 'blue');
+"""
+# Prices were float cedis then.
+LEGACY_ORDER_LINES = [
+    {"category": "Main Courses", "item": "Banku & Tilapia", "quantity": 2,
+     "unit_price": 50.25, "total_price": 100.5},
+    {"category": "Drinks", "item": "Beer (Local)", "quantity": 1,
+     "unit_price": 30.0, "total_price": 30.0},
+]
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.execute(
+        "INSERT INTO orders (customer_name, total_cost, time_of_order, order_details) "
+        "VALUES ('Walk-in', 130.5, '2024-03-01 12:30:00', ?)",
+        (json.dumps(LEGACY_ORDER_LINES),)
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def service(db_path):
+    # Every model gets the test database; the defaults would open restaurant.db.
+    from model import MenuModel, OrderHistoryModel, SettingsModel
+    from order_writer import OrderWriter
+    from service import OrderService
+
+    service = OrderService(
+        MenuModel(db_path), OrderWriter(db_path, max_delay_ms=0),
+        OrderHistoryModel(db_path), SettingsModel(db_path)
+    )
+    yield service
+    service.close()
+    service.menu_model.conn.close()
@@ -0,0 +1,77 @@
+# tests/test_analytics.py
+import datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from analytics import SalesAnalytics  # noqa: E402
+from database import connect, insert_order_lines, local_timestamp  # noqa: E402
+from money import Money  # noqa: E402
+
+MARCH_1 = datetime.datetime(2024, 3, 1, 12, 30)
+MARCH_2 = datetime.datetime(2024, 3, 2, 9, 0)
+
+
+def add_order(path, when, lines):
+    # lines: (category, item, quantity, unit pesewas)
+    conn = connect(path)
+    conn.execute("BEGIN IMMEDIATE")
+    order_id = conn.execute(
+        "INSERT INTO orders (customer_name, total_cost, time_of_order, order_details) "
+        "VALUES ('Walk-in', 0, ?, '[]')", (when.strftime("%Y-%m-%d %H:%M:%S"),)
+    ).lastrowid
+    insert_order_lines(conn, order_id, local_timestamp(when), [
+        {"category": c, "item": i, "quantity": q, "unit_amount": p, "amount": q * p}
+        for c, i, q, p in lines
+    ])
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def test_revenue_by_item_and_category(db_path):
+    add_order(db_path, MARCH_1, [("Main Courses", "Waakye", 2, 4000),
+                                 ("Drinks", "Beer (Local)", 1, 2500)])
+    add_order(db_path, MARCH_2, [("Main Courses", "Waakye", 1, 4000)])
+    analytics = SalesAnalytics(db_path)
+    assert analytics.revenue_by("item") == [
+        (("Main Courses", "Waakye"), 3, Money(12000)),
+        (("Drinks", "Beer (Local)"), 1, Money(2500)),
+    ]
+    assert analytics.revenue_by("category") == [
+        ("Main Courses", 3, Money(12000)), ("Drinks", 1, Money(2500)),
+    ]
+    assert analytics.revenue_by("hour") == [(12, 3, Money(10500)), (9, 1, Money(4000))]
+
+
+def test_empty_database_and_empty_window(db_path):
+    analytics = SalesAnalytics(db_path)
+    assert analytics.revenue_by("item") == []
+    add_order(db_path, MARCH_1, [("Main Courses", "Waakye", 2, 4000)])
+    # Nothing in the window, folded both into a new and a cached report.
+    window = (MARCH_2, MARCH_2 + datetime.timedelta(days=1))
+    assert analytics.revenue_by("day", *window) == []
+    assert analytics.revenue_by("item") == [(("Main Courses", "Waakye"), 2, Money(8000))]
+    add_order(db_path, MARCH_1, [("Drinks", "Beer (Local)", 1, 2500)])
+    assert analytics.revenue_by("day", *window) == []
+    # A cached report that has keys, then a fold whose lines all fall outside.
+    assert analytics.revenue_by("item", MARCH_1) == [
+        (("Main Courses", "Waakye"), 2, Money(8000)),
+        (("Drinks", "Beer (Local)"), 1, Money(2500)),
+    ]
+    add_order(db_path, MARCH_1 - datetime.timedelta(days=1), [("Main Courses", "Waakye", 5, 4000)])
+    assert analytics.revenue_by("item", MARCH_1) == [
+        (("Main Courses", "Waakye"), 2, Money(8000)),
+        (("Drinks", "Beer (Local)"), 1, Money(2500)),
+    ]
+
+
+def test_reports_fold_in_new_orders(db_path):
+    analytics = SalesAnalytics(db_path)
+    add_order(db_path, MARCH_1, [("Drinks", "Beer (Local)", 1, 2500)])
+    assert analytics.top_items(1) == [(("Drinks", "Beer (Local)"), 1, Money(2500))]
+    add_order(db_path, MARCH_2, [("Main Courses", "Waakye", 1, 4000)])
+    assert analytics.top_items(1) == [(("Main Courses", "Waakye"), 1, Money(4000))]
+    assert analytics.revenue_by("day") == [
+        (MARCH_2.date(), 1, Money(4000)), (MARCH_1.date(), 1, Money(2500)),
+    ]
@@ -0,0 +1,225 @@
+# tests/test_database.py
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import database
+from database import MIGRATIONS, connect, migrate
+from model import MenuModel
+from money import Money
+
+
+def user_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def test_fresh_database_is_fully_migrated(db_path):
+    conn = connect(db_path)
+    assert user_version(conn) == len(MIGRATIONS)
+    assert conn.execute("SELECT count(*) FROM menu_items").fetchone()[0] > 0
+    conn.close()
+
+
+def test_legacy_database_keeps_its_data(legacy_db):
+    conn = connect(legacy_db)
+    assert user_version(conn) == len(MIGRATIONS)
+    total, total_amount = conn.execute(
+        "SELECT total_cost, total_amount FROM orders"
+    ).fetchone()
+    assert (total, total_amount) == (130.5, 13050)
+    lines = conn.execute(
+        "SELECT quantity, unit_amount, amount FROM order_lines ORDER BY id"
+    ).fetchall()
+    assert lines == [(2, 5025, 10050), (1, 3000, 3000)]
+    assert conn.execute(
+        "SELECT role FROM users WHERE username = 'admin@example.com'"
+    ).fetchone() == ("admin",)
+    assert conn.execute(
+        "SELECT rowid FROM orders_fts WHERE orders_fts MATCH 'tilapia'"
+    ).fetchall() == [(1,)]
+    conn.close()
+
+
+def test_migrate_twice_is_a_no_op(legacy_db):
+    conn = connect(legacy_db)
+    schema = conn.execute("SELECT sql FROM sqlite_master ORDER BY name").fetchall()
+    migrate(conn)
+    assert user_version(conn) == len(MIGRATIONS)
+    assert conn.execute("SELECT sql FROM sqlite_master ORDER BY name").fetchall() == schema
+    assert conn.execute("SELECT count(*) FROM order_lines").fetchone()[0] == 2
+    conn.close()
+
+
+def test_migrate_skips_steps_applied_after_its_first_read(legacy_db):
+    # Simulates another process migrating between this connection reading
+    # user_version and taking the write lock.
+    reads = []
+
+    class StaleConnection(sqlite3.Connection):
+        def execute(self, sql, *args):
+            if sql == "PRAGMA user_version" and not reads:
+                reads.append(sql)
+                version = super().execute(sql).fetchone()[0]
+                migrate(sqlite3.connect(legacy_db, isolation_level=None))
+                return FakeCursor(version)
+            return super().execute(sql, *args)
+
+    class FakeCursor:
+        def __init__(self, version):
+            self.version = version
+
+        def fetchone(self):
+            return (self.version,)
+
+    conn = sqlite3.connect(legacy_db, isolation_level=None, factory=StaleConnection)
+    migrate(conn)
+    assert user_version(conn) == len(MIGRATIONS)
+    assert conn.execute("SELECT count(*) FROM order_lines").fetchone()[0] == 2
+    conn.close()
+
+
+def test_concurrent_connects_migrate_once(legacy_db):
+    barrier = threading.Barrier(4)
+    errors = []
+
+    def open_db():
+        barrier.wait()
+        try:
+            connect(legacy_db).close()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_db) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    conn = connect(legacy_db)
+    assert conn.execute("SELECT count(*) FROM order_lines").fetchone()[0] == 2
+    conn.close()
+
+
+def test_legacy_orders_that_are_not_lines_still_migrate(legacy_db):
+    conn = sqlite3.connect(legacy_db)
+    conn.executemany(
+        "INSERT INTO orders (customer_name, total_cost, time_of_order, order_details) "
+        "VALUES ('Kofi', 0, '2024-03-02 09:00:00', ?)",
+        [("not json",), ('{"item": "Waakye"}',), ('["Waakye", 3]',)]
+    )
+    conn.commit()
+    conn.close()
+    conn = connect(legacy_db)
+    assert user_version(conn) == len(MIGRATIONS)
+    assert conn.execute("SELECT count(*) FROM orders_fts WHERE orders_fts MATCH 'kofi'"
+                        ).fetchone() == (3,)
+    # The insert trigger copes with the same shapes.
+    conn.execute(
+        "INSERT INTO orders (customer_name, total_cost, time_of_order, order_details) "
+        "VALUES ('Esi', 0, '2024-03-03 09:00:00', '[1, {\"item\": \"Tea\"}]')"
+    )
+    assert conn.execute("SELECT items FROM orders_fts WHERE orders_fts MATCH 'esi'"
+                        ).fetchone() == ("Tea",)
+    conn.close()
+
+
+# --- Price history ---
+
+EPOCH = "1970-01-01 00:00:00.000"
+
+
+@pytest.fixture
+def menu_model(db_path):
+    model = MenuModel(db_path)
+    yield model
+    model.conn.close()
+
+
+def edit(model, action):
+    # Returns the time the edit took effect; history times have millisecond
+    # resolution, so edits are kept at least that far apart.
+    time.sleep(0.002)
+    assert action()
+    return latest_change(model)
+
+
+def latest_change(model):
+    return model.conn.execute("SELECT max(effective_from) FROM price_history").fetchone()[0]
+
+
+def test_price_at_follows_price_updates(menu_model):
+    added = edit(menu_model, lambda: menu_model.add_item("Drinks", "Asaana", "8"))
+    updated = edit(menu_model, lambda: menu_model.update_price("Drinks", "Asaana", "9.50"))
+    assert menu_model.price_at("Drinks", "Asaana", EPOCH) is None
+    assert menu_model.price_at("Drinks", "Asaana", added) == Money(800)
+    assert menu_model.price_at("Drinks", "Asaana", updated) == Money(950)
+    assert menu_model.price_history("Drinks", "Asaana") == [
+        (added, Money(800)), (updated, Money(950))
+    ]
+    # An unchanged price records nothing.
+    menu_model.update_price("Drinks", "Asaana", "9.50")
+    assert len(menu_model.price_history("Drinks", "Asaana")) == 2
+
+
+def test_rename_ends_the_old_name_and_starts_the_new_one(menu_model):
+    added = edit(menu_model, lambda: menu_model.add_item("Drinks", "Asaana", "8"))
+    renamed = edit(menu_model, lambda: menu_model.update_product("Drinks", "Asaana", "Brukina", "9"))
+    assert menu_model.price_at("Drinks", "Asaana", added) == Money(800)
+    assert menu_model.price_at("Drinks", "Asaana", renamed) is None
+    assert menu_model.price_at("Drinks", "Brukina", added) is None
+    assert menu_model.price_at("Drinks", "Brukina", renamed) == Money(900)
+    assert "Asaana" in menu_model.menu_at(added)["Drinks"]
+    assert "Asaana" not in menu_model.menu_at(renamed)["Drinks"]
+    assert menu_model.menu_at(renamed)["Drinks"]["Brukina"] == Money(900)
+
+
+def test_delete_ends_the_price(menu_model):
+    added = edit(menu_model, lambda: menu_model.add_item("Drinks", "Asaana", "8"))
+    removed = edit(menu_model, lambda: menu_model.remove_item("Drinks", "Asaana"))
+    assert menu_model.price_at("Drinks", "Asaana", added) == Money(800)
+    assert menu_model.price_at("Drinks", "Asaana", removed) is None
+    assert menu_model.price_history("Drinks", "Asaana")[-1] == (removed, None)
+    readded = edit(menu_model, lambda: menu_model.add_item("Drinks", "Asaana", "10"))
+    assert menu_model.price_at("Drinks", "Asaana", readded) == Money(1000)
+
+
+def test_category_rename_and_delete_cascade_into_history(menu_model):
+    before = latest_change(menu_model)
+    price = menu_model.get_menu()["Drinks"]["Water (Bottled)"]
+    time.sleep(0.002)
+    menu_model.conn.execute("UPDATE menu_categories SET name = 'Beverages' WHERE name = 'Drinks'")
+    renamed = latest_change(menu_model)
+    assert menu_model.price_at("Drinks", "Water (Bottled)", before) == price
+    assert menu_model.price_at("Drinks", "Water (Bottled)", renamed) is None
+    assert menu_model.price_at("Beverages", "Water (Bottled)", renamed) == price
+    assert "Drinks" not in menu_model.menu_at(renamed)
+    time.sleep(0.002)
+    menu_model.conn.execute("DELETE FROM menu_categories WHERE name = 'Beverages'")
+    removed = latest_change(menu_model)
+    assert menu_model.price_at("Beverages", "Water (Bottled)", removed) is None
+    assert "Beverages" not in menu_model.menu_at(removed)
+    assert menu_model.price_at("Beverages", "Water (Bottled)", renamed) == price
+
+
+def test_price_history_is_backfilled_on_migration(legacy_db, monkeypatch):
+    # A till that had a menu before price history existed (migrations 1-3),
+    # still with float cedis prices.
+    monkeypatch.setattr(database, "MIGRATIONS", MIGRATIONS[:3])
+    conn = connect(legacy_db)
+    conn.execute("INSERT INTO menu_items (category, item, price) VALUES ('Drinks', 'Asaana', 8.5)")
+    conn.close()
+    monkeypatch.undo()
+
+    model = MenuModel(legacy_db)
+    assert model.price_history("Drinks", "Asaana") == [(EPOCH, Money(850))]
+    assert model.price_at("Drinks", "Asaana", EPOCH) == Money(850)
+    menu = model.get_menu()
+    assert model.menu_at(EPOCH) == {
+        category: dict(items) for category, items in menu.items() if items
+    }
+    # The triggers are in place after the pesewa rebuild of migration 9.
+    updated = edit(model, lambda: model.update_price("Drinks", "Asaana", "9"))
+    assert model.price_history("Drinks", "Asaana") == [(EPOCH, Money(850)), (updated, Money(900))]
+    model.conn.close()
@@ -0,0 +1,35 @@
+# tests/test_invoice_export.py
+import datetime
+import os
+
+from invoice_export import export_invoices
+
+DAY = datetime.datetime(2024, 3, 1)
+
+
+def store_order(conn, details):
+    return conn.execute(
+        "INSERT INTO orders (customer_name, total_cost, total_amount, time_of_order, order_details) "
+        "VALUES ('Walk-in', 0, 0, '2024-03-01 12:30:00', ?)", (details,)
+    ).lastrowid
+
+
+def test_bad_orders_are_reported_and_skipped(service, db_path, tmp_path):
+    conn = service.history.conn
+    good = [
+        store_order(conn, '[{"category": "Drinks", "item": "Tea", "quantity": 2, "unit_amount": 250}]')
+        for _ in range(3)
+    ]
+    bad = store_order(conn, '{"legacy": true}')
+    good.append(store_order(conn, "[]"))
+    out = tmp_path / "invoices"
+    result = export_invoices(DAY, DAY + datetime.timedelta(days=1), str(out), db_path,
+                             workers=2, chunk_size=2)
+    assert result.exported == 4
+    assert result.errors == [(bad, f"Order #{bad} is unreadable: order details are not a list of lines")]
+    files = sorted(os.listdir(out / "2024-03-01"))
+    assert files == sorted(
+        f"invoice-{order_id:08d}.{ext}" for order_id in good for ext in ("txt", "pdf")
+    )
+    text = (out / "2024-03-01" / f"invoice-{good[0]:08d}.txt").read_text()
+    assert "Tea x 2 @ GHS 2.50 = GHS 5.00" in text
@@ -0,0 +1,101 @@
+# tests/test_invoice_template.py
+import re
+
+import pytest
+
+from invoice_template import InvoiceTemplate, TemplateError
+from model import OrderModel
+from money import Money
+from service import DEFAULT_INVOICE_TEMPLATE
+
+
+def make_order():
+    order = OrderModel()
+    order.add_item("Main Courses", "Waakye", 2, Money(4000))
+    order.add_item("Drinks", "Water (Bottled)", 1, Money(1350))
+    return order
+
+
+def render(source, order=None):
+    order = order or make_order()
+    lines = order.get_order()
+    return InvoiceTemplate(source).render(
+        order_time="2024-03-01 12:30:00", items=lines, item_count=len(lines),
+        total=order.calculate_total()
+    )
+
+
+def test_default_template():
+    assert render(DEFAULT_INVOICE_TEMPLATE) == (
+        "Invoice\nOrder Time: 2024-03-01 12:30:00\n" + "-" * 40 + "\n"
+        "Waakye x 2 @ GHS 40.00 = GHS 80.00\n"
+        "Water (Bottled) x 1 @ GHS 13.50 = GHS 13.50\n"
+        "\n" + "-" * 40 + "\nTotal: GHS 93.50\n"
+    )
+
+
+def test_item_section_and_conditional():
+    source = (
+        "{{Receipt}} {item_count} lines\n"
+        "{#items}{quantity:>3} {item:<16}|{total_price:>8.2f}\n{/items}"
+        "{?item_count}Total {total:,.2f}{/item_count}"
+    )
+    assert render(source) == (
+        "{Receipt} 2 lines\n"
+        "  2 Waakye          |   80.00\n"
+        "  1 Water (Bottled) |   13.50\n"
+        "Total 93.50"
+    )
+
+
+def test_empty_order_skips_conditional_sections():
+    source = "{#items}{item}\n{/items}{?items}has items{/items}[{total}]"
+    assert render(source, OrderModel()) == "[0.00]"
+
+
+def test_section_bodies_with_one_field_or_none():
+    assert render("{#items}{item};{/items}") == "Waakye;Water (Bottled);"
+    assert render("{#items}*{/items}") == "**"
+    assert render("{#items}{?quantity}{item}{/quantity}.{/items}") == "Waakye.Water (Bottled)."
+
+
+def test_lines_may_be_plain_dicts():
+    lines = [{"category": "Drinks", "item": "Tea", "quantity": 3,
+              "unit_price": 2.5, "total_price": 7.5}]
+    out = InvoiceTemplate("{items}").render(
+        order_time="", items=lines, item_count=1, total=Money(750)
+    )
+    assert out == "Tea x 3 @ GHS 2.50 = GHS 7.50\n"
+
+
+def test_order_lines_render_the_same_as_per_line_formatting():
+    order = OrderModel()
+    for n, pesewas in enumerate((1, 5, 99, 1250, -420, 123456789)):
+        order.add_item("Main Courses", f"Item {n}", n + 1, Money(pesewas))
+    body = "{item}|{unit_price}|{total_price:.2f}|{total_price:>14,.2f}|{quantity:03d}\n"
+    expected = "".join(body.format_map(line) for line in order.get_order())
+    assert render("{#items}" + body + "{/items}", order) == expected
+
+
+@pytest.mark.parametrize("source, message", [
+    ("{customer}", "Unknown placeholder 'customer'"),
+    ("{total:.2q}", "Invalid format for 'total'"),
+    ("{order_time!r}", "Invalid placeholder"),
+    ("{}", "Invalid placeholder"),
+    ("Total {", "Unmatched '{'"),
+    ("Total }", "Unmatched '}'"),
+    ("{/items}", "Unexpected {/items}"),
+    ("{#items}{item}", "Missing {/items}"),
+    ("{?total}x", "Missing {/total}"),
+    ("{#total}x{/total}", "'total' cannot be repeated"),
+    ("{items:>10}", "'items' does not take a format spec"),
+    ("{#items}{total}{/items}", "Unknown placeholder 'total'"),
+    ("{#items}{#items}{/items}{/items}", "Unknown placeholder 'items'"),
+])
+def test_invalid_templates(source, message):
+    with pytest.raises(TemplateError, match=re.escape(message)):
+        InvoiceTemplate(source)
+
+
+def test_template_error_is_a_value_error():
+    assert issubclass(TemplateError, ValueError)
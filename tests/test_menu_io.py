@@ -0,0 +1,141 @@
+# tests/test_menu_io.py
+import json
+
+import pytest
+
+import menu_io
+from model import BulkResult, MenuModel
+from money import Money
+
+
+@pytest.fixture
+def menu_model(db_path):
+    model = MenuModel(db_path)
+    yield model
+    model.conn.close()
+
+
+def as_dict(menu):
+    return {category: dict(items) for category, items in menu.items() if items}
+
+
+def records(*rows):
+    return list(enumerate(
+        ({"category": category, "item": item, "price": price} for category, item, price in rows),
+        start=2
+    ))
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl", ".json"])
+def test_export_import_round_trip(menu_model, tmp_path, suffix):
+    path = str(tmp_path / f"menu{suffix}")
+    menu_model.update_price("Drinks", "Water (Bottled)", "13.05")
+    menu_model.add_item("Drinks", 'Sobolo, "large"', "0.1")
+    original = as_dict(menu_model.get_menu())
+    count = menu_io.write_rows(menu_model.get_menu(), path)
+    assert count == sum(len(items) for items in original.values())
+
+    for category in list(menu_model.get_menu()):
+        menu_model.remove_category(category)
+    result = menu_model.bulk_upsert(menu_io.read_rows(path))
+    assert result == BulkResult(count, 0, 0, [])
+    assert as_dict(menu_model.get_menu()) == original
+    # Importing the same file again changes nothing.
+    version = menu_model.get_menu().version
+    assert menu_model.bulk_upsert(menu_io.read_rows(path)) == BulkResult(0, 0, count, [])
+    assert menu_model.get_menu().version == version
+
+
+def test_json_mapping_import(menu_model, tmp_path):
+    path = tmp_path / "menu.json"
+    path.write_text(json.dumps({"menu": {"Specials": {"Asaana": 8, "Brukina": "9.5"}}}))
+    result = menu_model.bulk_upsert(menu_io.read_rows(str(path)))
+    assert result == BulkResult(2, 0, 0, [])
+    assert dict(menu_model.get_menu()["Specials"]) == {
+        "Asaana": Money(800), "Brukina": Money(950)
+    }
+
+
+def test_unreadable_rows_are_reported_with_their_line(tmp_path):
+    path = tmp_path / "menu.jsonl"
+    path.write_text(
+        '{"category": "Drinks", "item": "Asaana", "price": 8}\n'
+        "\n"
+        "{not json\n"
+        "[1, 2]\n"
+    )
+    rows = list(menu_io.read_rows(str(path)))
+    assert rows[0] == (1, {"category": "Drinks", "item": "Asaana", "price": 8})
+    assert rows[1][0] == 3 and rows[1][1].startswith("Invalid JSON")
+    assert rows[2] == (4, "Expected a JSON object")
+
+
+def test_csv_needs_every_column(tmp_path):
+    path = tmp_path / "menu.csv"
+    path.write_text("category,item\nDrinks,Asaana\n")
+    assert list(menu_io.read_rows(str(path))) == [(1, "Missing column(s): price")]
+
+
+def test_unsupported_file_type():
+    with pytest.raises(ValueError, match="Unsupported menu file type"):
+        menu_io.detect_format("menu.xlsx")
+
+
+def test_non_strict_import_applies_the_valid_rows(menu_model):
+    beer = menu_model.get_menu()["Drinks"]["Beer (Local)"]
+    result = menu_model.bulk_upsert([
+        *records(("Drinks", "Asaana", "8"), ("Drinks", "Water (Bottled)", "15")),
+        (4, "Invalid JSON: Expecting value"),
+        *records(("", "Brukina", "9"), ("Drinks", "Fufu", "-1"), ("Drinks", "Kenkey", "abc"),
+                 ("Drinks", "Beer (Local)", str(beer))),
+    ])
+    assert result.inserted == 1 and result.updated == 1 and result.unchanged == 1
+    assert result.errors == [
+        (4, "Invalid JSON: Expecting value"),
+        (2, "Category and item are required"),
+        (3, "Invalid price: '-1'"),
+        (4, "Invalid price: 'abc'"),
+    ]
+    drinks = menu_model.get_menu()["Drinks"]
+    assert drinks["Asaana"] == Money(800)
+    assert drinks["Water (Bottled)"] == Money(1500)
+    assert drinks["Beer (Local)"] == beer
+    assert "Fufu" not in drinks and "Kenkey" not in drinks
+
+
+def test_strict_import_rolls_back_on_an_error(menu_model, db_path):
+    before = menu_model.get_menu()
+    rows = records(("Drinks", "Asaana", "8"), ("Specials", "Brukina", "9"),
+                   ("Drinks", "Water (Bottled)", "15"), ("Drinks", "Kenkey", "abc"),
+                   ("Drinks", "Fufu", "7"))
+    # Rows before the error have already been written in earlier chunks.
+    result = menu_model.bulk_upsert(rows, strict=True, chunk_size=2)
+    assert result == BulkResult(0, 0, 0, [(5, "Invalid price: 'abc'")])
+    assert menu_model.get_menu() is before
+    fresh = MenuModel(db_path)
+    assert as_dict(fresh.get_menu()) == as_dict(before)
+    assert fresh.get_menu().version == before.version
+    fresh.conn.close()
+
+
+def test_strict_import_without_errors_commits(menu_model):
+    result = menu_model.bulk_upsert(records(("Drinks", "Asaana", "8")), strict=True)
+    assert result == BulkResult(1, 0, 0, [])
+    assert menu_model.get_menu()["Drinks"]["Asaana"] == Money(800)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 500])
+def test_chunk_boundaries(menu_model, chunk_size):
+    version = menu_model.get_menu().version
+    changes = []
+    menu_model.subscribe(changes.append)
+    rows = records(("Specials", "Asaana", "8"), ("Specials", "Brukina", "9"),
+                   ("Specials", "Asaana", "8.5"), ("Specials", "Asaana", "8.5"))
+    result = menu_model.bulk_upsert(rows, chunk_size=chunk_size)
+    # A repeated key updates the row written earlier in the same import.
+    assert result == BulkResult(2, 1, 1, [])
+    assert dict(menu_model.get_menu()["Specials"]) == {
+        "Asaana": Money(850), "Brukina": Money(900)
+    }
+    assert menu_model.get_menu().version == version + 1
+    assert [change.kind for change in changes] == [MenuModel.MENU_RELOADED]
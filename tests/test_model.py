@@ -0,0 +1,277 @@
+# tests/test_model.py
+import json
+
+import pytest
+
+from model import MenuChange, MenuModel, OrderHistoryModel, OrderModel
+from money import Money
+
+
+# --- MenuModel ---
+
+@pytest.fixture
+def menu_model(db_path):
+    model = MenuModel(db_path)
+    yield model
+    model.conn.close()
+
+
+def stored_version(model):
+    return model.conn.execute(model.SELECT_VERSION).fetchone()[0]
+
+
+def test_snapshots_do_not_change_after_an_edit(menu_model):
+    before = menu_model.get_menu()
+    water = before["Drinks"]["Water (Bottled)"]
+    assert menu_model.update_price("Drinks", "Water (Bottled)", "15")
+    after = menu_model.get_menu()
+    assert before["Drinks"]["Water (Bottled)"] == water
+    assert after["Drinks"]["Water (Bottled)"] == Money(1500)
+    assert after is not before
+    # Copy-on-write: untouched categories are shared.
+    assert after["Main Courses"] is before["Main Courses"]
+    assert after["Drinks"] is not before["Drinks"]
+    with pytest.raises(TypeError):
+        before["Drinks"]["Water (Bottled)"] = Money(0)
+
+
+def test_snapshot_matches_a_fresh_load(menu_model, db_path):
+    menu_model.get_menu()
+    menu_model.add_category("Specials")
+    menu_model.add_item("Specials", "Asaana", "8")
+    menu_model.update_product("Drinks", "Water (Bottled)", "Water (Sachet)", "2")
+    menu_model.remove_item("Drinks", "Beer (Local)")
+    menu_model.remove_category("Other")
+    fresh = MenuModel(db_path)
+    expected = fresh.get_menu()
+    fresh.conn.close()
+    menu = menu_model.get_menu()
+    assert menu.version == expected.version
+    assert {cat: dict(items) for cat, items in menu.items()} == {
+        cat: dict(items) for cat, items in expected.items()
+    }
+
+
+def test_version_increments_once_per_edit(menu_model):
+    version = menu_model.get_menu().version
+    assert version == stored_version(menu_model)
+    assert menu_model.update_price("Drinks", "Water (Bottled)", "15")
+    assert menu_model.add_item("Drinks", "Asaana", "8")
+    assert menu_model.get_menu().version == version + 2 == stored_version(menu_model)
+    # Edits that change nothing leave the version alone.
+    assert not menu_model.add_item("Drinks", "Asaana", "8")
+    assert not menu_model.remove_item("Drinks", "Fufu")
+    assert not menu_model.add_item("Nowhere", "Fufu", "8")
+    assert menu_model.get_menu().version == version + 2 == stored_version(menu_model)
+
+
+def test_listeners_get_each_change(menu_model):
+    changes = []
+    menu_model.subscribe(changes.append)
+    menu_model.update_price("Drinks", "Water (Bottled)", "15")
+    menu_model.add_category("Specials")
+    menu_model.add_item("Specials", "Asaana", "8")
+    menu_model.update_product("Specials", "Asaana", "Brukina", "9")
+    menu_model.update_product("Specials", "Brukina", "Brukina", "10")
+    menu_model.remove_item("Specials", "Brukina")
+    menu_model.remove_category("Specials")
+    menu_model.remove_item("Specials", "Brukina")
+    assert changes == [
+        MenuChange(MenuModel.PRICE_CHANGED, "Drinks", "Water (Bottled)", None, Money(1500)),
+        MenuChange(MenuModel.CATEGORY_ADDED, "Specials", None, None, None),
+        MenuChange(MenuModel.ITEM_ADDED, "Specials", "Asaana", None, Money(800)),
+        MenuChange(MenuModel.ITEM_RENAMED, "Specials", "Asaana", "Brukina", Money(900)),
+        MenuChange(MenuModel.PRICE_CHANGED, "Specials", "Brukina", None, Money(1000)),
+        MenuChange(MenuModel.ITEM_REMOVED, "Specials", "Brukina", None, None),
+        MenuChange(MenuModel.CATEGORY_REMOVED, "Specials", None, None, None),
+    ]
+    menu_model.unsubscribe(changes.append)
+    menu_model.update_price("Drinks", "Water (Bottled)", "16")
+    assert len(changes) == 7
+
+
+def test_listeners_see_the_new_snapshot(menu_model):
+    seen = []
+    menu_model.subscribe(lambda change: seen.append(menu_model.get_menu()["Drinks"][change.item]))
+    menu_model.update_price("Drinks", "Water (Bottled)", "15")
+    assert seen == [Money(1500)]
+
+
+@pytest.mark.parametrize("price", ["-5", "abc", "", None])
+def test_edits_reject_an_invalid_price(menu_model, price):
+    before = menu_model.get_menu()
+    with pytest.raises(ValueError, match="Invalid price"):
+        menu_model.update_price("Drinks", "Water (Bottled)", price)
+    with pytest.raises(ValueError, match="Invalid price"):
+        menu_model.update_product("Drinks", "Water (Bottled)", "Water (Sachet)", price)
+    with pytest.raises(ValueError, match="Invalid price"):
+        menu_model.add_item("Drinks", "Asaana", price)
+    assert menu_model.get_menu() is before
+
+
+@pytest.mark.parametrize("name", ["", "   ", None])
+def test_rename_needs_a_name(menu_model, name):
+    before = menu_model.get_menu()
+    with pytest.raises(ValueError, match="Item name is required"):
+        menu_model.update_product("Drinks", "Water (Bottled)", name, "15")
+    assert menu_model.get_menu() is before
+
+
+def test_free_items_are_allowed(menu_model):
+    assert menu_model.update_price("Drinks", "Water (Bottled)", "0")
+    assert menu_model.get_menu()["Drinks"]["Water (Bottled)"] == Money(0)
+
+
+# --- OrderModel ---
+
+def line_summary(order):
+    return [(line.item, line.quantity, line.total_price) for line in order.get_order()]
+
+
+def test_repeated_add_merges_into_one_line():
+    order = OrderModel()
+    order.add_item("Main Courses", "Waakye", 1, Money(4000))
+    order.add_item("Drinks", "Sobolo", 2, Money(800))
+    order.add_item("Main Courses", "Waakye", 2, Money(4000))
+    assert line_summary(order) == [("Waakye", 3, Money(12000)), ("Sobolo", 2, Money(1600))]
+    assert order.calculate_total() == Money(13600)
+
+
+def test_non_positive_quantities_are_ignored():
+    order = OrderModel()
+    order.add_item("Main Courses", "Waakye", 0, Money(4000))
+    order.add_item("Main Courses", "Waakye", -1, Money(4000))
+    assert order.get_order() == []
+    assert order.calculate_total() == Money(0)
+
+
+def test_set_quantity():
+    order = OrderModel()
+    order.add_item("Main Courses", "Waakye", 1, Money(4000))
+    order.add_item("Drinks", "Sobolo", 1, Money(800))
+    assert order.set_quantity("Main Courses", "Waakye", 4)
+    assert line_summary(order) == [("Waakye", 4, Money(16000)), ("Sobolo", 1, Money(800))]
+    assert order.calculate_total() == Money(16800)
+    assert not order.set_quantity("Drinks", "Asaana", 2)
+
+
+def test_set_quantity_zero_removes_the_line():
+    order = OrderModel()
+    order.add_item("Main Courses", "Waakye", 2, Money(4000))
+    order.add_item("Drinks", "Sobolo", 1, Money(800))
+    assert order.set_quantity("Main Courses", "Waakye", 0)
+    assert line_summary(order) == [("Sobolo", 1, Money(800))]
+    assert order.calculate_total() == Money(800)
+
+
+def test_remove_item():
+    order = OrderModel()
+    order.add_item("Main Courses", "Waakye", 2, Money(4000))
+    assert not order.remove_item("Drinks", "Sobolo")
+    assert not order.remove_item("Drinks", "Waakye")
+    assert order.calculate_total() == Money(8000)
+    assert order.remove_item("Main Courses", "Waakye")
+    assert not order.remove_item("Main Courses", "Waakye")
+    assert order.get_order() == []
+    assert order.calculate_total() == Money(0)
+
+
+def test_lines_keep_the_order_they_were_first_added():
+    order = OrderModel()
+    for item in ("Waakye", "Sobolo", "Kelewele", "Banku"):
+        order.add_item("Main Courses", item, 1, Money(500))
+    order.add_item("Main Courses", "Waakye", 1, Money(500))
+    order.set_quantity("Main Courses", "Sobolo", 3)
+    order.remove_item("Main Courses", "Kelewele")
+    order.add_item("Main Courses", "Kelewele", 1, Money(500))
+    assert [line.item for line in order.get_order()] == ["Waakye", "Sobolo", "Banku", "Kelewele"]
+    assert order.calculate_total() == Money.total(line.total_price for line in order.get_order())
+
+
+def test_order_lines_read_as_mappings():
+    order = OrderModel()
+    order.add_item("Main Courses", "Waakye", 2, "40")
+    (line,) = order.get_order()
+    assert dict(line) == {
+        "category": "Main Courses", "item": "Waakye", "quantity": 2,
+        "unit_price": Money(4000), "total_price": Money(8000),
+    }
+    with pytest.raises(KeyError):
+        line["price"]
+
+
+# --- OrderHistoryModel ---
+
+@pytest.fixture
+def history(db_path):
+    history = OrderHistoryModel(db_path)
+    yield history
+    history.conn.close()
+
+
+def store_order(history, customer_name, time_of_order, items=("Waakye",)):
+    details = json.dumps([
+        {"category": "Main Courses", "item": item, "quantity": 1, "unit_amount": 4000}
+        for item in items
+    ])
+    return history.conn.execute(
+        "INSERT INTO orders (customer_name, total_cost, total_amount, time_of_order, "
+        "order_details) VALUES (?, 0, ?, ?, ?)",
+        (customer_name, 4000 * len(items), time_of_order, details)
+    ).lastrowid
+
+
+def all_pages(history, limit, query=None):
+    pages, cursor = [], None
+    while True:
+        orders, cursor = history.page(cursor, limit, query)
+        pages.append([order["id"] for order in orders])
+        if cursor is None:
+            return pages
+
+
+def test_pages_are_newest_first_and_split_identical_timestamps(history):
+    ids = [store_order(history, f"Customer {n}", "2024-03-01 12:00:00") for n in range(5)]
+    ids += [store_order(history, "Late", "2024-03-01 13:00:00")]
+    assert all_pages(history, 2) == [[ids[5], ids[4]], [ids[3], ids[2]], [ids[1], ids[0]]]
+
+
+def test_cursor_is_the_last_order_on_the_page(history):
+    ids = [store_order(history, "Ama", "2024-03-01 12:00:00") for _ in range(3)]
+    orders, cursor = history.page(limit=2)
+    assert cursor == ("2024-03-01 12:00:00", ids[1])
+    assert [order["id"] for order in history.page(cursor, 2)[0]] == [ids[0]]
+    # A page that ends exactly on the last order has no cursor.
+    assert history.page(limit=3)[1] is None
+
+
+def test_empty_history(history):
+    assert history.page() == ([], None)
+
+
+def test_search_matches_customer_and_item_word_prefixes(history):
+    ama = store_order(history, "Ama Mensah", "2024-03-01 12:00:00", ("Jollof Rice",))
+    kofi = store_order(history, "Kofi", "2024-03-01 12:05:00", ("Waakye", "Sobolo"))
+    kojo = store_order(history, "Kojo", "2024-03-01 12:10:00", ("Jollof Rice", "Sobolo"))
+    assert [o["id"] for o in history.page(query="mensah")[0]] == [ama]
+    assert [o["id"] for o in history.page(query="jol")[0]] == [kojo, ama]
+    assert [o["id"] for o in history.page(query="ko sob")[0]] == [kojo, kofi]
+    assert history.page(query="fufu") == ([], None)
+
+
+def test_search_pages_follow_the_cursor(history):
+    ids = [store_order(history, "Ama", "2024-03-01 12:00:00") for _ in range(5)]
+    store_order(history, "Kofi", "2024-03-01 12:00:00")
+    assert all_pages(history, 2, "ama") == [[ids[4], ids[3]], [ids[2], ids[1]], [ids[0]]]
+
+
+@pytest.mark.parametrize("query", ["!!!", '"', "*", "- -"])
+def test_query_without_words_matches_nothing(history, query):
+    store_order(history, "Ama", "2024-03-01 12:00:00")
+    assert history.page(query=query) == ([], None)
+
+
+def test_fts_syntax_in_a_query_is_inert(history):
+    ama = store_order(history, "Ama", "2024-03-01 12:00:00")
+    assert [o["id"] for o in history.page(query='ama" OR "kofi')[0]] == []
+    assert [o["id"] for o in history.page(query="ama*")[0]] == [ama]
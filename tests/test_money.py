@@ -0,0 +1,114 @@
+# tests/test_money.py
+from decimal import Decimal
+
+import pytest
+
+from invoice_template import InvoiceTemplate
+from money import MAX_PESEWAS, Money
+
+
+@pytest.mark.parametrize("value, pesewas", [
+    ("12.50", 1250),
+    (" 12.5 ", 1250),
+    ("7", 700),
+    (12, 1200),
+    (12.3, 1230),
+    (0.1, 10),
+    (Decimal("19.99"), 1999),
+    ("-4.20", -420),
+    (-0.01, -1),
+    ("0", 0),
+])
+def test_parse(value, pesewas):
+    amount = Money.parse(value)
+    assert type(amount) is Money
+    assert amount == pesewas
+
+
+@pytest.mark.parametrize("value, pesewas", [
+    ("0.005", 1),
+    ("0.004", 0),
+    ("2.675", 268),
+    (2.675, 268),
+    ("-0.005", -1),
+    ("-2.345", -235),
+])
+def test_parse_rounds_half_up(value, pesewas):
+    assert Money.parse(value) == pesewas
+
+
+def test_parse_keeps_money():
+    amount = Money(1250)
+    assert Money.parse(amount) is amount
+
+
+@pytest.mark.parametrize("value", ["", "abc", "12,50", None, [], "nan", "inf", float("inf")])
+def test_parse_rejects_invalid_amounts(value):
+    with pytest.raises(ValueError, match="Invalid amount"):
+        Money.parse(value)
+
+
+@pytest.mark.parametrize("value", [
+    "1e100", "9" * 30, 1e30, str((MAX_PESEWAS + 1) / 100), "-92233720368547758.09",
+])
+def test_parse_rejects_out_of_range_amounts(value):
+    with pytest.raises(ValueError, match="out of range"):
+        Money.parse(value)
+
+
+def test_parse_accepts_the_64_bit_limits():
+    assert Money.parse("92233720368547758.07") == MAX_PESEWAS
+    assert Money.parse("-92233720368547758.08") == -MAX_PESEWAS - 1
+
+
+def test_arithmetic_stays_money():
+    price = Money(1250)
+    for amount in (price + 50, 50 + price, price - 50, 5000 - price, price * 3, 3 * price, -price):
+        assert type(amount) is Money
+    assert price * 3 == 3750
+    assert 5000 - price == 3750
+    assert Money.total([price, Money(50), Money(-100)]) == 1200
+    assert type(price * 1.5) is float
+
+
+@pytest.mark.parametrize("pesewas, spec, text", [
+    (1250, "", "12.50"),
+    (1250, ".2f", "12.50"),
+    (5, ".2f", "0.05"),
+    (-5, ".2f", "-0.05"),
+    (-123456, "", "-1234.56"),
+    (123456789, ",.2f", "1,234,567.89"),
+    (1250, ">10.2f", "     12.50"),
+    (-1250, ">10.2f", "    -12.50"),
+    (MAX_PESEWAS, ".2f", "92233720368547758.07"),
+])
+def test_format(pesewas, spec, text):
+    assert format(Money(pesewas), spec) == text
+
+
+def test_str_and_repr():
+    assert str(Money(-1)) == "-0.01"
+    assert repr(Money(1250)) == "Money(1250)"
+    assert Money(1250).cedis == 12.5
+
+
+def line(item, quantity, unit_price):
+    return {"category": "Main Courses", "item": item, "quantity": quantity,
+            "unit_price": unit_price, "total_price": unit_price * quantity}
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 10])
+def test_invoice_lines_match_money_format(count):
+    template = InvoiceTemplate("{#items}{item} {unit_price} {total_price:.2f} {total_price:>10,.2f}\n{/items}")
+    lines = [line(f"Item{i}", i + 1, Money(1999 - 1000 * i)) for i in range(count)]
+    expected = "".join(
+        f"{l['item']} {l['unit_price']} {l['total_price']:.2f} {l['total_price']:>10,.2f}\n"
+        for l in lines
+    )
+    assert template.render(items=lines) == expected
+
+
+def test_invoice_lines_beyond_float_precision_stay_exact():
+    template = InvoiceTemplate("{#items}{total_price:.2f}\n{/items}")
+    lines = [line("Item", 1, Money(2 ** 53 + 1))] * 3
+    assert template.render(items=lines) == "90071992547409.93\n" * 3
@@ -0,0 +1,115 @@
+# tests/test_order_writer.py
+import sqlite3
+import threading
+
+import pytest
+
+from database import connect
+from model import OrderModel
+from money import Money
+from order_writer import OrderWriter
+
+
+def make_order(quantity=1):
+    order = OrderModel(menu_version=1)
+    order.add_item("Main Courses", "Waakye", quantity, Money(4000))
+    order.add_item("Drinks", "Water (Bottled)", 1, Money(1300))
+    return order
+
+
+def stored_rows(path):
+    conn = connect(path)
+    orders = conn.execute("SELECT id, customer_name, total_amount FROM orders").fetchall()
+    lines = conn.execute("SELECT order_id, amount FROM order_lines ORDER BY id").fetchall()
+    conn.close()
+    return orders, lines
+
+
+def test_concurrent_orders_commit_as_one_group(db_path):
+    writer = OrderWriter(db_path, batch_size=20, max_delay_ms=5000)
+    start = threading.Barrier(20)
+    futures = []
+
+    def submit(n):
+        start.wait()
+        futures.append(writer.submit(make_order(n + 1), f"Customer {n}"))
+
+    threads = [threading.Thread(target=submit, args=(n,)) for n in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # A full batch commits without waiting for max_delay_ms.
+    ids = [future.result(timeout=2) for future in futures]
+    writer.close()
+    assert len(set(ids)) == 20
+    orders, lines = stored_rows(db_path)
+    assert sorted(order_id for order_id, _, _ in orders) == sorted(ids)
+    assert len(lines) == 40
+
+
+def test_orders_are_not_acknowledged_before_commit(db_path):
+    writer = OrderWriter(db_path, batch_size=10, max_delay_ms=300)
+    future = writer.submit(make_order())
+    assert not future.done()
+    assert stored_rows(db_path) == ([], [])
+    order_id = future.result(timeout=2)
+    writer.close()
+    assert stored_rows(db_path)[0] == [(order_id, "Walk-in", 5300)]
+
+
+def test_bad_order_fails_only_its_own_future(db_path):
+    writer = OrderWriter(db_path, batch_size=21, max_delay_ms=5000)
+    good = [writer.submit(make_order(), f"Customer {n}") for n in range(10)]
+    # customer_name is NOT NULL.
+    bad = writer.submit(make_order(), None)
+    good += [writer.submit(make_order(), f"Customer {n}") for n in range(10, 20)]
+    with pytest.raises(sqlite3.IntegrityError):
+        bad.result(timeout=2)
+    ids = [future.result(timeout=2) for future in good]
+    writer.close()
+    orders, lines = stored_rows(db_path)
+    assert sorted(order_id for order_id, _, _ in orders) == sorted(ids)
+    assert {order_id for order_id, _ in lines} == set(ids)
+    assert len(lines) == 40
+
+
+def test_failed_commit_fails_the_whole_batch(db_path):
+    # Every insert succeeds, but a deferred foreign key makes COMMIT fail.
+    conn = connect(db_path)
+    conn.executescript("""
+        CREATE TABLE audit (
+            order_id INTEGER REFERENCES missing(id) DEFERRABLE INITIALLY DEFERRED
+        );
+        CREATE TABLE missing (id INTEGER PRIMARY KEY);
+        CREATE TRIGGER trg_audit AFTER INSERT ON orders
+        BEGIN
+            INSERT INTO audit (order_id) VALUES (NEW.id);
+        END;
+    """)
+    conn.close()
+    writer = OrderWriter(db_path, batch_size=3, max_delay_ms=5000)
+    futures = [writer.submit(make_order()) for _ in range(3)]
+    for future in futures:
+        with pytest.raises(sqlite3.IntegrityError):
+            future.result(timeout=2)
+    writer.close()
+    assert stored_rows(db_path) == ([], [])
+
+
+def test_close_flushes_queued_orders(db_path):
+    writer = OrderWriter(db_path, batch_size=50, max_delay_ms=60_000)
+    futures = [writer.submit(make_order()) for _ in range(5)]
+    writer.close()
+    ids = [future.result(timeout=0) for future in futures]
+    assert sorted(order_id for order_id, _, _ in stored_rows(db_path)[0]) == sorted(ids)
+    with pytest.raises(RuntimeError):
+        writer.submit(make_order())
+
+
+def test_flush_waits_for_earlier_orders(db_path):
+    writer = OrderWriter(db_path, batch_size=50, max_delay_ms=50)
+    futures = [writer.submit(make_order()) for _ in range(3)]
+    assert writer.flush(timeout=5)
+    assert all(future.done() for future in futures)
+    writer.close()
@@ -0,0 +1,125 @@
+# tests/test_passwords.py
+import hashlib
+
+import pytest
+
+from model import UserModel
+from passwords import ALGORITHM, hash_password, needs_rehash, verify_password
+
+# Tests use a low work factor; the hashes are the same shape.
+ITERATIONS = 1000
+
+
+def stored_hash(model, username):
+    return model.conn.execute(
+        "SELECT hashed_password FROM users WHERE username = ?", (username,)
+    ).fetchone()[0]
+
+
+def test_hash_and_verify():
+    encoded = hash_password("s3cret", ITERATIONS)
+    algorithm, iterations, salt, digest = encoded.split("$")
+    assert (algorithm, iterations) == (ALGORITHM, str(ITERATIONS))
+    assert verify_password("s3cret", encoded)
+    assert not verify_password("s3cret ", encoded)
+    assert not verify_password("", encoded)
+    # Salted: the same password never hashes the same way twice.
+    assert hash_password("s3cret", ITERATIONS) != encoded
+
+
+def test_legacy_sha256_hashes_verify():
+    legacy = hashlib.sha256(b"password123").hexdigest()
+    assert verify_password("password123", legacy)
+    assert not verify_password("password124", legacy)
+    assert needs_rehash(legacy)
+
+
+@pytest.mark.parametrize("encoded", [
+    "", "plaintext", "md5$1000$c2FsdA==$ZGlnZXN0", "pbkdf2_sha256$many$c2FsdA==$ZGlnZXN0",
+    "pbkdf2_sha256$1000$!!!$ZGlnZXN0", "pbkdf2_sha256$1000$c2FsdA==",
+])
+def test_malformed_hashes_never_verify(encoded):
+    assert not verify_password("plaintext", encoded)
+
+
+def test_needs_rehash_on_a_changed_work_factor():
+    encoded = hash_password("s3cret", ITERATIONS)
+    assert not needs_rehash(encoded, ITERATIONS)
+    assert needs_rehash(encoded, ITERATIONS * 2)
+
+
+# --- UserModel ---
+
+@pytest.fixture
+def users(db_path):
+    model = UserModel(db_path, iterations=ITERATIONS)
+    yield model
+    model.conn.close()
+
+
+def test_default_users_are_stored_hashed(users):
+    encoded = stored_hash(users, "cashier")
+    assert encoded != "cashier123"
+    assert encoded.startswith(ALGORITHM + "$")
+    assert users.validate_user("cashier", "cashier123") == "cashier"
+
+
+def test_wrong_password_and_unknown_user(users):
+    assert users.validate_user("cashier", "cashier124") is None
+    assert users.validate_user("nobody", "cashier123") is None
+    assert users.sessions == {}
+
+
+def test_login_rehashes_on_a_changed_work_factor(users):
+    assert users.validate_user("admin", "admin123") == "admin"
+    upgraded = stored_hash(users, "admin")
+    assert upgraded.split("$")[1] == str(ITERATIONS)
+    users.iterations = ITERATIONS * 2
+    assert users.validate_user("admin", "admin123") == "admin"
+    assert stored_hash(users, "admin").split("$")[1] == str(ITERATIONS * 2)
+    assert verify_password("admin123", stored_hash(users, "admin"))
+    # A failed login leaves the hash alone.
+    users.iterations = ITERATIONS
+    assert users.validate_user("admin", "wrong") is None
+    assert stored_hash(users, "admin").split("$")[1] == str(ITERATIONS * 2)
+
+
+def test_legacy_sha256_login_is_upgraded(legacy_db):
+    users = UserModel(legacy_db, iterations=ITERATIONS)
+    assert stored_hash(users, "admin@example.com") == hashlib.sha256(b"password123").hexdigest()
+    assert users.validate_user("admin@example.com", "wrong") is None
+    assert users.validate_user("admin@example.com", "password123") == "admin"
+    upgraded = stored_hash(users, "admin@example.com")
+    assert upgraded.startswith(f"{ALGORITHM}${ITERATIONS}$")
+    assert users.validate_user("admin@example.com", "password123") == "admin"
+    users.conn.close()
+
+
+def test_session_skips_the_kdf_for_the_same_credentials(users):
+    assert users.session_role("cashier", "cashier123") is None
+    users.validate_user("cashier", "cashier123")
+    assert users.session_role("cashier", "cashier123") == "cashier"
+    assert users.session_role("cashier", "cashier124") is None
+    assert users.session_role("admin", "cashier123") is None
+    users.end_session("cashier")
+    assert users.session_role("cashier", "cashier123") is None
+
+
+def test_tampered_session_is_rejected(users):
+    users.validate_user("cashier", "cashier123")
+    role, digest, expires = users.sessions["cashier"]
+    users.sessions["cashier"] = ("admin", bytes(len(digest)), expires)
+    assert users.session_role("cashier", "cashier123") is None
+    # Digests are keyed per process, so another model's digest is no use.
+    other = UserModel.__new__(UserModel)
+    other.session_key = b"\0" * 32
+    users.sessions["cashier"] = (role, other._session_digest("cashier123"), expires)
+    assert users.session_role("cashier", "cashier123") is None
+
+
+def test_expired_session_is_dropped(users, monkeypatch):
+    users.validate_user("cashier", "cashier123")
+    expires = users.sessions["cashier"][2]
+    monkeypatch.setattr("model.time.monotonic", lambda: expires + 1)
+    assert users.session_role("cashier", "cashier123") is None
+    assert "cashier" not in users.sessions
@@ -0,0 +1,138 @@
+# tests/test_search.py
+import threading
+
+import pytest
+
+from model import MenuModel
+from search import MenuSearchIndex
+
+MENU = {
+    "Main Courses": {
+        "Jollof Rice": 0, "Jollof with Chicken": 0, "Fried Rice": 0,
+        "Waakye": 0, "Banku with Tilapia": 0,
+    },
+    "Drinks": {"Water (Bottled)": 0, "Sobolo": 0, "Chicken Soup": 0},
+}
+
+
+@pytest.fixture
+def index():
+    index = MenuSearchIndex()
+    index.rebuild(MENU)
+    return index
+
+
+def test_word_prefixes_match(index):
+    assert index.search("wat") == [("Drinks", "Water (Bottled)")]
+    assert index.search("bottled WATER") == [("Drinks", "Water (Bottled)")]
+    assert index.search("tilap ban") == [("Main Courses", "Banku with Tilapia")]
+
+
+def test_names_starting_with_the_query_rank_first(index):
+    # Then names whose first word matches, then the rest; shorter names
+    # break ties.
+    assert index.search("jollof") == [
+        ("Main Courses", "Jollof Rice"), ("Main Courses", "Jollof with Chicken")
+    ]
+    assert index.search("rice") == [("Main Courses", "Fried Rice"), ("Main Courses", "Jollof Rice")]
+    assert index.search("chicken") == [
+        ("Drinks", "Chicken Soup"), ("Main Courses", "Jollof with Chicken")
+    ]
+
+
+def test_typos_fall_back_to_trigrams(index):
+    assert index.search("jolof")[:2] == [
+        ("Main Courses", "Jollof Rice"), ("Main Courses", "Jollof with Chicken")
+    ]
+    assert index.search("sobollo") == [("Drinks", "Sobolo")]
+    assert index.search("pizza") == []
+
+
+def test_queries_without_words_match_nothing(index):
+    assert index.search("") == []
+    assert index.search("!!!") == []
+
+
+def test_limit(index):
+    assert index.search("ri", limit=1) == [("Main Courses", "Fried Rice")]
+    assert len(index.search("ri", limit=20)) == 2
+
+
+def test_common_words_stop_at_the_candidate_cap():
+    items = {f"Dish {n:05d} with Rice": 0 for n in range(2000)}
+    index = MenuSearchIndex()
+    index.rebuild({"Main Courses": items})
+    results = index.search("with", limit=5)
+    assert len(results) == 5
+    assert all("with" in item for _, item in results)
+    assert len(index.search("d", limit=500)) == 500
+
+
+def test_add_and_remove(index):
+    index.add("Drinks", "Pineapple Juice")
+    assert index.search("pine") == [("Drinks", "Pineapple Juice")]
+    index.add("Drinks", "Pineapple Juice")
+    assert index.search("pine") == [("Drinks", "Pineapple Juice")]
+    index.remove("Drinks", "Pineapple Juice")
+    assert index.search("pine") == []
+    assert index.search("pineaple") == []
+    index.remove_category("Main Courses")
+    assert index.search("rice") == []
+    assert index.search("water") == [("Drinks", "Water (Bottled)")]
+    assert index.tokens == sorted(index.tokens)
+    assert index.phrases == sorted(index.phrases)
+
+
+# --- MenuModel ---
+
+@pytest.fixture
+def menu_model(db_path):
+    model = MenuModel(db_path)
+    yield model
+    model.conn.close()
+
+
+def test_menu_changes_update_the_index(menu_model):
+    menu_model.build_search_index()
+    index = menu_model.search_index
+    assert menu_model.add_item("Drinks", "Brukina", "15")
+    assert menu_model.search("bruk") == [("Drinks", "Brukina")]
+    assert menu_model.update_product("Drinks", "Brukina", "Lamugin", "15")
+    assert menu_model.search("bruk") == []
+    assert menu_model.search("lamu") == [("Drinks", "Lamugin")]
+    assert menu_model.remove_item("Drinks", "Lamugin")
+    assert menu_model.search("lamu") == []
+    assert menu_model.search("water") == [("Drinks", "Water (Bottled)")]
+    assert menu_model.remove_category("Drinks")
+    assert menu_model.search("water") == []
+    assert menu_model.search_index is index
+
+
+def test_bulk_import_rebuilds_the_index(menu_model):
+    menu_model.build_search_index()
+    menu_model.bulk_upsert([(2, {"category": "Drinks", "item": "Asaana", "price": "8"})])
+    assert menu_model.search("asaana") == [("Drinks", "Asaana")]
+
+
+def test_search_does_not_wait_for_the_write_lock(menu_model):
+    menu_model.build_search_index()
+    held, release = threading.Event(), threading.Event()
+
+    def writer():
+        # Stands in for a long import or a locked-database wait.
+        with menu_model.lock:
+            held.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    held.wait(5)
+    try:
+        results = []
+        searcher = threading.Thread(target=lambda: results.append(menu_model.search("waakye")))
+        searcher.start()
+        searcher.join(2)
+        assert results == [[("Main Courses", "Waakye")]]
+    finally:
+        release.set()
+        thread.join()
@@ -0,0 +1,102 @@
+# tests/test_server.py
+import asyncio
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from client import ServiceClient, ServiceError
+from invoice_template import TemplateError
+from money import Money
+from server import ApiServer, reason
+
+
+@pytest.fixture
+def client(service):
+    # ApiServer on a free port, its event loop on a background thread.
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(ApiServer(service).start("127.0.0.1", 0))
+    port = server.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield ServiceClient(f"http://127.0.0.1:{port}", timeout=5)
+    loop.call_soon_threadsafe(server.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def test_menu_round_trip(client, service):
+    menu = client.get_menu()
+    expected = service.get_menu()
+    assert menu.version == expected.version
+    assert {cat: dict(items) for cat, items in menu.items()} == {
+        cat: dict(items) for cat, items in expected.items()
+    }
+
+
+def test_search(client):
+    assert client.search("waakye") == [("Main Courses", "Waakye")]
+    assert client.search("") == []
+
+
+def test_order_round_trip(client, service):
+    details, _ = service.price_lines([("Main Courses", "Waakye", 2)])
+    _, invoice, stored = client.place_order(details, "Ama")
+    order_id = stored.result()
+    assert "Waakye x 2 @ GHS 40.00 = GHS 80.00" in invoice
+    orders, cursor = client.list_orders()
+    assert cursor is None
+    assert [(o["id"], o["customer_name"], o["total"]) for o in orders] == [
+        (order_id, "Ama", Money(8000))
+    ]
+    assert client.list_orders(query="ama")[0][0]["id"] == order_id
+    assert "Waakye x 2" in client.order_invoice(order_id)
+
+
+def test_order_with_unknown_item_is_rejected(client):
+    with pytest.raises(ServiceError, match="Unknown menu item"):
+        client.place_order([("Main Courses", "Caviar", 1, Money(100))])
+
+
+def test_unknown_order(client):
+    with pytest.raises(ServiceError, match="No such order: 999"):
+        client.order_invoice(999)
+
+
+def test_invoice_template_round_trip(client, service):
+    client.set_invoice_template("Total: {total:.2f}\n")
+    assert client.get_invoice_template() == "Total: {total:.2f}\n"
+    assert service.settings.get("invoice_template") == "Total: {total:.2f}\n"
+    with pytest.raises(TemplateError, match="Invalid template"):
+        client.set_invoice_template("{nonsense}")
+    assert client.get_invoice_template() == "Total: {total:.2f}\n"
+
+
+def test_unknown_path(client):
+    with pytest.raises(ServiceError, match="No such resource"):
+        client.request("GET", "/nowhere")
+
+
+def test_unreadable_order_is_reported_over_http(client, service):
+    order_id = service.history.conn.execute(
+        "INSERT INTO orders (customer_name, total_cost, total_amount, time_of_order, "
+        "order_details) VALUES ('Walk-in', 0, 0, '2024-03-01 12:30:00', 'not json')"
+    ).lastrowid
+    with pytest.raises(urllib.error.HTTPError) as raised:
+        urllib.request.urlopen(f"{client.base_url}/invoices?order_id={order_id}", timeout=5)
+    assert raised.value.code == 422
+    assert raised.value.reason == "Unprocessable Entity"
+    assert json.loads(raised.value.read()) == {
+        "error": f"Order #{order_id} is unreadable: order details are not JSON"
+    }
+    with pytest.raises(ServiceError, match="is unreadable"):
+        client.order_invoice(order_id)
+
+
+def test_reason_phrases():
+    assert reason(422) == "Unprocessable Entity"
+    assert reason(503) == "Service Unavailable"
+    assert reason(599) == "Unknown"
@@ -0,0 +1,89 @@
+# tests/test_service.py
+import pytest
+
+from model import UnreadableOrder
+from money import Money
+
+
+def test_price_lines_uses_menu_prices(service):
+    details, version = service.price_lines([("Main Courses", "Waakye", 2)])
+    assert details == [("Main Courses", "Waakye", 2, Money(4000))]
+    assert version == service.get_menu().version
+
+
+@pytest.mark.parametrize("qty", [0, -1, True, False, 1.0, "2", None, 1000, 10**30])
+def test_price_lines_rejects_bad_quantities(service, qty):
+    with pytest.raises(ValueError, match="Invalid quantity"):
+        service.price_lines([("Main Courses", "Waakye", qty)])
+
+
+def test_price_lines_accepts_the_largest_quantity(service):
+    details, _ = service.price_lines([("Main Courses", "Waakye", service.MAX_QUANTITY)])
+    assert details[0][2] == service.MAX_QUANTITY
+
+
+def test_price_lines_rejects_unknown_items(service):
+    with pytest.raises(ValueError, match="Unknown menu item"):
+        service.price_lines([("Main Courses", "Caviar", 1)])
+
+
+def test_search_index_can_be_built_ahead(service):
+    model = service.menu_model
+    assert model.search_index is None
+    model.build_search_index()
+    index = model.search_index
+    assert service.search("waakye") == [("Main Courses", "Waakye")]
+    assert model.search_index is index
+
+
+def store_raw_order(service, details, time_of_order="2024-03-01 12:30:00"):
+    conn = service.history.conn
+    return conn.execute(
+        "INSERT INTO orders (customer_name, total_cost, total_amount, time_of_order, order_details) "
+        "VALUES ('Walk-in', 0, 0, ?, ?)", (time_of_order, details)
+    ).lastrowid
+
+
+def test_order_invoice_reprints_a_stored_order(service):
+    details, version = service.price_lines([("Main Courses", "Waakye", 2)])
+    order, invoice, stored = service.place_order(details, "Ama", version)
+    order_id = stored.result(timeout=5)
+    assert service.order_invoice(order_id).replace(
+        order.get_order_time().strftime("%Y-%m-%d %H:%M:%S"), "T"
+    ) == invoice.replace(order.get_order_time().strftime("%Y-%m-%d %H:%M:%S"), "T")
+    assert service.order_invoice(order_id + 1000) is None
+
+
+@pytest.mark.parametrize("details, reason", [
+    ("not json", "not JSON"),
+    ('{"item": "Waakye"}', "not a list of lines"),
+    ('["Waakye"]', "line 1 is not an object"),
+    ('[{"item": "Waakye", "quantity": 1, "unit_amount": 4000}]', "no category or item name"),
+    ('[{"category": "Main Courses", "item": "Waakye", "quantity": true, "unit_amount": 4000}]',
+     "invalid quantity"),
+    ('[{"category": "Main Courses", "item": "Waakye", "quantity": 1, "unit_price": 40.0}]',
+     "invalid unit amount"),
+])
+def test_unreadable_orders_raise_a_clear_error(service, details, reason):
+    order_id = store_raw_order(service, details)
+    with pytest.raises(UnreadableOrder, match=f"Order #{order_id} is unreadable: .*{reason}"):
+        service.order_invoice(order_id)
+    # Listing still works.
+    orders, _ = service.list_orders()
+    assert [order["id"] for order in orders] == [order_id]
+
+
+def test_unreadable_order_time(service):
+    details = '[{"category": "Drinks", "item": "Tea", "quantity": 1, "unit_amount": 250}]'
+    order_id = store_raw_order(service, details, "yesterday")
+    with pytest.raises(UnreadableOrder, match="bad order time"):
+        service.order_invoice(order_id)
+
+
+def test_bulk_upsert_reports_out_of_range_prices(service):
+    result = service.menu_model.bulk_upsert([
+        (2, {"category": "Drinks", "item": "Gold Water", "price": "1e100"}),
+        (3, {"category": "Drinks", "item": "Sobolo", "price": "9.50"}),
+    ])
+    assert result.errors == [(2, "Invalid price: '1e100'")]
+    assert service.get_menu()["Drinks"]["Sobolo"] == Money(950)
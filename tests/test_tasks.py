@@ -0,0 +1,74 @@
+# tests/test_tasks.py
+import threading
+import time
+
+from tasks import TaskRunner
+
+
+class FakeRoot:
+    # Stands in for the Tk root: after() callbacks run when drain() is called.
+    def __init__(self):
+        self.jobs = {}
+        self.next_id = 0
+
+    def after(self, ms, fn):
+        self.next_id += 1
+        self.jobs[self.next_id] = fn
+        return self.next_id
+
+    def after_cancel(self, job_id):
+        self.jobs.pop(job_id, None)
+
+    def drain(self, runner, timeout=5):
+        deadline = time.monotonic() + timeout
+        while runner.pending and time.monotonic() < deadline:
+            jobs, self.jobs = self.jobs, {}
+            for fn in jobs.values():
+                fn()
+            time.sleep(0.001)
+
+
+def test_serial_tasks_run_in_submission_order():
+    root = FakeRoot()
+    runner = TaskRunner(root)
+    applied = []
+    done = []
+
+    def write(n):
+        # Later writes would overtake earlier ones on the pool.
+        time.sleep(0.002 * (20 - n))
+        applied.append(n)
+        return n
+
+    for n in range(20):
+        runner.submit(write, n, on_done=done.append, serial=True)
+    root.drain(runner)
+    runner.shutdown()
+    assert applied == list(range(20))
+    assert done == list(range(20))
+
+
+def test_serial_tasks_run_on_one_thread():
+    root = FakeRoot()
+    runner = TaskRunner(root)
+    threads = set()
+    for _ in range(10):
+        runner.submit(lambda: threads.add(threading.get_ident()), serial=True)
+    root.drain(runner)
+    runner.shutdown()
+    assert len(threads) == 1
+
+
+def test_errors_go_to_on_error():
+    root = FakeRoot()
+    runner = TaskRunner(root)
+    errors = []
+
+    def fail():
+        raise ValueError("no such item")
+
+    runner.submit(fail, on_error=errors.append, serial=True)
+    runner.submit(fail, on_error=errors.append)
+    root.drain(runner)
+    runner.shutdown()
+    assert [str(e) for e in errors] == ["no such item", "no such item"]
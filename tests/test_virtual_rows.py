@@ -0,0 +1,101 @@
+# tests/test_virtual_rows.py
+import pytest
+
+from virtual_rows import (
+    RowWindow, clamp_offset, moveto_offset, pool_size, scroll_fractions, scroll_offset,
+    slot_for, visible_rows
+)
+
+ROW = 44
+
+
+def test_offset_is_clamped_to_the_list():
+    # 100 rows of 44px in a 440px viewport: 4400px, the last 440 on screen.
+    assert clamp_offset(-10, 100, ROW, 440) == 0
+    assert clamp_offset(1000, 100, ROW, 440) == 1000
+    assert clamp_offset(5000, 100, ROW, 440) == 3960
+    # A list shorter than the viewport never scrolls.
+    assert clamp_offset(100, 3, ROW, 440) == 0
+    assert clamp_offset(0, 0, ROW, 440) == 0
+
+
+def test_visible_rows_at_the_top():
+    assert visible_rows(0, 100, ROW, 440) == RowWindow(0, 0, 11)
+    assert visible_rows(0, 100, ROW, 440, overscan=2) == RowWindow(0, 0, 13)
+
+
+def test_visible_rows_part_way_down():
+    # Row 10 is half scrolled off the top; row 20 is partly visible.
+    assert visible_rows(462, 100, ROW, 440) == RowWindow(462, 10, 21)
+    assert visible_rows(462, 100, ROW, 440, overscan=2) == RowWindow(462, 8, 23)
+
+
+def test_visible_rows_at_the_bottom():
+    assert visible_rows(10_000, 100, ROW, 440, overscan=2) == RowWindow(3960, 88, 100)
+
+
+def test_short_and_empty_lists():
+    assert visible_rows(0, 3, ROW, 440, overscan=2) == RowWindow(0, 0, 3)
+    assert visible_rows(50, 0, ROW, 440, overscan=2) == RowWindow(0, 0, 0)
+    assert pool_size(3, ROW, 440, overscan=2) == 3
+    assert pool_size(0, ROW, 440, overscan=2) == 0
+
+
+def test_pool_size():
+    assert pool_size(100, ROW, 440) == 12
+    assert pool_size(100, ROW, 440, overscan=2) == 16
+    assert pool_size(100, ROW, 0, overscan=2) == 6
+
+
+@pytest.mark.parametrize("height", [0, 1, 43, 44, 45, 440, 461])
+@pytest.mark.parametrize("overscan", [0, 2])
+def test_visible_rows_always_have_their_own_slot(height, overscan):
+    count = 60
+    size = pool_size(count, ROW, height, overscan)
+    for offset in range(0, count * ROW, 7):
+        offset, first, last = visible_rows(offset, count, ROW, height, overscan)
+        assert last - first <= size
+        slots = [slot_for(index, size) for index in range(first, last)]
+        assert len(set(slots)) == len(slots)
+
+
+def test_scrolling_one_row_rebinds_one_row():
+    count, height = 100, 440
+    size = pool_size(count, ROW, height, overscan=2)
+    bound = [None] * size
+    rebinds = []
+    for offset in range(0, 40 * ROW + 1, ROW):
+        _, first, last = visible_rows(offset, count, ROW, height, overscan=2)
+        changed = 0
+        for index in range(first, last):
+            slot = slot_for(index, size)
+            if bound[slot] != index:
+                bound[slot] = index
+                changed += 1
+        rebinds.append(changed)
+    assert rebinds[0] == 13
+    assert set(rebinds[3:]) == {1}
+
+
+def test_moveto_offset():
+    assert moveto_offset("0", 100, ROW) == 0
+    assert moveto_offset("0.5", 100, ROW) == 2200
+    assert moveto_offset(1.0, 100, ROW) == 4400
+
+
+def test_scroll_offset():
+    assert scroll_offset(100, "1", "units", ROW, 440) == 144
+    assert scroll_offset(100, "-1", "units", ROW, 440) == 56
+    assert scroll_offset(100, "2", "pages", ROW, 440) == 980
+
+
+def test_scroll_fractions():
+    assert scroll_fractions(0, 100, ROW, 440) == (0.0, 0.1)
+    assert scroll_fractions(3960, 100, ROW, 440) == (0.9, 1.0)
+    assert scroll_fractions(0, 3, ROW, 440) == (0.0, 1.0)
+    assert scroll_fractions(0, 0, ROW, 440) == (0.0, 1.0)
+
+
+def test_moveto_and_fractions_agree():
+    top, _ = scroll_fractions(2200, 100, ROW, 440)
+    assert moveto_offset(top, 100, ROW) == 2200
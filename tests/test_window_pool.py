@@ -0,0 +1,103 @@
+# tests/test_window_pool.py
+from window_pool import WindowPool
+
+
+class FakeWindow:
+    # The parts of a Tk toplevel WindowPool uses.
+    def __init__(self, *args):
+        self.args = args
+        self.hidden = False
+        self.destroyed = False
+
+    def winfo_exists(self):
+        return not self.destroyed
+
+    def withdraw(self):
+        self.hidden = True
+
+    def destroy(self):
+        self.destroyed = True
+
+
+def make_pool(max_idle=1):
+    built = []
+
+    def factory(*args):
+        window = FakeWindow(*args)
+        built.append(window)
+        return window
+
+    return WindowPool(factory, max_idle), built
+
+
+def test_released_window_is_reused():
+    pool, built = make_pool()
+    window = pool.acquire(1, "menu v1")
+    assert window.args == ("menu v1",)
+    pool.release(window, 1)
+    assert window.hidden and not window.destroyed
+    assert pool.acquire(1, "menu v1") is window
+    assert len(built) == 1
+    # Taken out of the pool, so the next acquire builds another.
+    assert pool.acquire(1, "menu v1") is not window
+    assert len(built) == 2
+
+
+def test_stale_menu_version_is_not_handed_back():
+    pool, built = make_pool()
+    old = pool.acquire(1, "menu v1")
+    pool.release(old, 1)
+    new = pool.acquire(2, "menu v2")
+    assert new is not old
+    assert new.args == ("menu v2",)
+    assert old.destroyed
+    assert pool.idle == []
+
+
+def test_release_past_max_idle_destroys_the_window():
+    pool, built = make_pool(max_idle=2)
+    windows = [pool.acquire(None) for _ in range(3)]
+    for window in windows:
+        pool.release(window)
+    assert [window.destroyed for window in windows] == [False, False, True]
+    assert pool.idle == [(None, windows[0]), (None, windows[1])]
+    # Most recently released first.
+    assert pool.acquire() is windows[1]
+    assert pool.acquire() is windows[0]
+    assert len(built) == 3
+
+
+def test_destroyed_windows_are_skipped():
+    pool, built = make_pool(max_idle=2)
+    kept, closed = pool.acquire(1), pool.acquire(1)
+    pool.release(kept, 1)
+    pool.release(closed, 1)
+    closed.destroy()
+    assert pool.acquire(1) is kept
+    # Releasing a window the user already closed keeps nothing.
+    pool.release(closed, 1)
+    assert pool.idle == []
+
+
+def test_stale_windows_are_destroyed_while_looking_for_a_match():
+    pool, built = make_pool(max_idle=3)
+    current, stale = pool.acquire(2), pool.acquire(1)
+    pool.release(current, 2)
+    pool.release(stale, 1)
+    assert pool.acquire(2) is current
+    assert stale.destroyed
+    assert pool.idle == []
+
+
+def test_prepare_builds_one_hidden_window_per_key():
+    pool, built = make_pool()
+    pool.prepare(1, "menu v1")
+    pool.prepare(1, "menu v1")
+    assert len(built) == 1
+    (window,) = built
+    assert window.hidden
+    pool.prepare(2, "menu v2")
+    assert window.destroyed
+    assert pool.idle == [(2, built[1])]
+    assert pool.acquire(2, "menu v2") is built[1]
+    assert len(built) == 2
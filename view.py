@@ -1,44 +1,23 @@
 # view.py
+import bisect
 import customtkinter as ctk
 import tkinter as tk
-from tkinter import messagebox
-from PIL import Image, ImageTk
+import types
+from tkinter import filedialog, messagebox
+from image_cache import images
+from invoice_template import TemplateError
+from money import Money
+from model import MenuModel
+from widgets import VirtualList
 
-# --- HomeView ---
-class HomeView(ctk.CTk):
-    def __init__(self, on_order, on_admin_login):
-        super().__init__()
-        self.title("Welcome to Coded Restaurant")
-        self.geometry("400x300")
-        self.resizable(False, False)
-        ctk.set_appearance_mode("dark")
-        ctk.set_default_color_theme("dark-blue")
-        try:
-            bg = Image.open("Images/bg.png").resize((400,300), Image.Resampling.LANCZOS)
-            img = ctk.CTkImage(light_image=bg, dark_image=bg, size=(400,300))
-            lbl = ctk.CTkLabel(self, image=img, text="")
-            lbl.image = img
-            lbl.place(relx=0, rely=0, relwidth=1, relheight=1)
-        except Exception as e:
-            print("HomeView background image error:", e)
-            self.configure(fg_color="gray20")
-        ctk.CTkLabel(
-            self, text="Welcome to Coded Restaurant",
-            font=("Helvetica Bold-Oblique", 22)
-        ).pack(pady=20)
-        ctk.CTkButton(
-            self, text="Place Order", font=("Helvetica", 16),
-            command=on_order, fg_color="#2980b9"
-        ).pack(pady=10)
-        ctk.CTkButton(
-            self, text="Admin Login", font=("Helvetica", 16),
-            command=on_admin_login, fg_color="#2980b9"
-        ).pack(pady=10)
+MENU_FILE_TYPES = [
+    ("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("JSON", "*.json"), ("All files", "*.*")
+]
 
 
 # --- OrderView ---
 class OrderView(ctk.CTkToplevel):
-    def __init__(self, menu, on_generate_invoice, on_back):
+    def __init__(self, menu, on_generate_invoice, on_back, prebuild_tabs=True, search=None):
         super().__init__()
         self.title("Place Order")
         self.geometry("800x600")
@@ -46,18 +25,17 @@ class OrderView(ctk.CTkToplevel):
         self.menu = menu
         self.on_generate_invoice = on_generate_invoice
         self.on_back = on_back
+        self.search = search
         self.order_summary = {}
 
         # Load plus/minus icons
         try:
-            plus_raw = Image.open("Images/plus_icon.png")
-            self.plus_img = ctk.CTkImage(light_image=plus_raw, dark_image=plus_raw, size=(30,30))
+            self.plus_img = images.get_ctk_image("Images/plus_icon.png", (30,30))
         except Exception as e:
             print("Error loading plus_icon.png:", e)
             self.plus_img = None
         try:
-            minus_raw = Image.open("Images/minus_icon.png")
-            self.minus_img = ctk.CTkImage(light_image=minus_raw, dark_image=minus_raw, size=(30,30))
+            self.minus_img = images.get_ctk_image("Images/minus_icon.png", (30,30))
         except Exception as e:
             print("Error loading minus_icon.png:", e)
             self.minus_img = None
@@ -73,8 +51,9 @@ class OrderView(ctk.CTkToplevel):
 
         # Layout configuration
         self.grid_rowconfigure(0, weight=0)
-        self.grid_rowconfigure(1, weight=1)
-        self.grid_rowconfigure(2, weight=0)
+        self.grid_rowconfigure(1, weight=0)
+        self.grid_rowconfigure(2, weight=1)
+        self.grid_rowconfigure(3, weight=0)
         self.grid_columnconfigure(0, weight=1)
 
         # Summary frame
@@ -87,66 +66,44 @@ class OrderView(ctk.CTkToplevel):
         sb = ctk.CTkScrollbar(sf, orientation="vertical", command=self.summary_textbox.yview)
         sb.grid(row=0, column=1, sticky="ns")
         self.summary_textbox.configure(yscrollcommand=sb.set, state="disabled")
-
-        # Tabview for menu
-        tv = ctk.CTkTabview(self)
-        tv.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
+        self.total_label = ctk.CTkLabel(sf, text="Total: GHS 0.00", font=("Helvetica",14))
+        self.total_label.grid(row=1, column=0, columnspan=2, sticky="e", padx=5)
+        # Keys shown in the textbox, kept sorted; key i is on text line i+1.
+        self.summary_keys = []
+        self.order_total = Money(0)
+
+        # Search box; results replace the tabs while a query is entered.
+        # search(query, on_done, owner) may answer later (a remote order
+        # service), so only the latest query's results are shown.
+        self.search_results = None
+        self.search_job = None
+        self.search_request = 0
+        if self.search:
+            self.search_entry = ctk.CTkEntry(
+                self, font=("Helvetica",14), placeholder_text="Search menu..."
+            )
+            self.search_entry.grid(row=1, column=0, sticky="ew", padx=10)
+            self.search_entry.bind("<KeyRelease>", lambda e: self.schedule_search())
+
+        # Tabview for menu. Tab contents are built on first selection; the
+        # rest are optionally pre-built one per Tk idle callback.
+        self.tabview = tv = ctk.CTkTabview(self, command=self.on_tab_selected)
+        tv.grid(row=2, column=0, sticky="nsew", padx=10, pady=10)
+        self.pending_tabs = {}
+        self.tab_lists = {}
         for category in sorted(self.menu.keys()):
             if not category:
                 continue
             tv.add(category)
-            container = ctk.CTkFrame(tv.tab(category), fg_color="transparent")
-            container.pack(fill="both", expand=True)
-            canvas = tk.Canvas(container, bd=0, highlightthickness=0)
-            canvas.pack(side="left", fill="both", expand=True)
-            vs = tk.Scrollbar(container, orient="vertical", command=canvas.yview)
-            vs.pack(side="right", fill="y")
-            canvas.configure(yscrollcommand=vs.set)
-
-            # Canvas background
-            try:
-                path = self.bg_images.get(category, "Images/bg.png")
-                img = Image.open(path).resize((750-vs.winfo_reqwidth(),400), Image.Resampling.LANCZOS)
-                bgp = ImageTk.PhotoImage(img)
-                canvas.bgp = bgp
-                canvas.create_image(0,0,image=bgp,anchor="nw")
-            except Exception:
-                canvas.configure(bg=container.cget("fg_color"))
-
-            inner = ctk.CTkFrame(canvas, fg_color=("white","gray10"), corner_radius=15)
-            canvas.create_window((0,0), window=inner, anchor="nw")
-            inner.bind(
-                "<Configure>",
-                lambda e, c=canvas: c.configure(scrollregion=c.bbox("all"))
-            )
-            canvas.bind("<Enter>", lambda e: canvas.focus_set())
-            canvas.bind("<MouseWheel>", lambda e, c=canvas: c.yview_scroll(-int(e.delta/120),"units"))
-            canvas.bind("<Button-4>", lambda e, c=canvas: c.yview_scroll(-1,"units"))
-            canvas.bind("<Button-5>", lambda e, c=canvas: c.yview_scroll(1,"units"))
-
-            row = 0
-            for item, price in sorted(self.menu[category].items()):
-                ctk.CTkLabel(inner, text=item, font=("Helvetica",14))\
-                    .grid(row=row, column=0, sticky="w", padx=5, pady=5)
-                ctk.CTkLabel(inner, text=f"GHS {price:.2f}", font=("Helvetica",14))\
-                    .grid(row=row, column=1, padx=5, pady=5)
-                plus = ctk.CTkButton(inner,
-                                     image=self.plus_img, text="", width=30,
-                                     command=lambda c=category, i=item: self.add_item(c, i))
-                if not self.plus_img:
-                    plus.configure(text="+")
-                plus.grid(row=row, column=2, padx=5, pady=5)
-                minus = ctk.CTkButton(inner,
-                                      image=self.minus_img, text="", width=30,
-                                      command=lambda c=category, i=item: self.remove_item(c, i))
-                if not self.minus_img:
-                    minus.configure(text="–")
-                minus.grid(row=row, column=3, padx=5, pady=5)
-                row += 1
+            self.pending_tabs[category] = None
+        self.first_tab = tv.get()
+        self.ensure_tab_built(self.first_tab)
+        if prebuild_tabs:
+            self.after_idle(self.prebuild_step)
 
         # Bottom buttons
         bf = ctk.CTkFrame(self)
-        bf.grid(row=2, column=0, padx=10, pady=10, sticky="ew")
+        bf.grid(row=3, column=0, padx=10, pady=10, sticky="ew")
         bf.grid_columnconfigure((0,1,2), weight=1)
         ctk.CTkButton(bf, text="Generate Invoice", font=("Helvetica",16),
                       command=self.generate_invoice)\
@@ -158,9 +115,97 @@ class OrderView(ctk.CTkToplevel):
                       command=self.back)\
             .grid(row=0, column=2, sticky="ew", padx=5)
 
+    def on_tab_selected(self):
+        self.ensure_tab_built(self.tabview.get())
+
+    def ensure_tab_built(self, category):
+        if category in self.pending_tabs:
+            del self.pending_tabs[category]
+            self.build_tab(category)
+
+    def prebuild_step(self):
+        if not self.pending_tabs or not self.winfo_exists():
+            return
+        self.ensure_tab_built(next(iter(self.pending_tabs)))
+        if self.pending_tabs:
+            self.after_idle(self.prebuild_step)
+
+    def build_tab(self, category):
+        vl = VirtualList(self.tabview.tab(category), self.create_menu_row, self.bind_menu_row,
+                         fill_width=False)
+        vl.pack(fill="both", expand=True)
+
+        # Background behind the rows
+        try:
+            path = self.bg_images.get(category, "Images/bg.png")
+            bgp = images.get_photo_image(path, (750-vl.scrollbar.winfo_reqwidth(),400))
+            bg = tk.Label(vl.viewport, image=bgp, bd=0)
+            bg.image = bgp
+            bg.place(x=0, y=0)
+            vl.bind_scroll(bg)
+        except Exception:
+            pass
+
+        vl.set_items([(category, item) for item in sorted(self.menu[category])])
+        self.tab_lists[category] = vl
+
+    def schedule_search(self):
+        # Runs the search once typing pauses briefly.
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(80, self.run_search)
+
+    def run_search(self):
+        self.search_job = None
+        self.search_request += 1
+        request_id = self.search_request
+        query = self.search_entry.get().strip()
+        if not query:
+            if self.search_results is not None:
+                self.search_results.grid_remove()
+            self.tabview.grid()
+            return
+        self.search(query, lambda results: self.show_search_results(request_id, results), self)
+
+    def show_search_results(self, request_id, results):
+        if request_id != self.search_request:
+            return
+        if self.search_results is None:
+            self.search_results = VirtualList(self, self.create_menu_row, self.bind_menu_row)
+            self.search_results.grid(row=2, column=0, sticky="nsew", padx=10, pady=10)
+        self.tabview.grid_remove()
+        self.search_results.grid()
+        self.search_results.set_items(results)
+        self.search_results.scroll_to(0)
+
+    def create_menu_row(self, frame):
+        f = ("Helvetica",14)
+        inner = ctk.CTkFrame(frame, fg_color=("white","gray10"), corner_radius=0)
+        inner.pack(side="left", fill="y")
+        row = types.SimpleNamespace(
+            name=ctk.CTkLabel(inner, text="", font=f, width=420, anchor="w"),
+            price=ctk.CTkLabel(inner, text="", font=f, width=100),
+            plus=ctk.CTkButton(inner, image=self.plus_img, text="" if self.plus_img else "+", width=30),
+            minus=ctk.CTkButton(inner, image=self.minus_img, text="" if self.minus_img else "–", width=30),
+        )
+        row.name.grid(row=0, column=0, sticky="w", padx=5, pady=5)
+        row.price.grid(row=0, column=1, padx=5, pady=5)
+        row.plus.grid(row=0, column=2, padx=5, pady=5)
+        row.minus.grid(row=0, column=3, padx=5, pady=5)
+        return row
+
+    def bind_menu_row(self, row, key):
+        category, item = key
+        price = self.menu.get(category, {}).get(item)
+        row.name.configure(text=item)
+        row.price.configure(text=f"GHS {price:.2f}" if price is not None else "")
+        row.plus.configure(command=lambda: self.add_item(category, item))
+        row.minus.configure(command=lambda: self.remove_item(category, item))
+
     def add_item(self, category, item):
-        self.order_summary[(category,item)] = self.order_summary.get((category,item), 0) + 1
-        self.update_summary_display()
+        key = (category,item)
+        self.order_summary[key] = self.order_summary.get(key, 0) + 1
+        self.update_summary_line(key, 1)
 
     def remove_item(self, category, item):
         key = (category,item)
@@ -169,32 +214,62 @@ class OrderView(ctk.CTkToplevel):
                 self.order_summary[key] -= 1
             else:
                 del self.order_summary[key]
-            self.update_summary_display()
+            self.update_summary_line(key, -1)
 
     def clear_orders(self):
         self.order_summary.clear()
         self.update_summary_display()
 
+    def summary_line(self, key, qty):
+        cat, item = key
+        price = self.menu.get(cat, {}).get(item)
+        if price is not None:
+            return f"{item} (x{qty}) @ GHS {price:.2f} = GHS {qty * price:.2f}\n"
+        return f"{item} (x{qty}) - Item no longer available\n"
+
+    def update_summary_line(self, key, delta):
+        # Patches the single textbox line for key and the total label
+        # instead of repainting the whole summary.
+        tb = self.summary_textbox
+        tb.configure(state="normal")
+        pos = bisect.bisect_left(self.summary_keys, key)
+        shown = pos < len(self.summary_keys) and self.summary_keys[pos] == key
+        line = f"{pos + 1}.0"
+        if shown:
+            tb.delete(line, f"{pos + 2}.0")
+        elif not self.summary_keys:
+            tb.delete("1.0", "end")
+        qty = self.order_summary.get(key)
+        if qty:
+            tb.insert(line, self.summary_line(key, qty))
+            if not shown:
+                self.summary_keys.insert(pos, key)
+        elif shown:
+            del self.summary_keys[pos]
+            if not self.summary_keys:
+                tb.insert("end", "Your order is empty.")
+        tb.configure(state="disabled")
+        price = self.menu.get(key[0], {}).get(key[1])
+        if price is not None:
+            self.order_total += delta * price
+            self.total_label.configure(text=f"Total: GHS {self.order_total:.2f}")
+
     def update_summary_display(self):
         self.summary_textbox.configure(state="normal")
         self.summary_textbox.delete("1.0", "end")
+        self.summary_keys = sorted(self.order_summary)
+        self.order_total = Money(0)
         if not self.order_summary:
             self.summary_textbox.insert("end", "Your order is empty.")
         else:
-            for (cat,item),qty in sorted(self.order_summary.items()):
-                price = self.menu.get(cat, {}).get(item)
+            for key in self.summary_keys:
+                qty = self.order_summary[key]
+                self.summary_textbox.insert("end", self.summary_line(key, qty))
+                price = self.menu.get(key[0], {}).get(key[1])
                 if price is not None:
-                    total = qty * price
-                    self.summary_textbox.insert(
-                        "end",
-                        f"{item} (x{qty}) @ GHS {price:.2f} = GHS {total:.2f}\n"
-                    )
-                else:
-                    self.summary_textbox.insert(
-                        "end",
-                        f"{item} (x{qty}) - Item no longer available\n"
-                    )
+                    self.order_total += qty * price
         self.summary_textbox.configure(state="disabled")
+        self.total_label.configure(text=f"Total: GHS {self.order_total:.2f}")
 
     def generate_invoice(self):
         if not self.order_summary:
@@ -210,8 +285,23 @@ class OrderView(ctk.CTkToplevel):
         self.withdraw()
         self.on_generate_invoice(details, self)
 
+    def reset(self):
+        # Clears the order and search and goes back to the first tab, so a
+        # pooled window can take the next order.
+        self.order_summary.clear()
+        self.update_summary_display()
+        if self.search:
+            if self.search_job is not None:
+                self.after_cancel(self.search_job)
+            self.search_entry.delete(0, "end")
+            self.run_search()
+        if self.first_tab:
+            self.tabview.set(self.first_tab)
+        for vl in self.tab_lists.values():
+            vl.scroll_to(0)
+
     def back(self):
-        self.destroy()
+        # The controller hides (and pools) or destroys the window.
         self.on_back()
 
 
@@ -224,13 +314,13 @@ class InvoiceView(ctk.CTkToplevel):
         self.resizable(False, False)
         self.on_back = on_back
         self.create_widgets(invoice_text)
+        self.protocol("WM_DELETE_WINDOW", self.back)
 
     def create_widgets(self, txt):
         ctr = ctk.CTkFrame(self, fg_color="transparent")
         ctr.pack(fill="both", expand=True, padx=10, pady=10)
         try:
-            bg = Image.open("Images/grand_crab.png").resize((400,500), Image.Resampling.LANCZOS)
-            img = ctk.CTkImage(light_image=bg, dark_image=bg, size=(400,500))
+            img = images.get_ctk_image("Images/grand_crab.png", (400,500))
             lbl = ctk.CTkLabel(ctr, image=img, text="")
             lbl.image = img
             lbl.place(relx=0, rely=0, relwidth=1, relheight=1)
@@ -243,13 +333,22 @@ class InvoiceView(ctk.CTkToplevel):
         sb = ctk.CTkScrollbar(ctr, orientation="vertical", command=tb.yview)
         sb.pack(side="right", fill="y")
         tb.configure(yscrollcommand=sb.set)
-        tb.insert("0.0", txt)
-        tb.configure(state="disabled")
+        self.textbox = tb
         ctk.CTkButton(self, text="Back", font=("Helvetica",16),
                       command=self.back).pack(pady=10)
+        self.show_invoice(txt, self.on_back)
+
+    def show_invoice(self, txt, on_back):
+        # Replaces the text, e.g. when a pooled window is reused.
+        self.on_back = on_back
+        self.textbox.configure(state="normal")
+        self.textbox.delete("0.0", "end")
+        self.textbox.insert("0.0", txt)
+        self.textbox.configure(state="disabled")
+        self.textbox.yview_moveto(0)
 
     def back(self):
-        self.destroy()
+        # The controller hides (and pools) or destroys the window.
         self.on_back()
 
 
@@ -274,12 +373,19 @@ class LoginView(ctk.CTkToplevel):
         ctk.CTkLabel(self, text="Password:", font=f).pack(pady=5)
         self.password_entry = ctk.CTkEntry(self, show="*", font=f)
         self.password_entry.pack(pady=5)
-        ctk.CTkButton(self, text="Login", font=f, command=self._perform_login).pack(pady=5)
+        self.login_button = ctk.CTkButton(self, text="Login", font=f, command=self._perform_login)
+        self.login_button.pack(pady=5)
         ctk.CTkButton(self, text="Back", font=f, command=self.back).pack(pady=5)
 
     def _perform_login(self):
         self.on_login(self.username_entry.get(), self.password_entry.get())
 
+    def set_busy(self, busy):
+        # Blocks repeat submissions while credentials are being checked.
+        self.login_button.configure(
+            state="disabled" if busy else "normal", text="Checking..." if busy else "Login"
+        )
+
     def back(self):
         self.destroy()
         self.on_back()
@@ -295,66 +401,180 @@ class AdminPanelView(ctk.CTkToplevel):
         self.menu_model = menu_model
         self.controller = controller
         self.on_back = on_back
-        self.entries = {}
-        self.tab_frames = {}
+        # category -> VirtualList and its sorted (category, item) keys.
+        self.tab_lists = {}
+        self.tab_items = {}
+        # Unsaved "New Price" text, kept per item while rows are recycled.
+        self.entry_text = {}
+        self.pending_changes = []
+        self.full_refresh_pending = False
+        self.apply_scheduled = False
         self.create_widgets()
+        # Edits commit on worker threads; handle their events on the Tk thread.
+        self.menu_listener = controller.tasks.threadsafe(self.on_menu_change)
+        self.menu_model.subscribe(self.menu_listener)
         self.protocol("WM_DELETE_WINDOW", self.back)
         self.focus_force()
 
     def create_widgets(self):
         for widget in self.winfo_children():
             widget.destroy()
-        self.entries.clear()
-        self.tab_frames.clear()
+        self.tab_lists.clear()
+        self.tab_items.clear()
 
-        tv = ctk.CTkTabview(self)
+        self.tabview = tv = ctk.CTkTabview(self)
         tv.pack(fill="both", expand=True, padx=10, pady=10)
-        f = ("Helvetica",14)
         data = self.menu_model.get_menu()
         for category in sorted(filter(None, data.keys())):
             tv.add(category)
-            sf = ctk.CTkScrollableFrame(tv.tab(category), fg_color="transparent")
-            sf.pack(fill="both", expand=True, padx=5, pady=5)
-            self.tab_frames[category] = sf
-            row = 0
-            for item, price in sorted(data[category].items()):
-                ctk.CTkLabel(sf, text=item, font=f).grid(row=row, column=0, sticky="w", padx=5, pady=5)
-                ctk.CTkLabel(sf, text="Current Price:", font=f).grid(row=row, column=1, padx=5, pady=5)
-                ctk.CTkLabel(sf, text=f"GHS {price:.2f}", font=f).grid(row=row, column=2, padx=5, pady=5)
-                ctk.CTkLabel(sf, text="New Price:", font=f).grid(row=row, column=3, padx=5, pady=5)
-                ent = ctk.CTkEntry(sf, width=100, font=f)
-                ent.grid(row=row, column=4, padx=5, pady=5)
-                self.entries[(category,item)] = ent
-                ctk.CTkButton(sf, text="Update Price", font=f, width=100,
-                              command=lambda c=category,i=item,e=ent: self.update_price_command(c,i,e))\
-                    .grid(row=row, column=5, padx=5, pady=5)
-                ctk.CTkButton(sf, text="Edit Item Details", font=f, width=120,
-                              command=lambda c=category,i=item: self.open_edit_window(c,i))\
-                    .grid(row=row, column=6, padx=5, pady=5)
-                row += 1
-            for col in range(7):
-                sf.grid_columnconfigure(col, weight=0)
+            self.create_tab_list(category, [(category, item) for item in sorted(data[category])])
 
         ctk.CTkButton(self, text="Major Edit Options", font=("Helvetica",16),
                       command=self.open_major_edit_window).pack(pady=10)
+        ctk.CTkButton(self, text="Order History", font=("Helvetica",16),
+                      command=self.controller.open_order_history_view).pack(pady=10)
+        ctk.CTkButton(self, text="Diagnostics", font=("Helvetica",16),
+                      command=self.controller.open_diagnostics_view).pack(pady=10)
         ctk.CTkButton(self, text="Back", font=("Helvetica",16),
                       command=self.back).pack(pady=10)
 
-    def update_price_command(self, category, item, entry):
-        np = entry.get().strip()
+    def create_tab_list(self, category, keys):
+        vl = VirtualList(self.tabview.tab(category), self.create_row, self.bind_row)
+        vl.pack(fill="both", expand=True, padx=5, pady=5)
+        self.tab_lists[category] = vl
+        self.tab_items[category] = keys
+        vl.set_items(keys)
+
+    def create_row(self, frame):
+        f = ("Helvetica",14)
+        row = types.SimpleNamespace(
+            key=None,
+            name=ctk.CTkLabel(frame, text="", font=f, width=200, anchor="w"),
+            price=ctk.CTkLabel(frame, text="", font=f),
+            entry=ctk.CTkEntry(frame, width=100, font=f),
+            update=ctk.CTkButton(frame, text="Update Price", font=f, width=100),
+            edit=ctk.CTkButton(frame, text="Edit Item Details", font=f, width=120),
+        )
+        row.name.grid(row=0, column=0, sticky="w", padx=5, pady=5)
+        ctk.CTkLabel(frame, text="Current Price:", font=f).grid(row=0, column=1, padx=5, pady=5)
+        row.price.grid(row=0, column=2, padx=5, pady=5)
+        ctk.CTkLabel(frame, text="New Price:", font=f).grid(row=0, column=3, padx=5, pady=5)
+        row.entry.grid(row=0, column=4, padx=5, pady=5)
+        row.update.grid(row=0, column=5, padx=5, pady=5)
+        row.edit.grid(row=0, column=6, padx=5, pady=5)
+        return row
+
+    def bind_row(self, row, key):
+        if row.key is not None:
+            text = row.entry.get()
+            if text:
+                self.entry_text[row.key] = text
+            else:
+                self.entry_text.pop(row.key, None)
+        row.key = key
+        category, item = key
+        price = self.menu_model.get_menu().get(category, {}).get(item)
+        row.name.configure(text=item)
+        row.price.configure(text=f"GHS {price:.2f}" if price is not None else "")
+        row.entry.delete(0, "end")
+        row.entry.insert(0, self.entry_text.pop(key, ""))
+        row.update.configure(command=lambda: self.update_price_command(category, item, row))
+        row.edit.configure(command=lambda: self.open_edit_window(category, item))
+
+    def on_menu_change(self, change):
+        if change.kind == MenuModel.MENU_RELOADED:
+            self.full_refresh_pending = True
+        else:
+            self.pending_changes.append(change)
+        self.schedule_apply()
+
+    def schedule_apply(self):
+        # Coalesces every change and refresh request made before Tk is next
+        # idle into a single pass.
+        if not self.apply_scheduled:
+            self.apply_scheduled = True
+            self.after_idle(self.apply_pending_changes)
+
+    def apply_pending_changes(self):
+        self.apply_scheduled = False
+        changes, self.pending_changes = self.pending_changes, []
+        if not self.winfo_exists():
+            return
+        if self.full_refresh_pending:
+            self.full_refresh_pending = False
+            self.create_widgets()
+            return
+        dirty = set()
+        for change in changes:
+            self.apply_change(change, dirty)
+        # Only the rows currently on screen are rebound.
+        for category in dirty:
+            if category in self.tab_lists:
+                self.tab_lists[category].set_items(self.tab_items[category])
+
+    def apply_change(self, change, dirty):
+        cat, item = change.category, change.item
+        items = self.tab_items.get(cat)
+        if change.kind == MenuModel.PRICE_CHANGED:
+            if items is not None:
+                dirty.add(cat)
+        elif change.kind == MenuModel.ITEM_ADDED:
+            if items is not None:
+                bisect.insort(items, (cat, item))
+                dirty.add(cat)
+        elif change.kind == MenuModel.ITEM_REMOVED:
+            if items is not None:
+                self.remove_key(items, (cat, item))
+                self.entry_text.pop((cat, item), None)
+                dirty.add(cat)
+        elif change.kind == MenuModel.ITEM_RENAMED:
+            if items is not None:
+                self.remove_key(items, (cat, item))
+                bisect.insort(items, (cat, change.new_item))
+                text = self.entry_text.pop((cat, item), None)
+                if text:
+                    self.entry_text[(cat, change.new_item)] = text
+                dirty.add(cat)
+        elif change.kind == MenuModel.CATEGORY_ADDED:
+            if cat and items is None:
+                self.tabview.insert(bisect.bisect_left(sorted(self.tab_items), cat), cat)
+                self.create_tab_list(cat, [])
+        elif change.kind == MenuModel.CATEGORY_REMOVED:
+            if items is not None:
+                del self.tab_items[cat]
+                del self.tab_lists[cat]
+                self.tabview.delete(cat)
+
+    def remove_key(self, items, key):
+        pos = bisect.bisect_left(items, key)
+        if pos < len(items) and items[pos] == key:
+            del items[pos]
+
+    def update_price_command(self, category, item, row):
+        np = row.entry.get().strip()
         if not np:
             messagebox.showerror("Error", "Please enter a new price.")
             return
         try:
-            npf = float(np)
+            npf = Money.parse(np)
         except ValueError:
             messagebox.showerror("Error", "Invalid price. Please enter a number.")
             return
-        if self.controller.update_menu_price(category, item, npf):
-            messagebox.showinfo("Success", f"Price for '{item}' updated.")
-            self.refresh_display()
-        else:
+        self.controller.update_menu_price(
+            category, item, npf,
+            lambda ok: self.price_updated(ok, category, item, row), owner=self
+        )
+
+    def price_updated(self, ok, category, item, row):
+        if not ok:
             messagebox.showerror("Error", f"Failed to update price for '{item}'.")
+            return
+        # The row may have been recycled for another item in the meantime.
+        if row.key == (category, item):
+            row.entry.delete(0, "end")
+        else:
+            self.entry_text.pop((category, item), None)
+        messagebox.showinfo("Success", f"Price for '{item}' updated.")
 
     def open_edit_window(self, category, item):
         cp = self.menu_model.get_menu().get(category, {}).get(item)
@@ -373,9 +593,217 @@ class AdminPanelView(ctk.CTkToplevel):
         self.destroy()
         self.on_back()
 
+    def destroy(self):
+        self.menu_model.unsubscribe(self.menu_listener)
+        super().destroy()
+
     def refresh_display(self):
+        # Full rebuild, deferred and coalesced; edits made through the model
+        # are already patched in via on_menu_change.
         if self.winfo_exists():
-            self.create_widgets()
+            self.full_refresh_pending = True
+            self.schedule_apply()
+
+
+# --- OrderHistoryView ---
+# Newest-first order history, one keyset page at a time. cursors[i] is the
+# cursor that fetched page i, so "Newer" just steps back through the list.
+class OrderHistoryView(ctk.CTkToplevel):
+    PAGE_SIZE = 50
+
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.title("Order History")
+        self.geometry("700x600")
+        self.resizable(False, False)
+        self.controller = controller
+        self.cursors = [None]
+        self.next_cursor = None
+        self.query = ""
+        self.search_job = None
+        # Only the latest request's result is shown.
+        self.request_id = 0
+        self.create_widgets()
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+        self.load_page()
+        self.focus_force()
+
+    def create_widgets(self):
+        f = ("Helvetica",14)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *_: self.schedule_search())
+        ctk.CTkEntry(self, textvariable=self.search_var, font=f,
+                     placeholder_text="Search customer or item...").pack(fill="x", padx=10, pady=10)
+        self.list = VirtualList(self, self.create_row, self.bind_row, row_height=40)
+        self.list.pack(fill="both", expand=True, padx=10)
+        nav = ctk.CTkFrame(self, fg_color="transparent")
+        nav.pack(fill="x", padx=10, pady=10)
+        self.newer_button = ctk.CTkButton(nav, text="< Newer", font=f, width=100,
+                                          command=self.newer)
+        self.newer_button.pack(side="left")
+        self.older_button = ctk.CTkButton(nav, text="Older >", font=f, width=100,
+                                          command=self.older)
+        self.older_button.pack(side="right")
+        self.status = ctk.CTkLabel(nav, text="", font=f)
+        self.status.pack(side="left", expand=True)
+
+    def create_row(self, frame):
+        f = ("Helvetica",14)
+        row = types.SimpleNamespace(
+            order_id=None,
+            time=ctk.CTkLabel(frame, text="", font=f, width=170, anchor="w"),
+            customer=ctk.CTkLabel(frame, text="", font=f, width=200, anchor="w"),
+            total=ctk.CTkLabel(frame, text="", font=f, width=110, anchor="e"),
+            view=ctk.CTkButton(frame, text="View Invoice", font=f, width=110),
+        )
+        row.time.grid(row=0, column=0, padx=5, pady=4)
+        row.customer.grid(row=0, column=1, padx=5, pady=4)
+        row.total.grid(row=0, column=2, padx=5, pady=4)
+        row.view.grid(row=0, column=3, padx=5, pady=4)
+        row.view.configure(command=lambda: self.controller.open_order_invoice(row.order_id, self))
+        return row
+
+    def bind_row(self, row, order):
+        row.order_id = order["id"]
+        row.time.configure(text=order["time_of_order"])
+        row.customer.configure(text=f"#{order['id']}  {order['customer_name']}")
+        row.total.configure(text=f"GHS {order['total']:.2f}")
+
+    def schedule_search(self):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(250, self.run_search)
+
+    def run_search(self):
+        self.search_job = None
+        query = self.search_var.get().strip()
+        if query != self.query:
+            self.query = query
+            self.cursors = [None]
+            self.load_page()
+
+    def older(self):
+        if self.next_cursor is not None:
+            self.cursors.append(self.next_cursor)
+            self.load_page()
+
+    def newer(self):
+        if len(self.cursors) > 1:
+            self.cursors.pop()
+            self.load_page()
+
+    def load_page(self):
+        self.request_id += 1
+        request_id = self.request_id
+        self.status.configure(text="Loading...")
+        self.controller.list_orders(
+            self.cursors[-1], self.query, self.PAGE_SIZE,
+            lambda result: self.show_page(request_id, *result),
+            self.page_failed, owner=self
+        )
+
+    def show_page(self, request_id, orders, cursor):
+        if request_id != self.request_id:
+            return
+        self.next_cursor = cursor
+        self.list.set_items(orders)
+        self.list.scroll_to(0)
+        page = len(self.cursors)
+        self.status.configure(text=f"Page {page}" if orders else "No orders found")
+        self.newer_button.configure(state="normal" if page > 1 else "disabled")
+        self.older_button.configure(state="normal" if cursor else "disabled")
+
+    def page_failed(self, error):
+        self.status.configure(text="")
+        messagebox.showerror("Error", f"Could not load orders: {error}")
+
+
+# --- DiagnosticsView ---
+# Latency percentiles and window widget counts recorded by metrics.py, and
+# UI stalls caught by the watchdog, refreshed every few seconds while open.
+class DiagnosticsView(ctk.CTkToplevel):
+    REFRESH_MS = 2000
+
+    def __init__(self, parent, metrics, watchdog=None):
+        super().__init__(parent)
+        self.title("Diagnostics")
+        self.geometry("800x500")
+        self.metrics = metrics
+        self.watchdog = watchdog
+        self.create_widgets()
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+        self.refresh()
+        self.focus_force()
+
+    def create_widgets(self):
+        f = ("Helvetica",14)
+        self.textbox = ctk.CTkTextbox(self, wrap="none", font=("Courier",13))
+        self.textbox.pack(fill="both", expand=True, padx=10, pady=10)
+        bf = ctk.CTkFrame(self, fg_color="transparent")
+        bf.pack(fill="x", padx=10, pady=(0,10))
+        bf.grid_columnconfigure((0,1,2), weight=1)
+        ctk.CTkButton(bf, text="Export to File", font=f, command=self.export)\
+            .grid(row=0, column=0, sticky="ew", padx=5)
+        ctk.CTkButton(bf, text="Reset", font=f, command=self.reset)\
+            .grid(row=0, column=1, sticky="ew", padx=5)
+        ctk.CTkButton(bf, text="Close", font=f, command=self.destroy)\
+            .grid(row=0, column=2, sticky="ew", padx=5)
+
+    def refresh(self):
+        if not self.winfo_exists():
+            return
+        self.show_report()
+        self.after(self.REFRESH_MS, self.refresh)
+
+    def show_report(self):
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        self.textbox.insert("end", self.report())
+        self.textbox.configure(state="disabled")
+
+    def report(self):
+        lines = []
+        if self.metrics.enabled:
+            snapshot = self.metrics.snapshot()
+            lines += [
+                f"Last {snapshot['uptime_s']:.0f} s, as of {snapshot['time']}",
+                "",
+                f"{'Operation':<46}{'Count':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}",
+            ]
+            for name, s in snapshot["operations"].items():
+                lines.append(
+                    f"{name:<46}{s['count']:>7}{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}"
+                    f"{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}"
+                )
+            lines += ["", f"{'Window':<46}{'Open':>7}{'Widgets':>9}{'Max':>9}"]
+            for name, s in snapshot["windows"].items():
+                lines.append(f"{name:<46}{s['open']:>7}{s['widgets']:>9}{s['max_widgets']:>9}")
+        else:
+            lines.append("Latency metrics are off. Start the till with --metrics to record them.")
+        if self.watchdog:
+            lines += [
+                "", f"{'UI stalls: handler / blocked in':<46}{'Count':>7}{'total ms':>11}{'max ms':>9}"
+            ]
+            for stall in self.watchdog.report():
+                lines.append(
+                    f"{stall['handler']:<46}{stall['count']:>7}{stall['total_ms']:>11.0f}"
+                    f"{stall['max_ms']:>9.0f}"
+                )
+                lines.append(f"  {stall['site']}")
+        return "\n".join(lines)
+
+    def export(self):
+        if not self.metrics.enabled:
+            messagebox.showerror("Diagnostics", "Latency metrics are off.")
+            return
+        self.metrics.export()
+        messagebox.showinfo("Diagnostics", "Metrics written to the metrics folder.")
+
+    def reset(self):
+        self.metrics.reset()
+        if self.watchdog:
+            self.watchdog.reset()
+        self.show_report()
 
 
 # --- ProductEditView ---
@@ -413,14 +841,18 @@ class ProductEditView(ctk.CTkToplevel):
             messagebox.showerror("Error", "Product name and price cannot be empty.")
             return
         try:
-            npf = float(new_price)
+            npf = Money.parse(new_price)
         except ValueError:
             messagebox.showerror("Error", "Invalid price. Please enter a number.")
             return
-        if self.controller.update_product_details(self.category, self.item, new_name, npf):
+        self.controller.update_product_details(
+            self.category, self.item, new_name, npf,
+            lambda ok: self.changes_saved(ok, new_name), owner=self
+        )
+
+    def changes_saved(self, ok, new_name):
+        if ok:
             messagebox.showinfo("Success", f"Product '{new_name}' updated.")
-            if self.parent and self.parent.winfo_exists():
-                self.parent.refresh_display()
             self.destroy()
         else:
             messagebox.showerror("Error", "Update failed. Check for duplicate name or invalid data.")
@@ -452,6 +884,10 @@ class MajorEditView(ctk.CTkToplevel):
                       command=self.remove_item).pack(pady=5)
         ctk.CTkButton(self, text="Edit Invoice Format", font=f,
                       command=self.edit_invoice).pack(pady=5)
+        ctk.CTkButton(self, text="Import Menu...", font=f,
+                      command=self.import_menu).pack(pady=5)
+        ctk.CTkButton(self, text="Export Menu...", font=f,
+                      command=self.export_menu).pack(pady=5)
 
     def add_category(self):
         if getattr(self.controller, 'add_category_view', None) and self.controller.add_category_view.winfo_exists():
@@ -483,6 +919,40 @@ class MajorEditView(ctk.CTkToplevel):
             return
         self.controller.invoice_format_view = InvoiceFormatEditView(self, self.controller)
 
+    def import_menu(self):
+        path = filedialog.askopenfilename(
+            parent=self, title="Import Menu", filetypes=MENU_FILE_TYPES
+        )
+        if path:
+            self.controller.import_menu(path, self.menu_imported, self.menu_file_failed, owner=self)
+
+    def menu_imported(self, result):
+        summary = (
+            f"{result.inserted} added, {result.updated} updated, "
+            f"{result.unchanged} unchanged, {len(result.errors)} rejected."
+        )
+        if not result.errors:
+            messagebox.showinfo("Import Menu", summary)
+            return
+        shown = "\n".join(f"Line {line}: {message}" for line, message in result.errors[:10])
+        if len(result.errors) > 10:
+            shown += f"\n... and {len(result.errors) - 10} more"
+        messagebox.showwarning("Import Menu", f"{summary}\n\n{shown}")
+
+    def export_menu(self):
+        path = filedialog.asksaveasfilename(
+            parent=self, title="Export Menu", defaultextension=".csv", filetypes=MENU_FILE_TYPES
+        )
+        if path:
+            self.controller.export_menu(
+                path,
+                lambda count: messagebox.showinfo("Export Menu", f"Exported {count} items."),
+                self.menu_file_failed, owner=self
+            )
+
+    def menu_file_failed(self, error):
+        messagebox.showerror("Error", f"Menu file error: {error}")
+
 
 # --- AddCategoryView ---
 class AddCategoryView(ctk.CTkToplevel):
@@ -509,11 +979,11 @@ class AddCategoryView(ctk.CTkToplevel):
         if not cat:
             messagebox.showerror("Error", "Please enter a category name.")
             return
-        success = self.controller.add_menu_category(cat)
+        self.controller.add_menu_category(cat, lambda ok: self.category_added(ok, cat), owner=self)
+
+    def category_added(self, success, cat):
         if success:
             messagebox.showinfo("Success", f"Category '{cat}' added.")
-            if getattr(self.controller, 'admin_panel_view', None):
-                self.controller.admin_panel_view.refresh_display()
             self.destroy()
         else:
             messagebox.showerror("Error", "Failed to add category.")
@@ -549,11 +1019,13 @@ class RemoveCategoryView(ctk.CTkToplevel):
             return
         if not messagebox.askyesno("Confirm", f"Really delete category '{cat}'?"):
             return
-        success = self.controller.remove_menu_category(cat)
+        self.controller.remove_menu_category(
+            cat, lambda ok: self.category_deleted(ok, cat), owner=self
+        )
+
+    def category_deleted(self, success, cat):
         if success:
             messagebox.showinfo("Success", f"Category '{cat}' removed.")
-            if getattr(self.controller, 'admin_panel_view', None):
-                self.controller.admin_panel_view.refresh_display()
             self.destroy()
         else:
             messagebox.showerror("Error", f"Failed to remove category '{cat}'.")
@@ -599,11 +1071,13 @@ class AddItemView(ctk.CTkToplevel):
         if not item or not price:
             messagebox.showerror("Error", "Please enter both item name and price.")
             return
-        success = self.controller.add_menu_item(cat, item, price)
+        self.controller.add_menu_item(
+            cat, item, price, lambda ok: self.item_added(ok, cat, item), owner=self
+        )
+
+    def item_added(self, success, cat, item):
         if success:
             messagebox.showinfo("Success", f"Item '{item}' added to '{cat}'.")
-            if getattr(self.controller, 'admin_panel_view', None):
-                self.controller.admin_panel_view.refresh_display()
             self.destroy()
         else:
             messagebox.showerror("Error", "Failed to add item. It may already exist or price is invalid.")
@@ -660,11 +1134,13 @@ class RemoveItemView(ctk.CTkToplevel):
             return
         if not messagebox.askyesno("Confirm Removal", f"Really remove '{itm}' from '{cat}'?"):
             return
-        success = self.controller.remove_menu_item(cat, itm)
+        self.controller.remove_menu_item(
+            cat, itm, lambda ok: self.item_removed(ok, itm), owner=self
+        )
+
+    def item_removed(self, success, itm):
         if success:
             messagebox.showinfo("Success", f"Item '{itm}' removed.")
-            if getattr(self.controller, 'admin_panel_view', None):
-                self.controller.admin_panel_view.refresh_display()
             self.destroy()
         else:
             messagebox.showerror("Error", "Failed to remove item.")
@@ -699,6 +1175,24 @@ class InvoiceFormatEditView(ctk.CTkToplevel):
         if not new_tpl:
             messagebox.showerror("Error", "Template cannot be empty.")
             return
-        self.controller.set_invoice_template(new_tpl)
+        self.controller.set_invoice_template(
+            new_tpl, self.template_saved, self.template_failed, owner=self
+        )
+
+    def template_saved(self, result):
         messagebox.showinfo("Success", "Invoice template updated.")
         self.destroy()
+
+    def template_failed(self, error):
+        if isinstance(error, TemplateError):
+            messagebox.showerror("Error", f"Invalid template: {error}")
+        else:
+            messagebox.showerror("Error", f"Failed to save template: {error}")
+
+
+# Top-level windows, for metrics.instrument_views.
+WINDOW_CLASSES = (
+    OrderView, InvoiceView, LoginView, AdminPanelView, OrderHistoryView,
+    DiagnosticsView, ProductEditView, MajorEditView, AddCategoryView, RemoveCategoryView,
+    AddItemView, RemoveItemView, InvoiceFormatEditView,
+)
@@ -0,0 +1,51 @@
+# virtual_rows.py
+from collections import namedtuple
+
+# Scroll arithmetic for widgets.VirtualList, kept free of Tk. Offsets are in
+# pixels from the top of the full list; height is the viewport height.
+
+# items[first:last] are shown (overscan included) at the clamped offset.
+RowWindow = namedtuple("RowWindow", "offset first last")
+
+
+def clamp_offset(offset, count, row_height, height):
+    # Never past the last row, and never above the first.
+    return max(0, min(offset, count * row_height - height))
+
+
+def visible_rows(offset, count, row_height, height, overscan=0):
+    offset = clamp_offset(offset, count, row_height, height)
+    first = max(0, offset // row_height - overscan)
+    last = min(count, (offset + height) // row_height + 1 + overscan)
+    return RowWindow(offset, first, last)
+
+
+def pool_size(count, row_height, height, overscan=0):
+    # Enough rows for the worst case: a partial row at both the top and the
+    # bottom, plus the overscan on each side.
+    return min(count, height // row_height + 2 + 2 * overscan)
+
+
+def slot_for(index, size):
+    # Item index is always shown by the same pool slot, so scrolling by one
+    # row rebinds one row.
+    return index % size
+
+
+def moveto_offset(fraction, count, row_height):
+    # Scrollbar drag: fraction of the full list height.
+    return int(float(fraction) * count * row_height)
+
+
+def scroll_offset(offset, amount, unit, row_height, height):
+    # Scrollbar arrows and paging: unit is "units" or "pages".
+    step = height if unit == "pages" else row_height
+    return offset + int(amount) * step
+
+
+def scroll_fractions(offset, count, row_height, height):
+    # (top, bottom) for the scrollbar slider.
+    total = count * row_height
+    if not total:
+        return 0.0, 1.0
+    return offset / total, min(1.0, (offset + height) / total)
@@ -0,0 +1,131 @@
+# watchdog.py
+import collections
+import os
+import sys
+import threading
+import time
+import traceback
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+TKINTER_FILE = os.path.join("tkinter", "__init__.py")
+
+
+# Detects Tk mainloop stalls. The Tk thread records a heartbeat every
+# interval_ms through after(); a monitor thread checks it and, while a
+# heartbeat is more than threshold_ms late, samples the Tk thread's stack
+# with sys._current_frames(). When the loop recovers, the stall is charged
+# to the call site seen most often:
+#   handler  the function Tk called (a button command, after() or bind
+#            callback), i.e. the first of our frames below tkinter's CallWrapper
+#   site     the innermost function in this project's code
+# and aggregated per (handler, site), so report() shows which handlers block
+# the UI most.
+#   watchdog = StallWatchdog(root, threshold_ms=250)
+class StallWatchdog:
+    def __init__(self, root, threshold_ms=250, interval_ms=50):
+        self.root = root
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.check_interval = max(self.threshold / 4, 0.01)
+        self.thread_id = threading.get_ident()
+        self.lock = threading.Lock()
+        # (handler, site) -> {"count", "total_ms", "max_ms", "stack"}
+        self.sites = {}
+        self.last_beat = time.monotonic()
+        self.stopped = threading.Event()
+        self.beat_id = self.root.after(interval_ms, self.beat)
+        self.monitor = threading.Thread(target=self.run, name="stall-watchdog", daemon=True)
+        self.monitor.start()
+
+    def beat(self):
+        self.last_beat = time.monotonic()
+        if not self.stopped.is_set():
+            self.beat_id = self.root.after(int(self.interval * 1000), self.beat)
+
+    def stop(self):
+        self.stopped.set()
+        try:
+            self.root.after_cancel(self.beat_id)
+        except Exception:
+            pass
+        self.monitor.join()
+
+    def run(self):
+        beat = self.last_beat
+        # Call site -> sample count, and the latest stack for each, while
+        # a stall is in progress.
+        samples = None
+        stacks = {}
+        while not self.stopped.wait(self.check_interval):
+            last = self.last_beat
+            if last != beat and samples is not None:
+                # The loop is running again: the stall lasted from the
+                # heartbeat that was due until the one that arrived.
+                self.add_stall(samples, stacks, last - beat - self.interval)
+                samples = None
+                stacks = {}
+            beat = last
+            if time.monotonic() - beat - self.interval > self.threshold:
+                frame = sys._current_frames().get(self.thread_id)
+                if frame is not None:
+                    stack = traceback.extract_stack(frame)
+                    del frame
+                    key = call_site(stack)
+                    if samples is None:
+                        samples = collections.Counter()
+                    samples[key] += 1
+                    stacks[key] = stack
+
+    def add_stall(self, samples, stacks, seconds):
+        key = samples.most_common(1)[0][0]
+        ms = seconds * 1000
+        with self.lock:
+            entry = self.sites.setdefault(key, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["stack"] = "".join(traceback.format_list(stacks[key]))
+        handler, site = key
+        print(f"UI stall: {ms:.0f} ms in {handler} at {site}")
+
+    def report(self):
+        # Aggregated stalls, most total blocked time first.
+        with self.lock:
+            rows = [
+                {"handler": handler, "site": site, **entry}
+                for (handler, site), entry in self.sites.items()
+            ]
+        rows.sort(key=lambda row: -row["total_ms"])
+        return rows
+
+    def reset(self):
+        with self.lock:
+            self.sites.clear()
+
+
+def call_site(stack):
+    # (handler, site) labels for an extract_stack() list, outermost first.
+    # Labels name the function, not the line, so samples taken anywhere in
+    # one function count towards the same site.
+    def ours(frame):
+        return frame.filename.startswith(PROJECT_DIR + os.sep)
+
+    def label(frame):
+        path = frame.filename
+        path = os.path.relpath(path, PROJECT_DIR) if ours(frame) else os.path.basename(path)
+        return f"{path}:{frame.name}"
+
+    # Tk enters Python through tkinter's CallWrapper.__call__; the handler
+    # is the first of our frames below the innermost such entry (customtkinter
+    # wraps commands in its own frames first). Outside a callback it is our
+    # outermost frame.
+    handler = next((f for f in stack if ours(f)), None)
+    for i, frame in enumerate(stack):
+        if frame.name == "__call__" and frame.filename.endswith(TKINTER_FILE):
+            below = stack[i + 1:]
+            handler = next((f for f in below if ours(f)), below[0] if below else None)
+    site = next((f for f in reversed(stack) if ours(f)), None)
+    return (
+        label(handler) if handler else "Tk",
+        label(site) if site else "-"
+    )
@@ -0,0 +1,114 @@
+# widgets.py
+import tkinter as tk
+
+import customtkinter as ctk
+
+from virtual_rows import (
+    moveto_offset, pool_size, scroll_fractions, scroll_offset, slot_for, visible_rows
+)
+
+
+# --- VirtualList ---
+# Scrollable list that only creates widgets for the visible rows plus a small
+# overscan. Rows are recycled as the list scrolls: item i is always shown by
+# pool slot i % len(pool), so scrolling rebinds only the rows that come into
+# view. Each row lives in a plain tk.Frame so it can be placed at an exact
+# pixel height.
+#   create_row(frame) -> row   fills a row frame with widgets, returns a handle
+#   bind_row(row, item)        shows the data for one item in a row
+# With fill_width=False rows keep their requested width, leaving anything
+# placed behind them in the viewport visible to the right. The scroll and
+# slot arithmetic is in virtual_rows.
+class VirtualList(ctk.CTkFrame):
+    def __init__(self, master, create_row, bind_row, row_height=44, overscan=2,
+                 fill_width=True, **kwargs):
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(master, **kwargs)
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.row_height = row_height
+        self.overscan = overscan
+        self.fill_width = fill_width
+        self.items = []
+        self.offset = 0
+        self.pool = []
+        self.bound = []
+
+        self.viewport = tk.Frame(
+            self, bd=0, highlightthickness=0, bg=self._apply_appearance_mode(self._bg_color)
+        )
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self, orientation="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.viewport.bind("<Configure>", lambda e: self.layout())
+        self.bind_scroll(self.viewport)
+
+    def set_items(self, items):
+        self.items = items
+        self.bound = [None] * len(self.pool)
+        self.layout()
+
+    def refresh(self):
+        # Rebinds the visible rows, e.g. after the data behind them changed.
+        self.bound = [None] * len(self.pool)
+        self.layout()
+
+    def scroll_to(self, index):
+        self.offset = index * self.row_height
+        self.layout()
+
+    def bind_scroll(self, widget):
+        for w in (widget, *self.descendants(widget)):
+            tk.Misc.bind(w, "<MouseWheel>", lambda e: self.scroll_pixels(-int(e.delta/120) * self.row_height), "+")
+            tk.Misc.bind(w, "<Button-4>", lambda e: self.scroll_pixels(-self.row_height), "+")
+            tk.Misc.bind(w, "<Button-5>", lambda e: self.scroll_pixels(self.row_height), "+")
+
+    def descendants(self, widget):
+        for child in widget.winfo_children():
+            yield child
+            yield from self.descendants(child)
+
+    def yview(self, *args):
+        height = max(self.viewport.winfo_height(), 1)
+        if args[0] == "moveto":
+            self.offset = moveto_offset(args[1], len(self.items), self.row_height)
+        elif args[0] == "scroll":
+            self.offset = scroll_offset(self.offset, args[1], args[2], self.row_height, height)
+        self.layout()
+
+    def scroll_pixels(self, pixels):
+        self.offset += pixels
+        self.layout()
+
+    def layout(self):
+        height = self.viewport.winfo_height()
+        count = len(self.items)
+        self.offset, first, last = visible_rows(
+            self.offset, count, self.row_height, height, self.overscan
+        )
+        # Size the pool for the worst case up front so it does not grow (and
+        # force a full rebind) on the first few scroll steps.
+        needed = pool_size(count, self.row_height, height, self.overscan)
+        while len(self.pool) < needed:
+            frame = tk.Frame(self.viewport, bd=0, highlightthickness=0, bg=self.viewport.cget("bg"))
+            row = self.create_row(frame)
+            self.bind_scroll(frame)
+            self.pool.append((frame, row))
+            # Slot assignment depends on the pool size, so rebind everything.
+            self.bound = [None] * len(self.pool)
+        width = {"relwidth": 1} if self.fill_width else {}
+        shown = set()
+        for index in range(first, last):
+            slot = slot_for(index, len(self.pool))
+            frame, row = self.pool[slot]
+            if self.bound[slot] != index:
+                self.bind_row(row, self.items[index])
+                self.bound[slot] = index
+            frame.place(x=0, y=index * self.row_height - self.offset,
+                        height=self.row_height, **width)
+            shown.add(slot)
+        for slot, (frame, _) in enumerate(self.pool):
+            if slot not in shown:
+                frame.place_forget()
+                self.bound[slot] = None
+        self.scrollbar.set(*scroll_fractions(self.offset, count, self.row_height, height))
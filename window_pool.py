@@ -0,0 +1,51 @@
+# window_pool.py
+
+# --- WindowPool ---
+# Keeps hidden, already built windows for reuse instead of destroying and
+# rebuilding them. Each window is stored under a key describing the data it
+# was built from (e.g. a menu version); acquire(key) only reuses a window
+# with the same key and destroys stale ones.
+#   factory(*args) -> window   builds a new window
+#   acquire(key, *args)        a matching idle window, or a new one
+#   release(window, key)       hides the window and keeps it for reuse
+#   prepare(key, *args)        builds a hidden window ahead of time
+class WindowPool:
+    def __init__(self, factory, max_idle=1):
+        self.factory = factory
+        self.max_idle = max_idle
+        # [(key, window)], most recently released last.
+        self.idle = []
+
+    def acquire(self, key=None, *args):
+        window = self.take(key)
+        return window if window is not None else self.factory(*args)
+
+    def take(self, key):
+        # Removes and returns an idle window built for key; stale idle
+        # windows are destroyed on the way.
+        while self.idle:
+            idle_key, window = self.idle.pop()
+            if not window.winfo_exists():
+                continue
+            if idle_key == key:
+                return window
+            window.destroy()
+        return None
+
+    def release(self, window, key=None):
+        if not window.winfo_exists():
+            return
+        window.withdraw()
+        if len(self.idle) < self.max_idle:
+            self.idle.append((key, window))
+        else:
+            window.destroy()
+
+    def prepare(self, key, *args):
+        if any(idle_key == key for idle_key, _ in self.idle):
+            return
+        self.take(key)
+        window = self.factory(*args)
+        # Hidden before Tk is idle again, so it is never drawn.
+        window.withdraw()
+        self.release(window, key)